@@ -0,0 +1,63 @@
+"""
+Response compression on the attendance list and CSV export.
+
+Run with `pytest benchmarks/bench_compression.py -s`. Reports the size and
+time of each response plain and gzipped, and of a repeat download of a past
+period's CSV, which comes from the stored compressed file.
+"""
+import time
+from datetime import date
+
+import pytest
+from django.core.cache import cache
+from django.test import Client
+from django.urls import reverse
+from hr.authentication import HRRefreshToken
+from hr.factories import EmployeeFactory
+from .seeding import seed_employees, seed_attendance
+
+EMPLOYEES = 500
+DAYS = 90
+END_DATE = date(2024, 12, 31)
+MIN_RATIO = 5
+MIN_CACHED_SPEEDUP = 3
+
+
+def fetch(client, url, auth, **headers):
+    cache.clear()
+    start = time.perf_counter()
+    response = client.get(url, HTTP_AUTHORIZATION=auth, **headers)
+    size = sum(len(chunk) for chunk in response.streaming_content) if response.streaming else len(response.content)
+    assert response.status_code == 200
+    return time.perf_counter() - start, size
+
+
+@pytest.mark.django_db
+def test_compression(settings, tmp_path):
+    """responses shrink at least MIN_RATIO times, and stored exports are served MIN_CACHED_SPEEDUP times faster."""
+    settings.EXPORT_CACHE_DIR = tmp_path
+    hr_user = EmployeeFactory(employee_type='HR')
+    seed_attendance(seed_employees(EMPLOYEES), END_DATE, DAYS, created_by=hr_user)
+    auth = f'Bearer {HRRefreshToken.for_user(hr_user).access_token}'
+    client = Client()
+    attendance = reverse('attendance-list')
+    urls = {
+        'attendance_list:month': f'{attendance}?date={END_DATE}&period=month',
+        'attendance_export:csv:month': f'{attendance}?date={END_DATE}&period=month&export=csv',
+    }
+
+    print()
+    print(f'{"endpoint":<28} {"plain KiB":>10} {"gzip KiB":>9} {"ratio":>6} {"plain ms":>9} {"gzip ms":>8}')
+    for name, url in urls.items():
+        plain_seconds, plain_size = fetch(client, url, auth)
+        gzip_seconds, gzip_size = fetch(client, url, auth, HTTP_ACCEPT_ENCODING='gzip')
+        ratio = plain_size / gzip_size
+        print(
+            f'{name:<28} {plain_size / 1024:>10.1f} {gzip_size / 1024:>9.1f} {ratio:>6.1f} '
+            f'{plain_seconds * 1000:>9.1f} {gzip_seconds * 1000:>8.1f}'
+        )
+        assert ratio >= MIN_RATIO, name
+
+    cached_seconds, _ = fetch(client, urls['attendance_export:csv:month'], auth, HTTP_ACCEPT_ENCODING='gzip')
+    print(f'{"stored csv repeat":<28} {"":>10} {"":>9} {"":>6} {"":>9} {cached_seconds * 1000:>8.1f}')
+    assert cached_seconds * MIN_CACHED_SPEEDUP < gzip_seconds
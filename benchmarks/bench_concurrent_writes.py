@@ -0,0 +1,64 @@
+"""
+Attendance writes from concurrent clients, each on its own connection as
+gunicorn workers are.
+
+Run with `pytest benchmarks/bench_concurrent_writes.py -s`, once with a
+PostgreSQL DATABASE_URL and once with a `sqlite:///` one, to compare the
+write throughput of the two deployments. Every write must succeed: on
+SQLite, writers queue for the lock instead of failing with "database is
+locked".
+"""
+import os
+import threading
+import time
+from datetime import date
+
+import pytest
+from django.db import connection, connections
+from django.urls import reverse
+from rest_framework.test import APIClient
+from hr.factories import EmployeeFactory
+from .seeding import seed_employees
+
+WRITERS = int(os.getenv('BENCH_WRITERS', 8))
+WRITES_PER_WRITER = int(os.getenv('BENCH_WRITES', 50))
+DAY = date(2024, 6, 3)
+
+
+def write_attendance(hr_user, employees, statuses):
+    client = APIClient()
+    client.force_authenticate(user=hr_user)
+    try:
+        for employee in employees:
+            response = client.post(reverse('attendance-list'), {
+                'employee': employee.pk, 'date': DAY, 'is_present': employee.pk % 10 != 0,
+            })
+            statuses.append(response.status_code)
+    finally:
+        connections.close_all()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_attendance_writes():
+    """every concurrent write succeeds; reports writes per second."""
+    if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+        pytest.skip('needs an on-disk database; set DATABASE_URL=sqlite:///db.sqlite3')
+    hr_user = EmployeeFactory(employee_type='HR')
+    employees = seed_employees(WRITERS * WRITES_PER_WRITER)
+    statuses = []
+    threads = [
+        threading.Thread(target=write_attendance, args=(hr_user, employees[n::WRITERS], statuses))
+        for n in range(WRITERS)
+    ]
+
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    print()
+    print(f'{connection.vendor}: {WRITERS} writers, {len(statuses)} writes in {elapsed:.2f}s, '
+          f'{len(statuses) / elapsed:.0f} writes/s')
+    assert statuses == [201] * WRITERS * WRITES_PER_WRITER
@@ -0,0 +1,69 @@
+"""
+Employee search and filtering at scale.
+
+Run with `pytest benchmarks/bench_employee_search.py -s`. Seeds
+BENCH_SEARCH_EMPLOYEES employees (default 100000) and times a first page
+of results for each filter against SEARCH_BUDGET. Substring search can only
+use an index on PostgreSQL (pg_trgm), so elsewhere it is reported but not
+held to the budget.
+"""
+import os
+import time
+
+import pytest
+from django.db import connection
+from django.test import Client
+from django.urls import reverse
+from hr.authentication import HRRefreshToken
+from hr.factories import EmployeeFactory
+from .seeding import seed_employees
+
+EMPLOYEES = int(os.environ.get('BENCH_SEARCH_EMPLOYEES', 100000))
+REPEATS = 20
+PAGE_SIZE = 50
+SEARCH_BUDGET = 0.010
+
+QUERIES = {
+    'type': {'employee_type': 'HR'},
+    'inactive': {'is_active': 'false'},
+    'prefix:name': {'search': 'last4242', 'match': 'prefix'},
+    'prefix:email': {'search': 'user9999', 'match': 'prefix'},
+    'prefix:rare': {'search': 'zz', 'match': 'prefix'},
+    'contains': {'search': 'st4242'},
+    'contains:rare': {'search': 'nobody'},
+}
+INDEXED_CONTAINS = {'postgresql'}
+
+
+def best_time(client, url, params, auth):
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        response = client.get(url, params, HTTP_AUTHORIZATION=auth)
+        timings.append(time.perf_counter() - start)
+        assert response.status_code == 200
+    return min(timings), len(response.json()['results'])
+
+
+@pytest.mark.django_db
+def test_employee_search_speed():
+    """every indexed filter returns its first page within SEARCH_BUDGET."""
+    hr_user = EmployeeFactory(employee_type='HR')
+    seed_employees(EMPLOYEES)
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+    auth = f'Bearer {HRRefreshToken.for_user(hr_user).access_token}'
+    client = Client()
+    url = reverse('employee-list')
+
+    print()
+    print(f'{connection.vendor}, {EMPLOYEES} employees')
+    print(f'{"query":<16} {"ms":>8} {"rows":>6}')
+    slow = []
+    for name, params in QUERIES.items():
+        seconds, rows = best_time(client, url, {**params, 'page_size': PAGE_SIZE}, auth)
+        print(f'{name:<16} {seconds * 1000:>8.2f} {rows:>6}')
+        held = not name.startswith('contains') or connection.vendor in INDEXED_CONTAINS
+        if held and seconds > SEARCH_BUDGET:
+            slow.append(name)
+    assert not slow, f'over {SEARCH_BUDGET * 1000:.0f} ms: {slow}'
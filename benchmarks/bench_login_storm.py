@@ -0,0 +1,74 @@
+"""
+Latency of ordinary API reads while many logins hash passwords at once.
+
+Run with `pytest benchmarks/bench_login_storm.py -s`. Requests go through
+Django's ASGI handler, as they would under `project/asgi.py`.
+"""
+import asyncio
+import math
+import time
+import pytest
+from django.test import AsyncClient, override_settings
+from django.urls import reverse
+from hr.authentication import HRRefreshToken
+from hr.factories import EmployeeFactory
+
+LOGINS = 16
+PASSWORD = 'password123'
+
+
+def percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+
+async def run_storm(login_url, username, token):
+    """Fire LOGINS concurrent logins and probe the dashboard until they finish."""
+    login_client = AsyncClient()
+    probe_client = AsyncClient()
+    auth = {'Authorization': f'Bearer {token}'}
+    latencies = []
+    done = asyncio.Event()
+
+    async def login():
+        response = await login_client.post(
+            login_url, {'username': username, 'password': PASSWORD}, content_type='application/json'
+        )
+        assert response.status_code == 200
+
+    async def logins():
+        await asyncio.gather(*[login() for _ in range(LOGINS)])
+        done.set()
+
+    async def probe():
+        while not done.is_set():
+            start = time.perf_counter()
+            response = await probe_client.get(reverse('dashboard'), headers=auth)
+            latencies.append(time.perf_counter() - start)
+            assert response.status_code == 200, response.content
+
+    started = time.perf_counter()
+    await asyncio.gather(logins(), probe())
+    return latencies, time.perf_counter() - started
+
+
+@pytest.mark.django_db(transaction=True)
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.PBKDF2PasswordHasher'])
+def test_login_storm_read_latency():
+    """reads stay fast during a login storm when hashing runs in the async login pool."""
+    user = EmployeeFactory(employee_type='HR')
+    user.set_password(PASSWORD)
+    user.save()
+    token = str(HRRefreshToken.for_user(user).access_token)
+
+    results = {}
+    for name, url in [('sync login', reverse('login')), ('async login', reverse('login-async'))]:
+        latencies, elapsed = asyncio.run(run_storm(url, user.username, token))
+        results[name] = (percentile(latencies, 0.5), percentile(latencies, 0.99), len(latencies), elapsed)
+
+    print()
+    print(f'{"mode":<12} {"p50 ms":>8} {"p99 ms":>8} {"reads":>6} {"storm s":>8}')
+    for name, (p50, p99, reads, elapsed) in results.items():
+        print(f'{name:<12} {p50 * 1000:8.1f} {p99 * 1000:8.1f} {reads:6d} {elapsed:8.2f}')
+
+    assert results['async login'][1] < results['sync login'][1]
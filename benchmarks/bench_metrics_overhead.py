@@ -0,0 +1,65 @@
+"""
+Cost of the query/timing middleware on ordinary API reads.
+
+Run with `pytest benchmarks/bench_metrics_overhead.py -s`. Rounds with and
+without `hr.metrics.QueryTimingMiddleware` are interleaved, and the fastest
+round of each is compared.
+"""
+import time
+from datetime import date
+
+import pytest
+from django.conf import settings
+from django.core.cache import cache
+from django.test import Client, override_settings
+from django.urls import reverse
+from hr.authentication import HRRefreshToken
+from hr.factories import EmployeeFactory
+from .seeding import seed_employees, seed_attendance
+
+EMPLOYEES = 200
+DAYS = 7
+ROUNDS = 9
+REQUESTS_PER_ROUND = 50
+MAX_OVERHEAD = 0.05
+END_DATE = date(2024, 12, 31)
+
+MIDDLEWARE = 'hr.metrics.QueryTimingMiddleware'
+
+
+def run_round(url, auth):
+    client = Client()
+    start = time.perf_counter()
+    for _ in range(REQUESTS_PER_ROUND):
+        cache.clear()
+        response = client.get(url, HTTP_AUTHORIZATION=auth)
+        assert response.status_code == 200
+    return (time.perf_counter() - start) / REQUESTS_PER_ROUND
+
+
+@pytest.mark.django_db
+def test_metrics_middleware_overhead():
+    """the middleware adds less than MAX_OVERHEAD to request time."""
+    hr_user = EmployeeFactory(employee_type='HR')
+    seed_attendance(seed_employees(EMPLOYEES), END_DATE, DAYS, created_by=hr_user)
+    auth = f'Bearer {HRRefreshToken.for_user(hr_user).access_token}'
+    without = [name for name in settings.MIDDLEWARE if name != MIDDLEWARE]
+    with_metrics = [MIDDLEWARE] + without
+
+    urls = {
+        'employee_detail': reverse('employee-detail', args=[hr_user.id]),
+        'employee_list': reverse('employee-list'),
+        'attendance_list:week': f"{reverse('attendance-list')}?date={END_DATE}&period=week",
+    }
+    print()
+    print(f'{"endpoint":<22} {"off ms":>8} {"on ms":>8} {"overhead":>9}')
+    for name, url in urls.items():
+        timings = {'off': [], 'on': []}
+        for _ in range(ROUNDS):
+            for mode, middleware in (('off', without), ('on', with_metrics)):
+                with override_settings(MIDDLEWARE=middleware):
+                    timings[mode].append(run_round(url, auth))
+        off, on = min(timings['off']), min(timings['on'])
+        overhead = on / off - 1
+        print(f'{name:<22} {off * 1000:8.2f} {on * 1000:8.2f} {overhead:9.1%}')
+        assert overhead < MAX_OVERHEAD, f'{name}: {overhead:.1%} overhead'
@@ -0,0 +1,165 @@
+"""
+Wall time, peak Python memory and query count of the main read endpoints at
+several data sizes, compared against a stored baseline.
+
+Run with `pytest benchmarks/bench_scale.py -s`. Sizes are `EMPLOYEESxDAYS`
+pairs taken from BENCH_SIZES (for the full-scale run, `BENCH_SIZES=10000x365`).
+Results are written to `benchmarks/results/scale-<vendor>.json`; set
+BENCH_UPDATE_BASELINE=1 to store them as `benchmarks/baselines/scale-<vendor>.json`
+instead of comparing against it.
+"""
+import json
+import os
+import time
+import tracemalloc
+from datetime import date
+from pathlib import Path
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from hr.authentication import HRRefreshToken
+from hr.factories import EmployeeFactory
+from .seeding import seed_employees, seed_attendance
+
+BENCH_DIR = Path(__file__).resolve().parent
+RESULTS_DIR = Path(os.getenv('BENCH_RESULTS_DIR', BENCH_DIR / 'results'))
+BASELINE_DIR = BENCH_DIR / 'baselines'
+SIZES = os.getenv('BENCH_SIZES', '500x30,1000x90').split(',')
+UPDATE_BASELINE = os.getenv('BENCH_UPDATE_BASELINE') == '1'
+REPEATS = int(os.getenv('BENCH_REPEATS', 3))
+
+# Allowed growth over the baseline before a run counts as a regression.
+TIME_TOLERANCE = float(os.getenv('BENCH_TIME_TOLERANCE', 1.5))
+TIME_SLACK = 0.005
+MEMORY_TOLERANCE = float(os.getenv('BENCH_MEMORY_TOLERANCE', 1.25))
+MEMORY_SLACK_KIB = 64
+
+END_DATE = date(2024, 12, 31)
+
+
+def endpoints():
+    day = END_DATE.isoformat()
+    attendance = reverse('attendance-list')
+    yield 'dashboard', reverse('dashboard')
+    yield 'employee_list', reverse('employee-list')
+    yield 'employee_list:page', f"{reverse('employee-list')}?page_size=100"
+    for period in ('day', 'week', 'month', 'year'):
+        yield f'attendance_list:{period}', f'{attendance}?date={day}&period={period}'
+    yield 'attendance_list:year:page', f'{attendance}?date={day}&period=year&page_size=100'
+    yield 'attendance_list:year:fields', f'{attendance}?date={day}&period=year&fields=id,employee,date,is_present'
+    for period in ('month', 'year'):
+        yield f'attendance_grid:{period}', f"{reverse('attendance-grid')}?date={day}&period={period}"
+    for period in ('month', 'year'):
+        yield f'attendance_export:csv:{period}', f'{attendance}?date={day}&period={period}&export=csv'
+
+
+def fetch(client, url, auth):
+    """GET the URL and read the whole body, streamed or not."""
+    cache.clear()
+    response = client.get(url, HTTP_AUTHORIZATION=auth)
+    assert response.status_code == 200, response.content[:200]
+    if response.streaming:
+        return sum(len(chunk) for chunk in response.streaming_content)
+    return len(response.content)
+
+
+def measure(client, url, auth):
+    """Best wall time over REPEATS runs, then one traced run for memory and queries."""
+    fetch(client, url, auth)
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        size = fetch(client, url, auth)
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        with CaptureQueriesContext(connection) as queries:
+            fetch(client, url, auth)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'seconds': round(min(timings), 4),
+        'peak_kib': round(peak / 1024),
+        'queries': len(queries),
+        'bytes': size,
+    }
+
+
+def load(path):
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text())
+
+
+def save(path, size, results):
+    """Merge one size's results into the JSON file."""
+    data = load(path)
+    data.setdefault('vendor', connection.vendor)
+    data.setdefault('sizes', {})[size] = results
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data, indent=2, sort_keys=True) + '\n')
+
+
+def regressions(results, baseline):
+    """Human-readable list of the measurements that got worse than the baseline allows."""
+    found = []
+    for name, result in results.items():
+        expected = baseline.get(name)
+        if expected is None:
+            continue
+        if result['queries'] > expected['queries']:
+            found.append(f"{name}: {result['queries']} queries, baseline {expected['queries']}")
+        if result['seconds'] > expected['seconds'] * TIME_TOLERANCE + TIME_SLACK:
+            found.append(f"{name}: {result['seconds']:.4f}s, baseline {expected['seconds']:.4f}s")
+        if result['peak_kib'] > expected['peak_kib'] * MEMORY_TOLERANCE + MEMORY_SLACK_KIB:
+            found.append(f"{name}: {result['peak_kib']} KiB peak, baseline {expected['peak_kib']} KiB")
+    return found
+
+
+def parse_size(size):
+    employees, days = size.lower().split('x')
+    return int(employees), int(days)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('size', SIZES)
+def test_scale(size):
+    """endpoint cost at the given size stays within the stored baseline."""
+    employee_count, days = parse_size(size)
+    hr_user = EmployeeFactory(employee_type='HR')
+    employees = seed_employees(employee_count)
+    seed_attendance(employees, END_DATE, days, created_by=hr_user)
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+
+    client = Client()
+    auth = f'Bearer {HRRefreshToken.for_user(hr_user).access_token}'
+    results = {name: measure(client, url, auth) for name, url in endpoints()}
+
+    print()
+    print(f'{size} on {connection.vendor}')
+    print(f'{"endpoint":<28} {"ms":>9} {"peak KiB":>9} {"queries":>8} {"KiB out":>9}')
+    for name, result in results.items():
+        print(
+            f"{name:<28} {result['seconds'] * 1000:9.1f} {result['peak_kib']:9d} "
+            f"{result['queries']:8d} {result['bytes'] / 1024:9.0f}"
+        )
+
+    filename = f'scale-{connection.vendor}.json'
+    save(RESULTS_DIR / filename, size, results)
+    if UPDATE_BASELINE:
+        save(BASELINE_DIR / filename, size, results)
+        return
+
+    baseline = load(BASELINE_DIR / filename).get('sizes', {}).get(size)
+    if baseline is None:
+        pytest.skip(f'no {connection.vendor} baseline for {size}; run with BENCH_UPDATE_BASELINE=1 to record one')
+    found = regressions(results, baseline)
+    assert not found, 'Performance regressions:\n' + '\n'.join(found)
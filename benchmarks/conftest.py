@@ -0,0 +1,8 @@
+import pytest
+from django.core.cache import cache
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """starting every benchmark with an empty response cache."""
+    cache.clear()
@@ -0,0 +1,75 @@
+"""
+Bulk seeding on top of the model factories.
+
+The factories create one row per INSERT and hash a password per employee,
+which is far too slow for tens of thousands of rows. These helpers build
+unsaved instances with the same factories and insert them with bulk_create.
+"""
+from datetime import timedelta
+from itertools import islice
+
+import factory
+from django.contrib.auth.hashers import make_password
+from hr.factories import EmployeeFactory, AttendanceFactory
+from hr.models import Employee, Attendance
+
+SEED_PASSWORD = 'password123'
+SEED_BATCH_SIZE = 5000
+
+_password_hash = None
+
+
+def seed_password_hash():
+    """One hash shared by every seeded employee."""
+    global _password_hash
+    if _password_hash is None:
+        _password_hash = make_password(SEED_PASSWORD)
+    return _password_hash
+
+
+class SeedEmployeeFactory(EmployeeFactory):
+    password = factory.LazyFunction(seed_password_hash)
+    employee_type = 'NORMAL'
+    first_name = factory.Sequence(lambda n: f'First{n % 500}')
+    last_name = factory.Sequence(lambda n: f'Last{n}')
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def seed_employees(count, batch_size=SEED_BATCH_SIZE):
+    """Insert `count` employees and return them with their primary keys."""
+    employees = []
+    for size in (min(batch_size, count - done) for done in range(0, count, batch_size)):
+        employees += Employee.objects.bulk_create(SeedEmployeeFactory.build_batch(size))
+    return employees
+
+
+def is_present(employee_id, day):
+    """Deterministic pattern with roughly one absence in ten."""
+    return (employee_id * 7 + day) % 10 != 0
+
+
+def seed_attendance(employees, end_date, days, created_by=None, batch_size=SEED_BATCH_SIZE):
+    """
+    Insert an attendance record for every employee on each of the `days`
+    days up to `end_date`. Rows are built lazily, so memory stays flat.
+    """
+    rows = (
+        AttendanceFactory.build(
+            employee=employee,
+            date=end_date - timedelta(days=day),
+            is_present=is_present(employee.pk, day),
+            created_by=created_by,
+        )
+        for day in range(days)
+        for employee in employees
+    )
+    total = 0
+    for batch in batched(rows, batch_size):
+        Attendance.objects.bulk_create(batch)
+        total += len(batch)
+    return total
@@ -1,15 +1,47 @@
 from rest_framework import status
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, renderer_classes, parser_classes
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework.renderers import BrowsableAPIRenderer
+from rest_framework.parsers import MultiPartParser
+from django.conf import settings
 from django.contrib.auth import authenticate
 from django.utils import timezone
-from .models import Employee, Attendance
-from .serializers import EmployeeSerializer, AttendanceSerializer
-from datetime import datetime, timedelta
-import csv
-from django.http import HttpResponse
+from django.db import transaction
+from django.db.models import Count, Max, Sum
+from .models import Employee, Attendance, AttendanceArchive, ExportJob
+from .serializers import (
+    EmployeeSerializer, EmployeeStatsSerializer, AttendanceSerializer, AttendanceBulkItemSerializer,
+    ExportJobRequestSerializer, ExportJobSerializer,
+)
+from .pagination import EmployeeCursorPagination, AttendanceCursorPagination
+from .summary import (
+    get_summary, ensure_summaries, record_attendance_change, record_attendance_changes, record_headcount,
+    record_employee_removal,
+)
+from .cache import cache_get_response, bump_data_version, get_cache_stats
+from .authentication import HRRefreshToken
+from .exports import export_attendance_to_csv, export_attendance_to_xlsx, cached_compressed_csv
+from .compression import negotiate_encoding
+from .stats import STATS_SORT_FIELDS, annotate_attendance_stats, order_by_stat, add_attendance_counts, sort_by_stat
+from .renderers import FastJSONRenderer
+from .fastpath import attendance_values, format_attendance, employee_values
+from .conditional import conditional_get, make_etag, latest, not_modified, set_validators
+from .employee_import import ImportFormatError, import_employees
+from .grid import build_attendance_grid
+from .search import filter_employees
+from .changes import CursorExpired, read_changes, record_deletions, record_employee_deletion
+from .fieldsets import (
+    EMPLOYEE_FIELDS, EMPLOYEE_STATS_FIELDS, ATTENDANCE_FIELDS, requested_fields, only_columns, attendance_columns,
+    sparse_attendance_values, attendance_formatter, shown_relations, pick,
+)
+from .periods import parse_period, calculate_date_range
+from .export_jobs import request_export, job_path, download_response
+from .archive import (
+    split_period, has_archived, period_attendances, iter_period_values, iter_period_export_rows, period_sources,
+    archived_attendance_counts, archived_years,
+)
+from collections import Counter
 
 
 def is_hr_employee(user):
@@ -22,19 +54,26 @@ def handle_unauthorized():
     return Response({'error': 'Not authorized'}, status=status.HTTP_403_FORBIDDEN)
 
 
+FAST_PATH_CHUNK_SIZE = 2000
+
+
+def wants_fast_path(request):
+    """List views skip the serializers when the response is rendered as JSON."""
+    return request.accepted_renderer.format == 'json'
+
+
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@cache_get_response(is_allowed=is_hr_employee)
 def dashboard(request):
     """HR dashboard showing employee statistics and recent activities."""
     if not is_hr_employee(request.user):
         return handle_unauthorized()
     
     today = timezone.now().date()
-    total_employees = Employee.objects.count()
-    present_today = Attendance.objects.filter(date=today, is_present=True).count()
-    absent_today = Attendance.objects.filter(date=today, is_present=False).count()
+    summary = get_summary(today)
     
     recent_attendances = Attendance.objects.select_related('employee', 'created_by').order_by('-created_at')[:10]
     activities = [
@@ -48,57 +87,147 @@ def dashboard(request):
     ]
     
     return Response({
-        'total_employees': total_employees,
-        'present_today': present_today,
-        'absent_today': absent_today,
+        'total_employees': summary.total_employees,
+        'present_today': summary.present,
+        'absent_today': summary.absent,
         'recent_activities': activities,
     })
 
 
+def login_result(user):
+    """Return the login response body and status for the result of `authenticate`."""
+    if not user:
+        return {'error': 'Invalid credentials'}, status.HTTP_401_UNAUTHORIZED
+
+    if user.employee_type != 'HR':
+        return {'error': 'Access denied. Only HR employees can login.'}, status.HTTP_403_FORBIDDEN
+
+    refresh = HRRefreshToken.for_user(user)
+    return {
+        'access': str(refresh.access_token),
+        'refresh': str(refresh),
+        'user': EmployeeSerializer(user).data,
+    }, status.HTTP_200_OK
+
+
 @api_view(['POST'])
 def login_view(request):
     """Login view for HR employees."""
     username = request.data.get('username')
     password = request.data.get('password')
     user = authenticate(username=username, password=password)
+    data, code = login_result(user)
+    return Response(data, status=code)
 
-    if not user:
-        return Response({'error': 'Invalid credentials'}, status=status.HTTP_401_UNAUTHORIZED)
 
-    if user.employee_type != 'HR':
-        return Response({'error': 'Access denied. Only HR employees can login.'}, status=status.HTTP_403_FORBIDDEN)
-
-    refresh = RefreshToken.for_user(user)
-    return Response({
-        'access': str(refresh.access_token),
-        'refresh': str(refresh),
-        'user': EmployeeSerializer(user).data,
-    })
+def employee_list_validators(request):
+    """
+    ETag over the newest employee change and the employee count; the stats
+    view depends on attendance, so it is skipped. No Last-Modified: deleting
+    an employee other than the newest leaves the newest change as it was.
+    """
+    if request.query_params.get('stats'):
+        return None
+    # Two queries: together in one aggregate they need a full scan, apart
+    # they are a table count and a single read of the updated_at index.
+    count = Employee.objects.count()
+    last_modified = Employee.objects.aggregate(updated=Max('updated_at'))['updated']
+    etag = make_etag(
+        request.get_full_path(), request.accepted_renderer.format, count,
+        last_modified.isoformat() if last_modified else None,
+    )
+    return etag, None
 
 
 @api_view(['GET', 'POST'])
 @permission_classes([IsAuthenticated])
+@renderer_classes([FastJSONRenderer, BrowsableAPIRenderer])
+@conditional_get(employee_list_validators, is_allowed=is_hr_employee)
 def employee_list(request):
-    """List all employees or create a new employee."""
+    """List employees, optionally filtered and searched, or create a new employee."""
     if not is_hr_employee(request.user):
         return handle_unauthorized()
     
     if request.method == 'GET':
-        employees = Employee.objects.all()
-        serializer = EmployeeSerializer(employees, many=True)
+        stats = bool(request.query_params.get('stats'))
+        try:
+            employees = filter_employees(Employee.objects.all(), request.query_params)
+            fields = requested_fields(request.query_params, EMPLOYEE_STATS_FIELDS if stats else EMPLOYEE_FIELDS)
+        except ValueError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        if fields is not None:
+            employees = only_columns(employees, ['id', *(field for field in fields if field in EMPLOYEE_FIELDS)])
+        serializer_class = EmployeeSerializer
+        archived_counts = None
+        if stats:
+            try:
+                date, period = parse_period(request.query_params)
+            except ValueError:
+                return Response({'error': 'Invalid date format'}, status=status.HTTP_400_BAD_REQUEST)
+            start_date, end_date = calculate_date_range(date, period)
+            employees = annotate_attendance_stats(employees, start_date, end_date)
+            serializer_class = EmployeeStatsSerializer
+            if has_archived(split_period(start_date, end_date)):
+                archived_counts = archived_attendance_counts(start_date, end_date)
+                days = (end_date - start_date).days + 1
+        elif wants_fast_path(request):
+            # Plain rows already match EmployeeSerializer's output.
+            employees = employee_values(employees, fields)
+            serializer_class = None
+        
+        def trim(rows):
+            # The id is always fetched, for the cursor.
+            if fields is None or 'id' in fields:
+                return rows
+            return [pick(row, fields) for row in rows]
+        
+        paginator = EmployeeCursorPagination()
+        if paginator.is_requested(request):
+            page = paginator.paginate_queryset(employees, request)
+            if serializer_class is None:
+                return paginator.get_paginated_response(trim(page))
+            if archived_counts is not None:
+                add_attendance_counts(page, archived_counts, days)
+            serializer = serializer_class(page, many=True, fields=fields)
+            return paginator.get_paginated_response(serializer.data)
+        if serializer_class is None:
+            return Response(trim(list(employees.iterator(chunk_size=FAST_PATH_CHUNK_SIZE))))
+        if archived_counts is not None:
+            employees = add_attendance_counts(list(employees), archived_counts, days)
+        serializer = serializer_class(employees, many=True, fields=fields)
         return Response(serializer.data)
     
     if request.method == 'POST':
         serializer = EmployeeSerializer(data=request.data)
         if serializer.is_valid():
-            employee = serializer.save(commit=False)
-            employee.set_password(serializer.validated_data['password'])
-            employee.save()
+            with transaction.atomic():
+                # EmployeeSerializer.create hashes the password.
+                serializer.save()
+                record_headcount(1, since=timezone.now().date())
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
 
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+@parser_classes([MultiPartParser])
+def employee_import(request):
+    """Create employees from an uploaded CSV or XLSX file and report the rows that failed."""
+    if not is_hr_employee(request.user):
+        return handle_unauthorized()
+    
+    upload = request.FILES.get('file')
+    if upload is None:
+        return Response({'error': 'No file uploaded'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        report = import_employees(upload, upload.name, workers=settings.IMPORT_HASH_WORKERS)
+    except ImportFormatError as exc:
+        return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(report)
+
+
 @api_view(['GET', 'PUT', 'DELETE'])
 @permission_classes([IsAuthenticated])
 def employee_detail(request, pk):
@@ -106,64 +235,175 @@ def employee_detail(request, pk):
     if not is_hr_employee(request.user):
         return handle_unauthorized()
     
+    employees = Employee.objects.all()
+    fields = None
+    if request.method == 'GET':
+        try:
+            fields = requested_fields(request.query_params, EMPLOYEE_FIELDS)
+        except ValueError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        if fields is not None:
+            employees = only_columns(employees, [*fields, 'updated_at'])
+    
     try:
-        employee = Employee.objects.get(pk=pk)
+        employee = employees.get(pk=pk)
     except Employee.DoesNotExist:
         return Response({'error': 'Employee not found'}, status=status.HTTP_404_NOT_FOUND)
     
     if request.method == 'GET':
-        serializer = EmployeeSerializer(employee)
-        return Response(serializer.data)
+        etag = make_etag('employee', employee.pk, fields, employee.updated_at.isoformat())
+        response = not_modified(request, etag, employee.updated_at)
+        if response is not None:
+            return response
+        serializer = EmployeeSerializer(employee, fields=fields)
+        return set_validators(Response(serializer.data), etag, employee.updated_at)
     
     if request.method == 'PUT':
         serializer = EmployeeSerializer(employee, data=request.data, partial=True)
         if serializer.is_valid():
-            serializer.save()
+            with transaction.atomic():
+                employee = serializer.save()
             return Response(serializer.data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
     if request.method == 'DELETE':
-        employee.delete()
+        with transaction.atomic():
+            record_employee_removal(employee, since=timezone.now().date())
+            record_employee_deletion(employee)
+            employee.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
+def period_state(start_date, end_date):
+    """
+    `(row count, archived row count, last modified)` of a period: the newest
+    change among its rows and the employees shown in them. Counts are
+    included so deletions are noticed too.
+    """
+    stats = Attendance.objects.filter(date__range=[start_date, end_date]).aggregate(
+        count=Count('id'),
+        updated=Max('updated_at'),
+        employee_updated=Max('employee__updated_at'),
+        marker_updated=Max('created_by__updated_at'),
+    )
+    archived = {'rows': None, 'created': None, 'employee_updated': None}
+    if has_archived(split_period(start_date, end_date)):
+        # Archived rows never change, but the employee names joined to them can.
+        archived = AttendanceArchive.objects.filter(year__range=[start_date.year, end_date.year]).aggregate(
+            rows=Sum('rows'), created=Max('created_at'),
+        )
+        archived['employee_updated'] = Employee.objects.aggregate(updated=Max('updated_at'))['updated']
+    last_modified = latest(
+        stats['updated'], stats['employee_updated'], stats['marker_updated'],
+        archived['created'], archived['employee_updated'],
+    )
+    return stats['count'], archived['rows'], last_modified
+
+
+def period_fingerprint(start_date, end_date):
+    """Identifies the data of a period: it changes whenever `period_state` does."""
+    count, archived_rows, last_modified = period_state(start_date, end_date)
+    return make_etag(
+        start_date, end_date, count, archived_rows, last_modified.isoformat() if last_modified else None,
+    ).strip('"')
+
+
+def attendance_list_validators(request):
+    """
+    ETag of the period list, from `period_state`. Like the employee list,
+    it sends no Last-Modified, which a deletion would not move.
+    """
+    try:
+        date, period = parse_period(request.query_params)
+    except ValueError:
+        return None
+    start_date, end_date = calculate_date_range(date, period)
+    count, archived_rows, last_modified = period_state(start_date, end_date)
+    etag = make_etag(
+        request.get_full_path(), request.accepted_renderer.format, start_date, end_date, count,
+        archived_rows, last_modified.isoformat() if last_modified else None,
+    )
+    return etag, None
+
+
 @api_view(['GET', 'POST'])
 @permission_classes([IsAuthenticated])
+@renderer_classes([FastJSONRenderer, BrowsableAPIRenderer])
+@conditional_get(attendance_list_validators, is_allowed=is_hr_employee)
+@cache_get_response(is_allowed=is_hr_employee)
 def attendance_list(request):
     """List attendances or create a new attendance."""
     if not is_hr_employee(request.user):
         return handle_unauthorized()
     
     if request.method == 'GET':
-        date_str = request.query_params.get('date', timezone.now().date())
-        period = request.query_params.get('period', 'day')
         export_format = request.query_params.get('export')
         
         try:
-            date = datetime.strptime(str(date_str), '%Y-%m-%d').date()
+            date, period = parse_period(request.query_params)
         except ValueError:
             return Response({'error': 'Invalid date format'}, status=status.HTTP_400_BAD_REQUEST)
         
         start_date, end_date = calculate_date_range(date, period)
-        
-        attendances = Attendance.objects.filter(
-            date__range=[start_date, end_date]
-        ).select_related('employee', 'created_by').order_by('date', 'employee__first_name')
+        segments = split_period(start_date, end_date)
         
         if export_format == 'csv':
-            return export_attendance_to_csv(attendances, period, date)
+            coding = negotiate_encoding(request)
+            if coding is not None and end_date < timezone.now().date():
+                # Past periods seldom change: keep the compressed file until their data does.
+                key = f'attendance_{start_date}_{end_date}_{period_fingerprint(start_date, end_date)}'
+                return cached_compressed_csv(lambda: iter_period_export_rows(segments), period, date, key, coding)
+            return export_attendance_to_csv(iter_period_export_rows(segments), period, date)
+        if export_format == 'xlsx':
+            return export_attendance_to_xlsx(iter_period_export_rows(segments), period, date)
         
-        serializer = AttendanceSerializer(attendances, many=True)
+        try:
+            fields = requested_fields(request.query_params, ATTENDANCE_FIELDS)
+        except ValueError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        format_row = attendance_formatter(fields)
+        if has_archived(segments):
+            return Response(archived_period_data(request, segments, format_row))
+        
+        attendances = period_attendances(start_date, end_date)
+        paginator = AttendanceCursorPagination()
+        if wants_fast_path(request):
+            rows = attendance_values(attendances) if fields is None else sparse_attendance_values(attendances, fields)
+            if paginator.is_requested(request):
+                page = paginator.paginate_queryset(rows, request)
+                return paginator.get_paginated_response([format_row(row) for row in page])
+            return Response([format_row(row) for row in rows.iterator(chunk_size=FAST_PATH_CHUNK_SIZE)])
+        
+        if fields is not None:
+            attendances = only_columns(attendances, [*attendance_columns(fields), *paginator.ordering])
+        if paginator.is_requested(request):
+            page = paginator.paginate_queryset(attendances, request)
+            serializer = AttendanceSerializer(page, many=True, fields=fields)
+            return paginator.get_paginated_response(serializer.data)
+        
+        serializer = AttendanceSerializer(attendances, many=True, fields=fields)
         return Response(serializer.data)
     
     if request.method == 'POST':
         serializer = AttendanceSerializer(data=request.data)
         if serializer.is_valid():
-            serializer.save(created_by=request.user)
+            with transaction.atomic():
+                ensure_summaries(serializer.validated_data['date'])
+                attendance = serializer.save(created_by=request.user)
+                record_attendance_change(None, (attendance.date, attendance.is_present))
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+def archived_period_data(request, segments, format_row=format_attendance):
+    """List data for a period reaching into archived years, which only exist as plain rows."""
+    paginator = AttendanceCursorPagination()
+    if paginator.is_requested(request):
+        page = paginator.paginate_sources(period_sources(segments), request)
+        return paginator.get_paginated_data([format_row(row) for row in page])
+    return [format_row(row) for row in iter_period_values(segments)]
+
+
 @api_view(['GET', 'PUT', 'DELETE'])
 @permission_classes([IsAuthenticated])
 def attendance_detail(request, pk):
@@ -171,59 +411,323 @@ def attendance_detail(request, pk):
     if not is_hr_employee(request.user):
         return handle_unauthorized()
     
+    attendances = Attendance.objects.select_related('employee', 'created_by')
+    fields = None
+    if request.method == 'GET':
+        try:
+            fields = requested_fields(request.query_params, ATTENDANCE_FIELDS)
+        except ValueError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        if fields is not None:
+            attendances = only_columns(attendances, [
+                *attendance_columns(fields), 'created_by', 'updated_at',
+                *(f'{relation}__updated_at' for relation in shown_relations(fields)),
+            ])
+    
     try:
-        attendance = Attendance.objects.get(pk=pk)
+        attendance = attendances.get(pk=pk)
     except Attendance.DoesNotExist:
         return Response({'error': 'Attendance not found'}, status=status.HTTP_404_NOT_FOUND)
     
     if request.method == 'GET':
-        serializer = AttendanceSerializer(attendance)
-        return Response(serializer.data)
+        # The response may also show the usernames of the employee and the marker.
+        last_modified = latest(attendance.updated_at, *(
+            getattr(attendance, relation).updated_at
+            for relation in shown_relations(fields) if getattr(attendance, f'{relation}_id') is not None
+        ))
+        etag = make_etag('attendance', attendance.pk, attendance.created_by_id, fields, last_modified.isoformat())
+        response = not_modified(request, etag, last_modified)
+        if response is not None:
+            return response
+        serializer = AttendanceSerializer(attendance, fields=fields)
+        return set_validators(Response(serializer.data), etag, last_modified)
+    
+    before = (attendance.date, attendance.is_present)
     
     if request.method == 'PUT':
         serializer = AttendanceSerializer(attendance, data=request.data, partial=True)
         if serializer.is_valid():
-            serializer.save()
+            with transaction.atomic():
+                ensure_summaries(attendance.date, serializer.validated_data.get('date', attendance.date))
+                attendance = serializer.save()
+                record_attendance_change(before, (attendance.date, attendance.is_present))
             return Response(serializer.data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
     if request.method == 'DELETE':
-        attendance.delete()
+        with transaction.atomic():
+            ensure_summaries(attendance.date)
+            record_deletions('attendance', [attendance.pk])
+            attendance.delete()
+            record_attendance_change(before, None)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
-def calculate_date_range(date, period):
-    """Calculate the date range based on the specified period."""
-    if period == 'day':
-        return date, date
-    if period == 'week':
-        start_date = date - timedelta(days=date.weekday())
-        end_date = start_date + timedelta(days=6)
-    elif period == 'month':
-        start_date = date.replace(day=1)
-        next_month = date.replace(day=28) + timedelta(days=4)
-        end_date = next_month - timedelta(days=next_month.day)
-    else:  
-        start_date = date.replace(month=1, day=1)
-        end_date = date.replace(month=12, day=31)
-    return start_date, end_date
-
-
-def export_attendance_to_csv(attendances, period, date):
-    """Export attendance records to a CSV file."""
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = f'attachment; filename="attendance_{period}_{date}.csv"'
-    
-    writer = csv.writer(response)
-    writer.writerow(['Date', 'Employee Name', 'Email', 'Status', 'Marked By', 'Marked At'])
-    
-    for attendance in attendances:
-        writer.writerow([
-            attendance.date,
-            f"{attendance.employee.first_name} {attendance.employee.last_name}",
-            attendance.employee.email,
-            'Present' if attendance.is_present else 'Absent',
-            attendance.created_by.username,
-            attendance.created_at.strftime('%Y-%m-%d %H:%M:%S'),
-        ])
-    return response
+BULK_ATTENDANCE_MAX_ITEMS = 1000
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def attendance_bulk(request):
+    """Create or update many attendance records in a single transaction."""
+    if not is_hr_employee(request.user):
+        return handle_unauthorized()
+    
+    items = request.data
+    if not isinstance(items, list):
+        return Response({'error': 'Expected a list of attendance records'}, status=status.HTTP_400_BAD_REQUEST)
+    if len(items) > BULK_ATTENDANCE_MAX_ITEMS:
+        return Response(
+            {'error': f'At most {BULK_ATTENDANCE_MAX_ITEMS} records per request'},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    
+    results = [None] * len(items)
+    valid = {}
+    context = {'archived_years': archived_years()}
+    for index, item in enumerate(items):
+        serializer = AttendanceBulkItemSerializer(data=item, context=context)
+        if serializer.is_valid():
+            valid[index] = serializer.validated_data
+        else:
+            results[index] = {'index': index, 'status': 'error', 'errors': serializer.errors}
+    
+    employee_ids = {data['employee'] for data in valid.values()}
+    known_ids = set(Employee.objects.filter(id__in=employee_ids).values_list('id', flat=True))
+    latest_by_key = {}
+    for index, data in valid.items():
+        if data['employee'] not in known_ids:
+            results[index] = {
+                'index': index,
+                'status': 'error',
+                'errors': {'employee': [f'Invalid pk "{data["employee"]}" - object does not exist.']},
+            }
+            continue
+        # A later entry for the same employee and date wins.
+        latest_by_key[(data['employee'], data['date'])] = index
+    
+    with transaction.atomic():
+        keys = list(latest_by_key)
+        existing = {
+            (employee_id, day): is_present
+            for employee_id, day, is_present in Attendance.objects.select_for_update().filter(
+                employee_id__in={employee_id for employee_id, _ in keys},
+                date__in={day for _, day in keys},
+            ).values_list('employee_id', 'date', 'is_present')
+        }
+        ensure_summaries(*{day for _, day in keys})
+        attendances = Attendance.objects.bulk_create(
+            [
+                Attendance(
+                    employee_id=employee_id,
+                    date=day,
+                    is_present=valid[latest_by_key[(employee_id, day)]]['is_present'],
+                    created_by=request.user,
+                )
+                for employee_id, day in keys
+            ],
+            update_conflicts=True,
+            unique_fields=['employee', 'date'],
+            update_fields=['is_present', 'updated_at'],
+        )
+        record_attendance_changes(
+            ((key[1], existing[key]) if key in existing else None, (key[1], attendance.is_present))
+            for key, attendance in zip(keys, attendances)
+        )
+        # bulk_create sends no post_save.
+        bump_data_version()
+    
+    ids = {}
+    for key, attendance in zip(keys, attendances):
+        index = latest_by_key[key]
+        ids[key] = attendance.pk
+        results[index] = {
+            'index': index,
+            'status': 'updated' if key in existing else 'created',
+            'id': attendance.pk,
+        }
+    for index, data in valid.items():
+        if results[index] is None:
+            results[index] = {
+                'index': index,
+                'status': 'superseded',
+                'id': ids[(data['employee'], data['date'])],
+            }
+    
+    counts = Counter(result['status'] for result in results)
+    return Response({
+        'created': counts['created'],
+        'updated': counts['updated'],
+        'failed': counts['error'],
+        'results': results,
+    })
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def attendance_stats(request):
+    """Per-employee present/absent/unmarked counts and attendance rate for a period."""
+    if not is_hr_employee(request.user):
+        return handle_unauthorized()
+    
+    try:
+        date, period = parse_period(request.query_params)
+    except ValueError:
+        return Response({'error': 'Invalid date format'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    sort = request.query_params.get('sort')
+    if sort is not None and sort not in STATS_SORT_FIELDS:
+        return Response(
+            {'error': f"Invalid sort, expected one of: {', '.join(STATS_SORT_FIELDS)}"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    try:
+        limit = int(request.query_params['limit']) if 'limit' in request.query_params else None
+    except ValueError:
+        return Response({'error': 'Invalid limit'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    start_date, end_date = calculate_date_range(date, period)
+    days = (end_date - start_date).days + 1
+    employees = annotate_attendance_stats(Employee.objects.all(), start_date, end_date)
+    if has_archived(split_period(start_date, end_date)):
+        # Archived counts are added in Python, so sort and cut there too.
+        employees = add_attendance_counts(
+            list(employees.order_by('id')), archived_attendance_counts(start_date, end_date), days
+        )
+        if sort:
+            employees = sort_by_stat(employees, sort)
+    else:
+        employees = order_by_stat(employees, sort) if sort else employees.order_by('id')
+    if limit is not None:
+        employees = employees[:max(limit, 0)]
+    
+    return Response({
+        'start_date': start_date,
+        'end_date': end_date,
+        'days': days,
+        'results': EmployeeStatsSerializer(employees, many=True).data,
+    })
+
+
+GRID_PERIODS = ('month', 'year')
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@cache_get_response(is_allowed=is_hr_employee)
+def attendance_grid(request):
+    """
+    Employee x day attendance grid for a month or year, as base64 bitsets:
+    day i of the period is bit i % 8 of byte i // 8, least significant first.
+    """
+    if not is_hr_employee(request.user):
+        return handle_unauthorized()
+    
+    try:
+        date, _ = parse_period(request.query_params)
+    except ValueError:
+        return Response({'error': 'Invalid date format'}, status=status.HTTP_400_BAD_REQUEST)
+    period = request.query_params.get('period', 'month')
+    if period not in GRID_PERIODS:
+        return Response(
+            {'error': f"Invalid period, expected one of: {', '.join(GRID_PERIODS)}"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    
+    start_date, end_date = calculate_date_range(date, period)
+    return Response({
+        'start_date': start_date,
+        'end_date': end_date,
+        'days': (end_date - start_date).days + 1,
+        'employees': build_attendance_grid(start_date, end_date),
+    })
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def export_job_list(request):
+    """Queue an attendance export, or return the job that already covers the same data."""
+    if not is_hr_employee(request.user):
+        return handle_unauthorized()
+    
+    serializer = ExportJobRequestSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    
+    period, date, export_format = (serializer.validated_data[field] for field in ('period', 'date', 'format'))
+    start_date, end_date = calculate_date_range(date, period)
+    fingerprint = period_fingerprint(start_date, end_date)
+    job, created = request_export(period, date, export_format, fingerprint, request.user)
+    return Response(
+        ExportJobSerializer(job, context={'request': request}).data,
+        status=status.HTTP_201_CREATED if created else status.HTTP_200_OK,
+    )
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def export_job_detail(request, pk):
+    """Status and progress of an export job."""
+    if not is_hr_employee(request.user):
+        return handle_unauthorized()
+    
+    try:
+        job = ExportJob.objects.get(pk=pk)
+    except ExportJob.DoesNotExist:
+        return Response({'error': 'Export job not found'}, status=status.HTTP_404_NOT_FOUND)
+    return Response(ExportJobSerializer(job, context={'request': request}).data)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def export_job_download(request, pk):
+    """Download a finished export; single byte ranges are supported for resuming."""
+    if not is_hr_employee(request.user):
+        return handle_unauthorized()
+    
+    try:
+        job = ExportJob.objects.get(pk=pk)
+    except ExportJob.DoesNotExist:
+        return Response({'error': 'Export job not found'}, status=status.HTTP_404_NOT_FOUND)
+    if job.status != ExportJob.DONE or not job_path(job).exists():
+        return Response({'error': 'Export is not ready'}, status=status.HTTP_409_CONFLICT)
+    return download_response(request, job)
+
+
+CHANGES_PAGE_SIZE = 500
+CHANGES_MAX_PAGE_SIZE = 5000
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@renderer_classes([FastJSONRenderer, BrowsableAPIRenderer])
+def change_feed(request, kind):
+    """Records of `kind` changed or deleted since the client's cursor, for incremental sync."""
+    if not is_hr_employee(request.user):
+        return handle_unauthorized()
+    
+    try:
+        page_size = int(request.query_params.get('page_size', CHANGES_PAGE_SIZE))
+    except ValueError:
+        return Response({'error': 'Invalid page_size'}, status=status.HTTP_400_BAD_REQUEST)
+    page_size = min(max(page_size, 1), CHANGES_MAX_PAGE_SIZE)
+    
+    try:
+        data = read_changes(kind, request.query_params.get('cursor'), page_size)
+    except ValueError as exc:
+        return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+    except CursorExpired:
+        return Response(
+            {'error': 'Cursor expired, sync again without a cursor'}, status=status.HTTP_410_GONE,
+        )
+    return Response(data)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def cache_stats(request):
+    """Response cache hit/miss counters for this process."""
+    if not is_hr_employee(request.user):
+        return handle_unauthorized()
+    
+    return Response(get_cache_stats())
@@ -0,0 +1,386 @@
+"""
+Cold storage for closed attendance years.
+
+`archive_year` moves a year's Attendance rows into a compressed NumPy file,
+one column per array, sorted by date. Reads split a date range into
+segments at archived years and read those segments from the files, so the
+period list, the exports, the stats and the grid see the same rows as
+before. Archived years are read-only.
+
+The files keep the rows of employees deleted after archiving; every read
+drops them, as the database cascade would have done, so the list, the
+counts, the summaries and the grid agree.
+"""
+import os
+from collections import Counter
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+
+from .exports import EXPORT_FIELDS, EXPORT_CHUNK_SIZE, iter_export_rows
+from .fastpath import attendance_values
+from .models import Employee, Attendance, AttendanceArchive
+
+ARCHIVE_READ_CHUNK_SIZE = 50000
+# Years kept loaded per process.
+ARCHIVE_CACHE_YEARS = 2
+NO_MARKER = -1
+
+ARCHIVE_FIELDS = ('id', 'employee_id', 'date', 'is_present', 'created_by_id', 'created_at', 'updated_at')
+ARCHIVE_DTYPES = {
+    'id': np.int64,
+    'employee_id': np.int64,
+    'date': 'datetime64[D]',
+    'is_present': np.bool_,
+    'created_by_id': np.int64,
+    'created_at': 'datetime64[us]',
+    'updated_at': 'datetime64[us]',
+}
+
+
+def archive_path(year):
+    return Path(settings.ATTENDANCE_ARCHIVE_DIR) / f'attendance-{year}.npz'
+
+
+def archived_years(first=None, last=None):
+    """
+    Set of archived years, optionally between `first` and `last`. Read from
+    the database every time rather than cached: the archive command runs in
+    its own process, and a worker that missed a newly archived year would
+    read that year from the emptied table and accept writes into it.
+    """
+    archives = AttendanceArchive.objects.all()
+    if first is not None:
+        archives = archives.filter(year__range=[first, last])
+    return set(archives.values_list('year', flat=True))
+
+
+def is_archived(day):
+    return AttendanceArchive.objects.filter(year=day.year).exists()
+
+
+def closed_years(today):
+    """Years with attendance rows that nobody edits any more: everything before last year."""
+    return [day.year for day in Attendance.objects.filter(date__lt=date(today.year - 1, 1, 1)).dates('date', 'year')]
+
+
+def naive_utc(value):
+    return value.astimezone(dt_timezone.utc).replace(tzinfo=None)
+
+
+def read_year_columns(year):
+    """The year's rows as NumPy columns ordered by date, read in chunks to bound memory."""
+    rows = Attendance.objects.select_for_update().filter(
+        date__range=[date(year, 1, 1), date(year, 12, 31)]
+    ).order_by('date', 'employee_id', 'id').values_list(*ARCHIVE_FIELDS)
+
+    chunks = {field: [] for field in ARCHIVE_FIELDS}
+    buffer = []
+
+    def flush():
+        if not buffer:
+            return
+        columns = list(zip(*buffer))
+        columns[4] = [NO_MARKER if marker is None else marker for marker in columns[4]]
+        columns[5] = [naive_utc(value) for value in columns[5]]
+        columns[6] = [naive_utc(value) for value in columns[6]]
+        for field, values in zip(ARCHIVE_FIELDS, columns):
+            chunks[field].append(np.array(values, dtype=ARCHIVE_DTYPES[field]))
+        buffer.clear()
+
+    for row in rows.iterator(chunk_size=ARCHIVE_READ_CHUNK_SIZE):
+        buffer.append(row)
+        if len(buffer) >= ARCHIVE_READ_CHUNK_SIZE:
+            flush()
+    flush()
+    return {
+        field: np.concatenate(parts) if parts else np.array([], dtype=ARCHIVE_DTYPES[field])
+        for field, parts in chunks.items()
+    }
+
+
+def write_archive(path, columns):
+    """Write the columns next to their final place and move them there in one step."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = path.with_name(path.name + '.partial')
+    with open(partial, 'wb') as output:
+        np.savez_compressed(output, **columns)
+        output.flush()
+        os.fsync(output.fileno())
+    os.replace(partial, path)
+
+
+def archive_year(year):
+    """
+    Move the year's attendance into its archive file and delete the rows, in
+    one transaction. Summary rows must already exist for the year's dates;
+    they are left as they are. Returns the number of archived rows.
+    """
+    if is_archived(date(year, 1, 1)):
+        raise ValueError(f'{year} is already archived')
+    with transaction.atomic():
+        columns = read_year_columns(year)
+        write_archive(archive_path(year), columns)
+        AttendanceArchive.objects.create(year=year, rows=len(columns['id']))
+        # Nothing references attendance rows, so they are deleted in one
+        # statement, without loading a year of them to send delete signals;
+        # the archive command invalidates cached responses itself.
+        rows = Attendance.objects.filter(date__range=[date(year, 1, 1), date(year, 12, 31)])
+        rows._raw_delete(rows.db)
+    return len(columns['id'])
+
+
+@lru_cache(maxsize=ARCHIVE_CACHE_YEARS)
+def load_columns(path, modified):
+    with np.load(path) as archive:
+        return {field: archive[field] for field in ARCHIVE_FIELDS}
+
+
+def year_columns(year):
+    path = archive_path(year)
+    return load_columns(str(path), path.stat().st_mtime_ns)
+
+
+def split_period(start_date, end_date):
+    """
+    Split a date range into `(start, end, archived)` segments in date order:
+    whole archived years, and the stretches of the table between them.
+    """
+    archived = archived_years(start_date.year, end_date.year)
+    if not archived:
+        return [(start_date, end_date, False)]
+    segments = []
+    hot_start = None
+    for year in range(start_date.year, end_date.year + 1):
+        first = max(start_date, date(year, 1, 1))
+        last = min(end_date, date(year, 12, 31))
+        if year in archived:
+            if hot_start is not None:
+                segments.append((hot_start, first - timedelta(days=1), False))
+                hot_start = None
+            segments.append((first, last, True))
+        elif hot_start is None:
+            hot_start = first
+    if hot_start is not None:
+        segments.append((hot_start, end_date, False))
+    return segments
+
+
+def has_archived(segments):
+    return any(archived for _, _, archived in segments)
+
+
+def archived_slice(start_date, end_date):
+    """Columns of the archived rows in the range, or None when there are none."""
+    columns = year_columns(start_date.year)
+    lo, hi = np.searchsorted(
+        columns['date'], [np.datetime64(start_date), np.datetime64(end_date + timedelta(days=1))]
+    )
+    if lo == hi:
+        return None
+    return {field: values[lo:hi] for field, values in columns.items()}
+
+
+def employee_details(ids):
+    """`id -> (username, first_name, last_name, email)` for the employees that still exist."""
+    return {
+        row[0]: row[1:]
+        for row in Employee.objects.filter(id__in=[int(pk) for pk in ids]).values_list(
+            'id', 'username', 'first_name', 'last_name', 'email'
+        ).iterator(chunk_size=ARCHIVE_READ_CHUNK_SIZE)
+    }
+
+
+def existing_employees(ids):
+    """Mask of the entries of the `ids` array whose employee still exists."""
+    unique = np.unique(ids)
+    existing = Employee.objects.filter(id__in=unique.tolist()).values_list('id', flat=True)
+    return np.isin(ids, np.fromiter(existing, dtype=np.int64, count=-1))
+
+
+def to_aware(values):
+    return [value.replace(tzinfo=dt_timezone.utc) for value in values.astype(datetime)]
+
+
+def archived_day_rows(columns, a, b, employees):
+    """
+    The rows `a:b` of one day as dicts with the keys of ATTENDANCE_VALUES
+    and EXPORT_FIELDS. Rows of deleted employees are dropped, as the
+    database cascade would have done.
+    """
+    days = columns['date'][a:b].astype(date)
+    created_at = to_aware(columns['created_at'][a:b])
+    updated_at = to_aware(columns['updated_at'][a:b])
+    rows = []
+    for i, index in enumerate(range(a, b)):
+        employee = employees.get(int(columns['employee_id'][index]))
+        if employee is None:
+            continue
+        marker_id = int(columns['created_by_id'][index])
+        marker = employees.get(marker_id) if marker_id != NO_MARKER else None
+        username, first_name, last_name, email = employee
+        rows.append({
+            'id': int(columns['id'][index]),
+            'employee': int(columns['employee_id'][index]),
+            'employee__username': username,
+            'employee__first_name': first_name,
+            'employee__last_name': last_name,
+            'employee__email': email,
+            'date': days[i],
+            'is_present': bool(columns['is_present'][index]),
+            'created_by': marker_id if marker is not None else None,
+            'created_by__username': marker[0] if marker is not None else None,
+            'created_at': created_at[i],
+            'updated_at': updated_at[i],
+        })
+    return rows
+
+
+def iter_archived_values(start_date, end_date, after=None, reverse=False, key=None):
+    """
+    Archived rows of a range within one year, ordered like the attendance
+    list (date, first name, id) or the reverse, one day at a time. With
+    `after`, only rows whose `key(row)` comes after it are yielded.
+    """
+    columns = archived_slice(start_date, end_date)
+    if columns is None:
+        return
+    dates = columns['date']
+    if after is not None:
+        cursor_day = np.datetime64(after[0])
+        cut = np.searchsorted(dates, cursor_day, side='right' if reverse else 'left')
+        columns = {field: values[cut:] if not reverse else values[:cut] for field, values in columns.items()}
+        dates = columns['date']
+        if not len(dates):
+            return
+
+    employees = employee_details(np.union1d(
+        np.unique(columns['employee_id']), np.unique(columns['created_by_id'])
+    ))
+    bounds = [0, *(np.flatnonzero(dates[1:] != dates[:-1]) + 1), len(dates)]
+    days = list(zip(bounds[:-1], bounds[1:]))
+    if reverse:
+        days.reverse()
+    for a, b in days:
+        rows = archived_day_rows(columns, a, b, employees)
+        rows.sort(key=lambda row: (row['employee__first_name'], row['id']), reverse=reverse)
+        for row in rows:
+            if after is not None:
+                row_key = key(row)
+                if (row_key <= after) if not reverse else (row_key >= after):
+                    continue
+            yield row
+
+
+def archived_attendance_counts(start_date, end_date):
+    """
+    `employee_id -> (present, absent)` over the archived part of a range.
+    Deleted employees keep entries here, but callers only look up existing ones.
+    """
+    counts = {}
+    for first, last, archived in split_period(start_date, end_date):
+        if not archived:
+            continue
+        columns = archived_slice(first, last)
+        if columns is None:
+            continue
+        for is_present, position in ((True, 0), (False, 1)):
+            ids, totals = np.unique(
+                columns['employee_id'][columns['is_present'] == is_present], return_counts=True
+            )
+            for employee_id, total in zip(ids.tolist(), totals.tolist()):
+                counts.setdefault(employee_id, [0, 0])[position] += total
+    return counts
+
+
+def archived_day_counts(day):
+    """`(present, absent)` archived for one date, for the employees that still exist."""
+    columns = archived_slice(day, day)
+    if columns is None:
+        return 0, 0
+    is_present = columns['is_present'][existing_employees(columns['employee_id'])]
+    present = int(np.count_nonzero(is_present))
+    return present, len(is_present) - present
+
+
+def archived_employee_marks(employee_id):
+    """`(date, is_present) -> rows` archived for one employee, over every archived year."""
+    marks = Counter()
+    for year in sorted(archived_years()):
+        columns = year_columns(year)
+        own = columns['employee_id'] == employee_id
+        marks.update(zip(columns['date'][own].astype(date).tolist(), columns['is_present'][own].tolist()))
+    return marks
+
+
+def iter_archived_marks(start_date, end_date):
+    """
+    `(employee_id, day offset from start_date, is_present)` for archived rows
+    in the range. Deleted employees' rows are yielded; callers match them
+    against the existing employees.
+    """
+    for first, last, archived in split_period(start_date, end_date):
+        if not archived:
+            continue
+        columns = archived_slice(first, last)
+        if columns is None:
+            continue
+        offsets = (columns['date'] - np.datetime64(start_date)).astype(np.int64)
+        yield from zip(columns['employee_id'].tolist(), offsets.tolist(), columns['is_present'].tolist())
+
+
+def period_attendances(start_date, end_date):
+    """The table's attendance for a range, in list order."""
+    return Attendance.objects.filter(
+        date__range=[start_date, end_date]
+    ).select_related('employee', 'created_by').order_by('date', 'employee__first_name', 'id')
+
+
+def iter_period_values(segments):
+    """ATTENDANCE_VALUES rows of every segment, from the table or the archive."""
+    for first, last, archived in segments:
+        if archived:
+            yield from iter_archived_values(first, last)
+        else:
+            yield from attendance_values(period_attendances(first, last)).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+
+def iter_period_export_rows(segments):
+    """EXPORT_FIELDS tuples of every segment, from the table or the archive."""
+    for first, last, archived in segments:
+        if archived:
+            for row in iter_archived_values(first, last):
+                yield tuple(row[field] for field in EXPORT_FIELDS)
+        else:
+            yield from iter_export_rows(period_attendances(first, last))
+
+
+def period_sources(segments):
+    """Row sources for `KeysetPagination.paginate_sources`, one per segment."""
+    def table(first, last):
+        return lambda paginator: paginator.seek(
+            attendance_values(period_attendances(first, last))
+        )[:paginator.page_size + 1]
+
+    def archive(first, last):
+        return lambda paginator: iter_archived_values(
+            first, last, after=paginator.cursor_values, reverse=paginator.cursor_reverse, key=paginator.get_key,
+        )
+
+    return [archive(first, last) if archived else table(first, last) for first, last, archived in segments]
+
+
+def period_row_count(segments):
+    """Number of attendance rows over the segments, from the table or the archive."""
+    total = 0
+    for first, last, archived in segments:
+        if archived:
+            columns = archived_slice(first, last)
+            total += 0 if columns is None else len(columns['id'])
+        else:
+            total += Attendance.objects.filter(date__range=[first, last]).count()
+    return total
@@ -0,0 +1,260 @@
+"""
+Async views, served by the ASGI application in `project/asgi.py`.
+
+Under ASGI these run on the event loop instead of occupying a worker thread,
+so slow clients and slow work (password hashing) do not block other requests.
+"""
+import asyncio
+import csv
+import json
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial, wraps
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import authenticate
+from django.db import close_old_connections
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from .api import login_result, is_hr_employee, parse_period, calculate_date_range, archived_period_data
+from .archive import split_period, has_archived, period_attendances, iter_period_export_rows
+from .fieldsets import (
+    EMPLOYEE_FIELDS, ATTENDANCE_FIELDS, requested_fields, only_columns, attendance_columns, attendance_formatter,
+)
+from .exports import format_csv_row, Echo, EXPORT_HEADER, EXPORT_CHUNK_SIZE
+from .authentication import ClaimsJWTAuthentication
+from .models import Employee, Attendance, DailyAttendanceSummary
+from .pagination import EmployeeCursorPagination, AttendanceCursorPagination
+from .serializers import EmployeeSerializer, AttendanceSerializer
+from .search import filter_employees
+from .summary import get_summary
+
+_login_executor = None
+
+
+def get_login_executor():
+    """Bounded pool for password verification; PBKDF2 releases the GIL, so threads run in parallel."""
+    global _login_executor
+    if _login_executor is None:
+        _login_executor = ThreadPoolExecutor(
+            max_workers=settings.LOGIN_HASH_WORKERS, thread_name_prefix='login-hash'
+        )
+    return _login_executor
+
+
+def authenticate_in_pool(username, password):
+    """Run in a pool thread, which owns its own database connection."""
+    close_old_connections()
+    try:
+        return authenticate(username=username, password=password)
+    finally:
+        close_old_connections()
+
+
+def read_credentials(request):
+    if request.content_type == 'application/json':
+        try:
+            data = json.loads(request.body or b'{}')
+        except ValueError:
+            return None, None
+        if not isinstance(data, dict):
+            return None, None
+        return data.get('username'), data.get('password')
+    return request.POST.get('username'), request.POST.get('password')
+
+
+@csrf_exempt
+@require_POST
+async def login_view_async(request):
+    """Login view for HR employees that verifies the password off the event loop."""
+    username, password = read_credentials(request)
+    if username is None or password is None:
+        return JsonResponse({'error': 'Invalid credentials'}, status=status.HTTP_401_UNAUTHORIZED)
+
+    loop = asyncio.get_running_loop()
+    user = await loop.run_in_executor(get_login_executor(), authenticate_in_pool, username, password)
+    data, code = login_result(user)
+    return JsonResponse(data, status=code)
+
+
+def error_response(exc):
+    detail = exc.detail if isinstance(exc.detail, dict) else {'detail': exc.detail}
+    return JsonResponse(detail, status=exc.status_code)
+
+
+def hr_required(view):
+    """Authenticate the JWT as the DRF views do and allow HR employees only."""
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        try:
+            result = await sync_to_async(ClaimsJWTAuthentication().authenticate)(request)
+        except APIException as exc:
+            return error_response(exc)
+        if result is None:
+            return JsonResponse(
+                {'detail': 'Authentication credentials were not provided.'}, status=status.HTTP_401_UNAUTHORIZED
+            )
+        request.user, request.auth = result
+        if not is_hr_employee(request.user):
+            return JsonResponse({'error': 'Not authorized'}, status=status.HTTP_403_FORBIDDEN)
+        try:
+            return await view(request, *args, **kwargs)
+        except APIException as exc:
+            return error_response(exc)
+    return wrapper
+
+
+async def get_summary_async(date):
+    summary = await DailyAttendanceSummary.objects.filter(date=date).afirst()
+    if summary is None:
+        summary = await sync_to_async(get_summary)(date)
+    return summary
+
+
+async def get_recent_activities():
+    recent_attendances = Attendance.objects.select_related('employee', 'created_by').order_by('-created_at')[:10]
+    return [
+        {
+            'id': attendance.id,
+            'type': 'attendance',
+            'description': f"{attendance.created_by.username} marked {attendance.employee.username} as {'present' if attendance.is_present else 'absent'}",
+            'timestamp': attendance.created_at.isoformat(),
+        }
+        async for attendance in recent_attendances
+    ]
+
+
+@require_GET
+@hr_required
+async def dashboard_async(request):
+    """
+    HR dashboard. The two reads are awaited in turn: async ORM calls share
+    one thread, so gathering them would not overlap their queries.
+    """
+    summary = await get_summary_async(timezone.now().date())
+    activities = await get_recent_activities()
+    return JsonResponse({
+        'total_employees': summary.total_employees,
+        'present_today': summary.present,
+        'absent_today': summary.absent,
+        'recent_activities': activities,
+    })
+
+
+async def paginated_or_all(paginator, queryset, serializer_class, request):
+    if paginator.is_requested(request):
+        page = await paginator.apaginate_queryset(queryset, request)
+        return JsonResponse(paginator.get_paginated_data(serializer_class(page, many=True).data))
+    rows = [row async for row in queryset.aiterator(chunk_size=EXPORT_CHUNK_SIZE)]
+    return JsonResponse(serializer_class(rows, many=True).data, safe=False)
+
+
+@require_GET
+@hr_required
+async def employee_list_async(request):
+    """List employees, optionally filtered and searched."""
+    try:
+        employees = filter_employees(Employee.objects.all(), request.GET)
+        fields = requested_fields(request.GET, EMPLOYEE_FIELDS)
+    except ValueError as exc:
+        return JsonResponse({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+    if fields is not None:
+        employees = only_columns(employees, ['id', *fields])
+    serializer_class = partial(EmployeeSerializer, fields=fields)
+    return await paginated_or_all(EmployeeCursorPagination(), employees, serializer_class, request)
+
+
+@require_GET
+@hr_required
+async def employee_detail_async(request, pk):
+    """Retrieve an employee."""
+    try:
+        fields = requested_fields(request.GET, EMPLOYEE_FIELDS)
+    except ValueError as exc:
+        return JsonResponse({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+    employees = Employee.objects.all() if fields is None else only_columns(Employee.objects.all(), fields)
+    try:
+        employee = await employees.aget(pk=pk)
+    except Employee.DoesNotExist:
+        return JsonResponse({'error': 'Employee not found'}, status=status.HTTP_404_NOT_FOUND)
+    return JsonResponse(EmployeeSerializer(employee, fields=fields).data)
+
+
+async def iterate_in_chunks(rows, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Drive a lazy sync iterator over database rows from the thread-sensitive
+    executor, a chunk at a time. QuerySet.aiterator() cannot be used here: on
+    Django 5.0 it runs the query of a values_list() queryset on the event
+    loop and fails, and archived rows do not come from a queryset at all.
+    """
+    rows = iter(rows)
+    next_chunk = sync_to_async(lambda: list(islice(rows, chunk_size)))
+    while chunk := await next_chunk():
+        for row in chunk:
+            yield row
+
+
+async def stream_attendance_csv(rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(EXPORT_HEADER)
+    async for row in iterate_in_chunks(rows):
+        yield writer.writerow(format_csv_row(row))
+
+
+@require_GET
+@hr_required
+async def attendance_list_async(request):
+    """List attendances for a period, or stream them as CSV."""
+    export_format = request.GET.get('export')
+
+    try:
+        date, period = parse_period(request.GET)
+    except ValueError:
+        return JsonResponse({'error': 'Invalid date format'}, status=status.HTTP_400_BAD_REQUEST)
+
+    start_date, end_date = calculate_date_range(date, period)
+    segments = await sync_to_async(split_period)(start_date, end_date)
+
+    if export_format == 'csv':
+        rows = iter_period_export_rows(segments)
+        response = StreamingHttpResponse(stream_attendance_csv(rows), content_type='text/csv')
+        response['Content-Disposition'] = f'attachment; filename="attendance_{period}_{date}.csv"'
+        return response
+    try:
+        fields = requested_fields(request.GET, ATTENDANCE_FIELDS)
+    except ValueError as exc:
+        return JsonResponse({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+    if has_archived(segments):
+        data = await sync_to_async(archived_period_data)(request, segments, attendance_formatter(fields))
+        return JsonResponse(data, safe=False)
+
+    paginator = AttendanceCursorPagination()
+    attendances = period_attendances(start_date, end_date)
+    if fields is not None:
+        attendances = only_columns(attendances, [*attendance_columns(fields), *paginator.ordering])
+    serializer_class = partial(AttendanceSerializer, fields=fields)
+    return await paginated_or_all(paginator, attendances, serializer_class, request)
+
+
+@require_GET
+@hr_required
+async def attendance_detail_async(request, pk):
+    """Retrieve an attendance record."""
+    try:
+        fields = requested_fields(request.GET, ATTENDANCE_FIELDS)
+    except ValueError as exc:
+        return JsonResponse({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+    attendances = Attendance.objects.select_related('employee', 'created_by')
+    if fields is not None:
+        attendances = only_columns(attendances, attendance_columns(fields))
+    try:
+        attendance = await attendances.aget(pk=pk)
+    except Attendance.DoesNotExist:
+        return JsonResponse({'error': 'Attendance not found'}, status=status.HTTP_404_NOT_FOUND)
+    return JsonResponse(AttendanceSerializer(attendance, fields=fields).data)
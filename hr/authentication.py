@@ -0,0 +1,86 @@
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from .models import Employee
+
+EMPLOYEE_TYPE_CLAIM = 'employee_type'
+TOKEN_VERSION_CLAIM = 'token_version'
+TOKEN_VERSION_KEY = 'hr:token-version:{}'
+REVOKED = -1
+# Processes other than the one that changed an employee see the new version
+# after at most this long.
+TOKEN_VERSION_TIMEOUT = 30
+
+
+class HRRefreshToken(RefreshToken):
+    """Refresh token carrying the employee type and token version, copied into its access tokens."""
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token[EMPLOYEE_TYPE_CLAIM] = user.employee_type
+        token[TOKEN_VERSION_CLAIM] = user.token_version
+        return token
+
+
+class HRTokenUser(TokenUser):
+    """Stateless user built from the token claims."""
+
+    @property
+    def employee_type(self):
+        return self.token.get(EMPLOYEE_TYPE_CLAIM)
+
+
+def get_token_version(user_id):
+    """Current token version of an employee, or REVOKED if it is gone or inactive."""
+    key = TOKEN_VERSION_KEY.format(user_id)
+    version = cache.get(key)
+    if version is None:
+        version = Employee.objects.filter(pk=user_id, is_active=True).values_list(
+            'token_version', flat=True
+        ).first()
+        version = REVOKED if version is None else version
+        cache.set(key, version, TOKEN_VERSION_TIMEOUT)
+    return version
+
+
+def forget_token_version(user_id):
+    """Drop this process's cached version now, and again once the transaction commits."""
+    key = TOKEN_VERSION_KEY.format(user_id)
+    cache.delete(key)
+    transaction.on_commit(lambda: cache.delete(key))
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    Trust the employee type in the token for read requests instead of loading
+    the employee. The token version is checked against a cached copy, so a
+    role change revokes older tokens. Writes still load the full employee,
+    since they record who made them.
+    """
+    trust_claims = False
+
+    def authenticate(self, request):
+        self.trust_claims = request.method in SAFE_METHODS
+        return super().authenticate(request)
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        has_claims = TOKEN_VERSION_CLAIM in validated_token and EMPLOYEE_TYPE_CLAIM in validated_token
+        if self.trust_claims and has_claims and user_id is not None:
+            self.check_version(validated_token, get_token_version(user_id))
+            return HRTokenUser(validated_token)
+
+        user = super().get_user(validated_token)
+        if TOKEN_VERSION_CLAIM in validated_token:
+            self.check_version(validated_token, user.token_version)
+        return user
+
+    def check_version(self, validated_token, current_version):
+        if validated_token[TOKEN_VERSION_CLAIM] != current_version:
+            raise AuthenticationFailed('Token has been revoked', code='token_revoked')
@@ -0,0 +1,33 @@
+"""
+SQLite backend of the embedded deployment mode (`DATABASE_URL=sqlite:///...`).
+
+Every new connection gets the pragmas listed in OPTIONS['pragmas'] (WAL
+journaling, fewer fsyncs, a larger page cache and a memory map), and
+transactions start with BEGIN IMMEDIATE. A deferred transaction that reads
+before it writes fails with "database is locked" at its first write when
+another process committed in between, without waiting out the busy timeout;
+taking the write lock up front makes concurrent writers queue on the
+timeout instead. Reads outside transaction.atomic() are unaffected, and WAL
+lets them run while a write is in progress.
+"""
+from django.db.backends.sqlite3 import base
+
+from .creation import DatabaseCreation
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    creation_class = DatabaseCreation
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        params.pop('pragmas', None)
+        return params
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for name, value in self.settings_dict['OPTIONS'].get('pragmas', {}).items():
+            conn.execute(f'PRAGMA {name} = {value}')
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute('BEGIN IMMEDIATE')
@@ -0,0 +1,26 @@
+import os
+from contextlib import suppress
+
+from django.db.backends.sqlite3 import creation
+
+WAL_FILE_SUFFIXES = ('-wal', '-shm')
+
+
+class DatabaseCreation(creation.DatabaseCreation):
+    """Also removes the WAL files of the test database, which a new database of the same name must not inherit."""
+
+    def remove_wal_files(self, database_name):
+        for suffix in WAL_FILE_SUFFIXES:
+            with suppress(FileNotFoundError):
+                os.remove(f'{database_name}{suffix}')
+
+    def _create_test_db(self, verbosity, autoclobber, keepdb=False):
+        test_database_name = self._get_test_db_name()
+        if not keepdb and not self.is_in_memory_db(test_database_name):
+            self.remove_wal_files(test_database_name)
+        return super()._create_test_db(verbosity, autoclobber, keepdb)
+
+    def _destroy_test_db(self, test_database_name, verbosity):
+        super()._destroy_test_db(test_database_name, verbosity)
+        if not self.is_in_memory_db(test_database_name):
+            self.remove_wal_files(test_database_name)
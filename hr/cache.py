@@ -0,0 +1,94 @@
+import hashlib
+import threading
+from collections import Counter
+from functools import wraps
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+DATA_VERSION_KEY = 'hr:data-version'
+RESPONSE_KEY_PREFIX = 'hr:response'
+RESPONSE_TIMEOUT = 60 * 60
+
+_stats = Counter()
+_stats_lock = threading.Lock()
+
+
+def get_data_version():
+    """Current version of the Employee/Attendance data; cached responses are keyed by it."""
+    version = cache.get(DATA_VERSION_KEY)
+    if version is None:
+        cache.add(DATA_VERSION_KEY, 1, timeout=None)
+        version = cache.get(DATA_VERSION_KEY, 1)
+    return version
+
+
+def _bump():
+    try:
+        cache.incr(DATA_VERSION_KEY)
+    except ValueError:
+        cache.add(DATA_VERSION_KEY, 2, timeout=None)
+
+
+def bump_data_version():
+    """
+    Invalidate every cached response now, and again once the current
+    transaction commits, since a read racing the commit may have cached
+    pre-commit data under the intermediate version.
+    """
+    _bump()
+    transaction.on_commit(_bump)
+
+
+def record(event):
+    with _stats_lock:
+        _stats[event] += 1
+
+
+def get_cache_stats():
+    with _stats_lock:
+        hits, misses = _stats['hit'], _stats['miss']
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': round(hits / (hits + misses), 4) if hits + misses else 0.0,
+        'data_version': get_data_version(),
+    }
+
+
+def response_cache_key(request):
+    """Key on the data version, today's date (default periods) and the full request URL."""
+    url = hashlib.md5(request.build_absolute_uri().encode('utf-8')).hexdigest()
+    return f'{RESPONSE_KEY_PREFIX}:{get_data_version()}:{timezone.now().date()}:{url}'
+
+
+def cache_get_response(is_allowed):
+    """
+    Cache successful GET responses of a function view until the data version
+    changes. `is_allowed(user)` runs before the cache is consulted.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method != 'GET' or not is_allowed(request.user):
+                return view(request, *args, **kwargs)
+
+            key = response_cache_key(request)
+            data = cache.get(key)
+            if data is not None:
+                record('hit')
+                response = Response(data)
+                response['X-Cache'] = 'HIT'
+                return response
+
+            record('miss')
+            response = view(request, *args, **kwargs)
+            if isinstance(response, Response) and response.status_code == status.HTTP_200_OK:
+                cache.set(key, response.data, RESPONSE_TIMEOUT)
+            response['X-Cache'] = 'MISS'
+            return response
+        return wrapper
+    return decorator
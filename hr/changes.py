@@ -0,0 +1,158 @@
+"""
+Changes feed for offline clients: the rows changed after a cursor, in
+(updated_at, id) order, and the ids of rows hard-deleted since, read from
+Tombstone records.
+
+Rows are only reported once they are SYNC_SETTLE_SECONDS old, so a
+transaction that commits after a later-stamped one is not skipped by a
+cursor that already moved past its timestamp.
+"""
+import base64
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .fastpath import EMPLOYEE_VALUES
+from .fieldsets import attendance_columns, attendance_formatter, pick
+from .models import Attendance, Employee, Tombstone
+from .pagination import KeysetPagination
+
+# Attendance rows carry ids only; clients take usernames from the employee feed.
+ATTENDANCE_CHANGE_FIELDS = ('id', 'employee', 'date', 'is_present', 'created_by', 'created_at', 'updated_at')
+# Ids in a cursor must fit the 64-bit primary keys.
+MIN_ID, MAX_ID = -2 ** 63, 2 ** 63 - 1
+
+
+class CursorExpired(Exception):
+    """The cursor needs tombstones older than the ones kept, so deletions may have been missed."""
+
+
+class ChangeKeyset(KeysetPagination):
+    ordering = ('updated_at', 'id')
+
+
+class TombstoneKeyset(KeysetPagination):
+    ordering = ('deleted_at', 'id')
+
+
+FEEDS = {
+    'attendance': (
+        Attendance.objects.all,
+        attendance_columns(ATTENDANCE_CHANGE_FIELDS),
+        attendance_formatter(ATTENDANCE_CHANGE_FIELDS),
+    ),
+    'employee': (
+        Employee.objects.all,
+        (*EMPLOYEE_VALUES, 'updated_at'),
+        lambda row: pick(row, EMPLOYEE_VALUES),
+    ),
+}
+
+
+def record_deletions(kind, ids):
+    Tombstone.objects.bulk_create([Tombstone(kind=kind, object_id=object_id) for object_id in ids])
+
+
+def record_employee_deletion(employee):
+    """
+    Tombstones for an employee and the attendance deleted along with them.
+    The rows they marked lose their marker, which the feed must report as a
+    change, so those are updated here rather than by the SET_NULL cascade.
+    """
+    record_deletions('employee', [employee.pk])
+    record_deletions('attendance', Attendance.objects.filter(employee=employee).values_list('id', flat=True))
+    Attendance.objects.filter(created_by=employee).exclude(employee=employee).update(
+        created_by=None, updated_at=timezone.now(),
+    )
+
+
+def encode_cursor(changed, deleted, synced):
+    """
+    `changed` and `deleted` are the last (timestamp, id) positions reported
+    of each stream; every deletion up to `synced` has been reported.
+    """
+    payload = {'c': changed, 'd': deleted, 's': synced.isoformat()}
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(',', ':')).encode('utf-8')).decode('ascii')
+
+
+def parse_position(position):
+    """A `[timestamp, id]` position from a cursor, checked and normalised, or None."""
+    if position is None:
+        return None
+    if not isinstance(position, list) or len(position) != 2:
+        raise ValueError('Invalid position')
+    timestamp, pk = parse_datetime(position[0]), int(position[1])
+    if timestamp is None or timezone.is_naive(timestamp) or not MIN_ID <= pk <= MAX_ID:
+        raise ValueError('Invalid position')
+    return [timestamp.isoformat(), pk]
+
+
+def decode_cursor(encoded):
+    """`(changed position, deleted position)`; raises ValueError or CursorExpired."""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')).decode('utf-8'))
+        changed, deleted = parse_position(payload['c']), parse_position(payload['d'])
+        synced = parse_datetime(payload['s'])
+    except (TypeError, ValueError, KeyError, UnicodeError, OverflowError):
+        raise ValueError('Invalid cursor')
+    if synced is None:
+        raise ValueError('Invalid cursor')
+    if synced < timezone.now() - timedelta(days=settings.SYNC_TOMBSTONE_DAYS):
+        raise CursorExpired()
+    return changed, deleted
+
+
+def after(queryset, keyset, position, limit):
+    """Up to `limit + 1` rows of the queryset past `position` in the keyset's order."""
+    if position is not None:
+        queryset = queryset.filter(keyset.keyset_filter(position, reverse=False))
+    return queryset.order_by(*keyset.ordering)[:limit + 1]
+
+
+def read_changes(kind, encoded_cursor, limit):
+    """
+    One page of the `kind` feed: up to `limit` changed rows and deleted ids
+    past the cursor, the cursor to continue from, and whether more remain.
+    Without a cursor, every row is reported and deletions start from now.
+    """
+    get_queryset, columns, format_row = FEEDS[kind]
+    horizon = timezone.now() - timedelta(seconds=settings.SYNC_SETTLE_SECONDS)
+    tombstones = Tombstone.objects.filter(kind=kind, deleted_at__lte=horizon)
+    if encoded_cursor:
+        changed_after, deleted_after = decode_cursor(encoded_cursor)
+    else:
+        changed_after = None
+        last = tombstones.order_by('-deleted_at', '-id').values_list('deleted_at', 'id').first()
+        deleted_after = [last[0].isoformat(), last[1]] if last else None
+
+    changed = list(after(
+        get_queryset().filter(updated_at__lte=horizon).values(*columns), ChangeKeyset(), changed_after, limit,
+    ))
+    deleted = list(after(
+        tombstones.values_list('deleted_at', 'id', 'object_id', named=True), TombstoneKeyset(), deleted_after, limit,
+    ))
+    more_deleted = len(deleted) > limit
+    has_more = len(changed) > limit or more_deleted
+    changed, deleted = changed[:limit], deleted[:limit]
+
+    if changed:
+        changed_after = [changed[-1]['updated_at'].isoformat(), changed[-1]['id']]
+    if deleted:
+        deleted_after = [deleted[-1].deleted_at.isoformat(), deleted[-1].id]
+    synced = deleted[-1].deleted_at if more_deleted else horizon
+    return {
+        'changed': [format_row(row) for row in changed],
+        'deleted': sorted({tombstone.object_id for tombstone in deleted}),
+        'cursor': encode_cursor(changed_after, deleted_after, synced),
+        'has_more': has_more,
+    }
+
+
+def prune_tombstones():
+    """Delete tombstones no valid cursor can still need; returns how many."""
+    cutoff = timezone.now() - timedelta(days=settings.SYNC_TOMBSTONE_DAYS)
+    deleted, _ = Tombstone.objects.filter(deleted_at__lt=cutoff).delete()
+    return deleted
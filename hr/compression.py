@@ -0,0 +1,174 @@
+"""
+Response compression negotiated from Accept-Encoding: brotli when the
+optional `brotli` package is installed and the client accepts it, gzip
+otherwise.
+
+Streaming responses (CSV exports) are compressed as they are produced, in
+blocks of STREAM_BLOCK_SIZE bytes: flushing after every small chunk, as
+Django's GZipMiddleware does, costs most of the ratio on row-per-chunk CSV.
+"""
+import zlib
+
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+# Formats that are already compressed (XLSX is a zip) are left alone.
+COMPRESSIBLE_TYPES = ('text/', 'application/json', 'application/javascript', 'application/xml')
+MIN_LENGTH = 200
+STREAM_BLOCK_SIZE = 16 * 1024
+GZIP_LEVEL = 6
+# Quality 11 is meant for static assets; 5 keeps dynamic responses fast.
+BROTLI_QUALITY = 5
+# Server preference among codings the client rates equally.
+PREFERENCE = ('br', 'gzip')
+EXTENSIONS = {'br': 'br', 'gzip': 'gz'}
+
+
+class GzipEncoder:
+    def __init__(self):
+        self.compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, data):
+        return self.compressor.compress(data)
+
+    def flush(self):
+        return self.compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self.compressor.flush()
+
+
+class BrotliEncoder:
+    def __init__(self):
+        self.compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+
+    def compress(self, data):
+        return self.compressor.process(data)
+
+    def flush(self):
+        return self.compressor.flush()
+
+    def finish(self):
+        return self.compressor.finish()
+
+
+ENCODERS = {'gzip': GzipEncoder}
+if brotli is not None:
+    ENCODERS['br'] = BrotliEncoder
+
+
+def parse_accept_encoding(header):
+    """`{coding: q}` from an Accept-Encoding header."""
+    accepted = {}
+    for item in header.split(','):
+        coding, _, params = item.strip().partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding] = q
+    return accepted
+
+
+def negotiate_encoding(request):
+    """'br', 'gzip' or None, by the client's preferences and what is available."""
+    accepted = parse_accept_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+    candidates = [
+        (accepted.get(coding, accepted.get('*', 0.0)), -PREFERENCE.index(coding), coding)
+        for coding in PREFERENCE if coding in ENCODERS
+    ]
+    q, _, coding = max(candidates)
+    return coding if q > 0 else None
+
+
+def compress_bytes(data, coding):
+    encoder = ENCODERS[coding]()
+    return encoder.compress(data) + encoder.finish()
+
+
+def compress_stream(chunks, coding):
+    """Compress an iterable of byte strings, emitting a block every STREAM_BLOCK_SIZE input bytes."""
+    encoder = ENCODERS[coding]()
+    pending = 0
+    for chunk in chunks:
+        output = encoder.compress(chunk)
+        pending += len(chunk)
+        if pending >= STREAM_BLOCK_SIZE:
+            output += encoder.flush()
+            pending = 0
+        if output:
+            yield output
+    yield encoder.finish()
+
+
+async def acompress_stream(chunks, coding):
+    """compress_stream for async iterables."""
+    encoder = ENCODERS[coding]()
+    pending = 0
+    async for chunk in chunks:
+        output = encoder.compress(chunk)
+        pending += len(chunk)
+        if pending >= STREAM_BLOCK_SIZE:
+            output += encoder.flush()
+            pending = 0
+        if output:
+            yield output
+    yield encoder.finish()
+
+
+def is_compressible(response):
+    if response.has_header('Content-Encoding') or response.has_header('Content-Range'):
+        return False
+    # Ranges of a resumable download refer to the uncompressed bytes.
+    if response.get('Accept-Ranges', 'none') != 'none':
+        return False
+    return response.get('Content-Type', '').startswith(COMPRESSIBLE_TYPES)
+
+
+def weaken_etag(response):
+    """The compressed body is not byte-identical to the one the ETag was made for."""
+    etag = response.get('ETag')
+    if etag and etag.startswith('"'):
+        response.headers['ETag'] = 'W/' + etag
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """Compresses text and JSON responses with the best coding the client accepts."""
+
+    def process_response(self, request, response):
+        if not response.streaming and len(response.content) < MIN_LENGTH:
+            return response
+        if not is_compressible(response):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        coding = negotiate_encoding(request)
+        if coding is None:
+            return response
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = acompress_stream(response.streaming_content, coding)
+            else:
+                response.streaming_content = compress_stream(response.streaming_content, coding)
+            del response.headers['Content-Length']
+        else:
+            compressed = compress_bytes(response.content, coding)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers['Content-Length'] = str(len(compressed))
+
+        weaken_etag(response)
+        response.headers['Content-Encoding'] = coding
+        return response
@@ -0,0 +1,60 @@
+import hashlib
+from functools import wraps
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+
+def make_etag(*parts):
+    """Strong ETag over the given parts."""
+    return '"%s"' % hashlib.md5('|'.join(str(part) for part in parts).encode('utf-8')).hexdigest()
+
+
+def latest(*values):
+    """Most recent of the given datetimes, ignoring missing ones."""
+    values = [value for value in values if value is not None]
+    return max(values) if values else None
+
+
+def not_modified(request, etag, last_modified):
+    """A 304 response if the request's If-None-Match/If-Modified-Since still hold, else None."""
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if response is not None:
+        set_validators(response, etag, last_modified)
+    return response
+
+
+def set_validators(response, etag, last_modified):
+    if response.status_code not in (200, 304):
+        return response
+    response['ETag'] = etag
+    if last_modified:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    return response
+
+
+def conditional_get(validators, is_allowed):
+    """
+    Answer GET requests with 304 before the view runs when the client's copy
+    is current. `validators(request, *args, **kwargs)` returns
+    `(etag, last_modified)` from a cheap aggregate, or None to skip the check.
+    `is_allowed(user)` runs first, so unauthorized users always reach the view.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method != 'GET' or not is_allowed(request.user):
+                return view(request, *args, **kwargs)
+
+            found = validators(request, *args, **kwargs)
+            if found is None:
+                return view(request, *args, **kwargs)
+
+            etag, last_modified = found
+            response = not_modified(request, etag, last_modified)
+            if response is not None:
+                return response
+            return set_validators(view(request, *args, **kwargs), etag, last_modified)
+        return wrapper
+    return decorator
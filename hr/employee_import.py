@@ -0,0 +1,196 @@
+import csv
+import io
+from concurrent.futures import ProcessPoolExecutor
+from zipfile import BadZipFile
+
+import django
+from django.contrib.auth.hashers import make_password
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from openpyxl import load_workbook
+from openpyxl.utils.exceptions import InvalidFileException
+
+from .cache import bump_data_version
+from .models import Employee
+from .serializers import EmployeeImportRowSerializer
+from .summary import record_headcount
+
+IMPORT_COLUMNS = ('username', 'email', 'password', 'employee_type', 'first_name', 'last_name')
+IMPORT_BATCH_SIZE = 500
+
+
+class ImportFormatError(ValueError):
+    """The uploaded file is not a CSV or XLSX file we can read."""
+
+
+def iter_csv_rows(file):
+    text = io.TextIOWrapper(file, encoding='utf-8-sig', newline='')
+    try:
+        for line, row in enumerate(csv.DictReader(text), start=2):
+            yield line, row
+    except UnicodeDecodeError:
+        raise ImportFormatError('Expected a UTF-8 encoded CSV file') from None
+    except csv.Error as exc:
+        raise ImportFormatError(f'Invalid CSV file: {exc}') from None
+    finally:
+        # Leave closing the underlying file to the caller.
+        text.detach()
+
+
+def iter_xlsx_rows(file):
+    try:
+        workbook = load_workbook(file, read_only=True, data_only=True)
+    except (BadZipFile, InvalidFileException, KeyError):
+        # KeyError: a zip file without the parts of a workbook.
+        raise ImportFormatError('Expected a valid .xlsx file') from None
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [str(cell).strip() if cell is not None else '' for cell in next(rows, ())]
+        for line, values in enumerate(rows, start=2):
+            if all(value is None for value in values):
+                continue
+            yield line, {
+                column: '' if value is None else str(value)
+                for column, value in zip(header, values)
+            }
+    finally:
+        workbook.close()
+
+
+def iter_import_rows(file, filename):
+    """Yield `(line number, row dict)` from a CSV or XLSX file without loading it whole."""
+    name = (filename or '').lower()
+    if name.endswith('.csv'):
+        return iter_csv_rows(file)
+    if name.endswith('.xlsx'):
+        return iter_xlsx_rows(file)
+    raise ImportFormatError('Expected a .csv or .xlsx file')
+
+
+def init_hash_worker():
+    # Spawned workers (non-fork platforms) need Django set up to read the hashers.
+    django.setup()
+
+
+_hash_executors = {}
+
+
+def get_hash_executor(workers):
+    """
+    Process pool for password hashing, or None to hash in this process. The
+    pool is started once per process and size, and kept for later imports:
+    starting processes on every request costs more than the hashing saves.
+    """
+    if workers <= 1:
+        return None
+    if workers not in _hash_executors:
+        _hash_executors[workers] = ProcessPoolExecutor(max_workers=workers, initializer=init_hash_worker)
+    return _hash_executors[workers]
+
+
+def hash_passwords(passwords, executor):
+    if executor is None:
+        return [make_password(password) for password in passwords]
+    chunksize = max(1, len(passwords) // (executor._max_workers * 4))
+    return list(executor.map(make_password, passwords, chunksize=chunksize))
+
+
+class EmployeeImporter:
+    """
+    Validate, hash and insert employees batch by batch. Uniqueness of
+    usernames and emails is checked with one query per column per batch,
+    against both the database and the rows seen earlier in the file.
+    """
+
+    def __init__(self, batch_size=IMPORT_BATCH_SIZE, executor=None):
+        self.batch_size = batch_size
+        self.executor = executor
+        self.seen_usernames = set()
+        self.seen_emails = set()
+        self.created = 0
+        self.errors = []
+
+    def run(self, rows):
+        batch = []
+        for line, row in rows:
+            batch.append((line, row))
+            if len(batch) >= self.batch_size:
+                self.import_batch(batch)
+                batch = []
+        if batch:
+            self.import_batch(batch)
+        if self.created:
+            record_headcount(self.created, since=timezone.now().date())
+            # bulk_create sends no post_save.
+            bump_data_version()
+        return self.report()
+
+    def report(self):
+        return {
+            'created': self.created,
+            'failed': len(self.errors),
+            'errors': self.errors,
+        }
+
+    def fail(self, line, errors):
+        self.errors.append({'row': line, 'errors': errors})
+
+    def import_batch(self, batch):
+        valid = []
+        for line, row in batch:
+            serializer = EmployeeImportRowSerializer(data={
+                column: (row.get(column) or '').strip() for column in IMPORT_COLUMNS if row.get(column)
+            })
+            if serializer.is_valid():
+                valid.append((line, serializer.validated_data))
+            else:
+                self.fail(line, serializer.errors)
+
+        usernames = {data['username'] for _, data in valid}
+        emails = {data['email'] for _, data in valid}
+        taken_usernames = set(Employee.objects.filter(username__in=usernames).values_list('username', flat=True))
+        taken_emails = set(Employee.objects.filter(email__in=emails).values_list('email', flat=True))
+
+        accepted = []
+        for line, data in valid:
+            errors = {}
+            if data['username'] in taken_usernames or data['username'] in self.seen_usernames:
+                errors['username'] = ['An employee with this username already exists.']
+            if data['email'] in taken_emails or data['email'] in self.seen_emails:
+                errors['email'] = ['An employee with this email already exists.']
+            if errors:
+                self.fail(line, errors)
+                continue
+            self.seen_usernames.add(data['username'])
+            self.seen_emails.add(data['email'])
+            accepted.append((line, data))
+        if not accepted:
+            return
+
+        hashes = hash_passwords([data['password'] for _, data in accepted], self.executor)
+        employees = [
+            Employee(
+                username=data['username'],
+                email=data['email'],
+                password=password_hash,
+                employee_type=data['employee_type'],
+                first_name=data.get('first_name', ''),
+                last_name=data.get('last_name', ''),
+            )
+            for (_, data), password_hash in zip(accepted, hashes)
+        ]
+        try:
+            with transaction.atomic():
+                Employee.objects.bulk_create(employees)
+        except IntegrityError:
+            # Another writer took a username or email since the check above.
+            for line, _ in accepted:
+                self.fail(line, {'non_field_errors': ['Conflicts with an employee created concurrently.']})
+            return
+        self.created += len(employees)
+
+
+def import_employees(file, filename, batch_size=IMPORT_BATCH_SIZE, workers=1):
+    """Import employees from an uploaded CSV/XLSX file and return the per-row report."""
+    executor = get_hash_executor(workers)
+    return EmployeeImporter(batch_size=batch_size, executor=executor).run(iter_import_rows(file, filename))
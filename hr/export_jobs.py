@@ -0,0 +1,223 @@
+"""
+Attendance exports generated outside the request cycle.
+
+Jobs are queued as ExportJob rows. The `run_export_worker` command claims
+them with a conditional UPDATE, so several workers can share the queue,
+writes the file under EXPORT_JOB_DIR and reports progress on the row.
+Finished jobs and their files are deleted after EXPORT_JOB_DAYS.
+"""
+import csv
+import logging
+import os
+import re
+from datetime import timedelta
+from pathlib import Path
+from uuid import uuid4
+
+from django.conf import settings
+from django.db.models import Q
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils import timezone
+
+from .archive import split_period, iter_period_export_rows, period_row_count
+from .exports import EXPORT_HEADER, XLSX_CONTENT_TYPE, format_csv_row, write_attendance_xlsx
+from .models import ExportJob
+from .periods import calculate_date_range
+
+logger = logging.getLogger(__name__)
+
+EXPORT_PROGRESS_EVERY = 5000
+# A running job whose worker has not reported progress for this long is picked up again.
+EXPORT_JOB_STALE_AFTER = timedelta(minutes=10)
+CONTENT_TYPES = {'csv': 'text/csv', 'xlsx': XLSX_CONTENT_TYPE}
+DOWNLOAD_BLOCK_SIZE = 64 * 1024
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def job_path(job):
+    return Path(settings.EXPORT_JOB_DIR) / job.file
+
+
+def download_name(job):
+    return f'attendance_{job.period}_{job.date}.{job.format}'
+
+
+def find_reusable_job(period, date, export_format, fingerprint):
+    """A queued, running or finished job for the same export of the same data, if any."""
+    jobs = ExportJob.objects.filter(
+        period=period, date=date, format=export_format, fingerprint=fingerprint,
+        status__in=[ExportJob.PENDING, ExportJob.RUNNING, ExportJob.DONE],
+    ).order_by('-created_at')
+    for job in jobs[:5]:
+        if job.status != ExportJob.DONE or job_path(job).exists():
+            return job
+    return None
+
+
+def request_export(period, date, export_format, fingerprint, user):
+    """Return `(job, created)`: an existing job for the same data, or a newly queued one."""
+    job = find_reusable_job(period, date, export_format, fingerprint)
+    if job is not None:
+        return job, False
+    return ExportJob.objects.create(
+        period=period, date=date, format=export_format, fingerprint=fingerprint, created_by=user,
+    ), True
+
+
+def claimable():
+    return Q(status=ExportJob.PENDING) | Q(
+        status=ExportJob.RUNNING, updated_at__lt=timezone.now() - EXPORT_JOB_STALE_AFTER
+    )
+
+
+def claim_next_job():
+    """Take the oldest claimable job; the conditional UPDATE keeps two workers from taking the same one."""
+    for pk in ExportJob.objects.filter(claimable()).order_by('created_at').values_list('id', flat=True)[:10]:
+        now = timezone.now()
+        claimed = ExportJob.objects.filter(claimable(), pk=pk).update(
+            status=ExportJob.RUNNING, progress=0, started_at=now, updated_at=now,
+        )
+        if claimed:
+            return ExportJob.objects.get(pk=pk)
+    return None
+
+
+def report_progress(job, rows):
+    ExportJob.objects.filter(pk=job.pk).update(progress=rows, updated_at=timezone.now())
+
+
+def counted(job, rows):
+    """Pass rows through, reporting progress every EXPORT_PROGRESS_EVERY rows."""
+    job.progress = 0
+    for row in rows:
+        job.progress += 1
+        if job.progress % EXPORT_PROGRESS_EVERY == 0:
+            report_progress(job, job.progress)
+        yield row
+
+
+def write_export(job, rows, path):
+    if job.format == 'csv':
+        with open(path, 'w', newline='', encoding='utf-8') as output:
+            writer = csv.writer(output)
+            writer.writerow(EXPORT_HEADER)
+            for row in rows:
+                writer.writerow(format_csv_row(row))
+    else:
+        with open(path, 'wb') as output:
+            write_attendance_xlsx(rows, job.period, job.date, output)
+
+
+def run_job(job):
+    """Generate the job's file and record the outcome on the job; any error fails the job, not the worker."""
+    job.file = f'export-{job.pk}.{job.format}'
+    path = job_path(job)
+    # Named per attempt: a stale job is reclaimed while its first worker may still be writing.
+    partial = path.with_name(f'{path.name}.{uuid4().hex}.partial')
+    try:
+        start_date, end_date = calculate_date_range(job.date, job.period)
+        segments = split_period(start_date, end_date)
+        job.total = period_row_count(segments)
+        ExportJob.objects.filter(pk=job.pk).update(total=job.total, updated_at=timezone.now())
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        write_export(job, counted(job, iter_period_export_rows(segments)), partial)
+        os.replace(partial, path)
+    except Exception as exc:
+        logger.exception('Export job %s failed', job.pk)
+        partial.unlink(missing_ok=True)
+        job.status = ExportJob.FAILED
+        job.error = str(exc)
+        job.file = ''
+    else:
+        job.status = ExportJob.DONE
+        job.size = path.stat().st_size
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'progress', 'file', 'size', 'error', 'finished_at', 'updated_at'])
+    return job
+
+
+def prune_export_jobs():
+    """
+    Delete jobs that finished more than EXPORT_JOB_DAYS ago with their files,
+    and partial files that old, left by workers that died; returns how many
+    jobs were deleted.
+    """
+    cutoff = timezone.now() - timedelta(days=settings.EXPORT_JOB_DAYS)
+    expired = ExportJob.objects.filter(status__in=[ExportJob.DONE, ExportJob.FAILED], finished_at__lt=cutoff)
+    for job in expired.exclude(file=''):
+        job_path(job).unlink(missing_ok=True)
+    directory = Path(settings.EXPORT_JOB_DIR)
+    if directory.is_dir():
+        for partial in directory.glob('*.partial'):
+            if partial.stat().st_mtime < cutoff.timestamp():
+                partial.unlink(missing_ok=True)
+    deleted, _ = expired.delete()
+    return deleted
+
+
+def process_next_job():
+    """Run the next queued job, if there is one; returns it."""
+    job = claim_next_job()
+    if job is not None:
+        run_job(job)
+    return job
+
+
+def parse_range(header, size):
+    """
+    `(start, end)` of a single `bytes=` range, None to send the whole file
+    (no header, or a form we do not serve), or ValueError if unsatisfiable.
+    """
+    match = RANGE_RE.match(header or '')
+    if match is None:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        start, end = max(size - int(last), 0), size - 1
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    if start > end or start >= size:
+        raise ValueError('Unsatisfiable range')
+    return start, end
+
+
+def read_range(path, start, end):
+    with open(path, 'rb') as file:
+        file.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            block = file.read(min(DOWNLOAD_BLOCK_SIZE, remaining))
+            if not block:
+                return
+            remaining -= len(block)
+            yield block
+
+
+def download_response(request, job):
+    """The job's file, or the byte range the client asked for; files never change once written."""
+    path = job_path(job)
+    size = path.stat().st_size
+    try:
+        byte_range = parse_range(request.META.get('HTTP_RANGE'), size)
+    except ValueError:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+
+    if byte_range is None:
+        response = FileResponse(
+            open(path, 'rb'), as_attachment=True, filename=download_name(job), content_type=CONTENT_TYPES[job.format],
+        )
+    else:
+        start, end = byte_range
+        response = StreamingHttpResponse(read_range(path, start, end), status=206, content_type=CONTENT_TYPES[job.format])
+        response['Content-Length'] = end - start + 1
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Disposition'] = f'attachment; filename="{download_name(job)}"'
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = f'"{job.fingerprint}-{job.pk}"'
+    return response
@@ -0,0 +1,144 @@
+import csv
+import os
+import tempfile
+from datetime import date as date_type
+from pathlib import Path
+
+from django.conf import settings
+from django.http import FileResponse, StreamingHttpResponse
+from django.utils.cache import patch_vary_headers
+from openpyxl import Workbook
+
+from .compression import EXTENSIONS, compress_stream
+
+EXPORT_HEADER = ['Date', 'Employee Name', 'Email', 'Status', 'Marked By', 'Marked At']
+EXPORT_FIELDS = (
+    'date', 'employee__first_name', 'employee__last_name', 'employee__email',
+    'is_present', 'created_by__username', 'created_at',
+)
+EXPORT_CHUNK_SIZE = 2000
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+# Workbooks are assembled in a temporary file; small ones stay in memory.
+XLSX_SPOOL_SIZE = 8 * 1024 * 1024
+
+
+class Echo:
+    """File-like object that hands back whatever is written to it."""
+
+    def write(self, value):
+        return value
+
+
+def iter_export_rows(attendances):
+    """Yield EXPORT_FIELDS tuples, fetched from the database in chunks."""
+    return attendances.values_list(*EXPORT_FIELDS).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+
+def format_csv_row(row):
+    """Turn one EXPORT_FIELDS tuple into a CSV export line."""
+    day, first_name, last_name, email, is_present, marked_by, created_at = row
+    return [
+        day,
+        f"{first_name} {last_name}",
+        email,
+        'Present' if is_present else 'Absent',
+        marked_by or '',
+        created_at.strftime('%Y-%m-%d %H:%M:%S'),
+    ]
+
+
+def format_xlsx_row(row):
+    """Like format_csv_row, but keeps dates typed; Excel has no time zones, so times are naive UTC."""
+    day, first_name, last_name, email, is_present, marked_by, created_at = row
+    return [
+        day,
+        f"{first_name} {last_name}",
+        email,
+        'Present' if is_present else 'Absent',
+        marked_by or '',
+        created_at.replace(tzinfo=None),
+    ]
+
+
+def iter_csv_lines(rows):
+    """The lines of a CSV export of EXPORT_FIELDS rows, header first."""
+    writer = csv.writer(Echo())
+    yield writer.writerow(EXPORT_HEADER)
+    for row in rows:
+        yield writer.writerow(format_csv_row(row))
+
+
+def export_attendance_to_csv(rows, period, date):
+    """Stream EXPORT_FIELDS rows as a CSV file without buffering the whole export."""
+    response = StreamingHttpResponse(iter_csv_lines(rows), content_type='text/csv')
+    response['Content-Disposition'] = f'attachment; filename="attendance_{period}_{date}.csv"'
+    return response
+
+
+def cached_compressed_csv(get_rows, period, date, key, coding):
+    """
+    Serve a CSV export compressed with `coding` from EXPORT_CACHE_DIR. The
+    file is named after `key`, which must change whenever the data does; on
+    a miss it is written from `get_rows()` and older files of the same
+    period are removed.
+    """
+    directory = Path(settings.EXPORT_CACHE_DIR)
+    suffix = f'.csv.{EXTENSIONS[coding]}'
+    path = directory / f'{key}{suffix}'
+    if not path.exists():
+        directory.mkdir(parents=True, exist_ok=True)
+        lines = (line.encode('utf-8') for line in iter_csv_lines(get_rows()))
+        # A name of its own, so concurrent misses in any thread or process
+        # never write into the same file.
+        output = tempfile.NamedTemporaryFile(dir=directory, prefix=f'{path.name}.', suffix='.partial', delete=False)
+        try:
+            with output:
+                for block in compress_stream(lines, coding):
+                    output.write(block)
+            os.replace(output.name, path)
+        except BaseException:
+            Path(output.name).unlink(missing_ok=True)
+            raise
+        period_prefix = key.rpartition('_')[0]
+        for stale in directory.glob(f'{period_prefix}_*{suffix}'):
+            if stale != path:
+                stale.unlink(missing_ok=True)
+
+    response = FileResponse(
+        open(path, 'rb'), as_attachment=True, filename=f'attendance_{period}_{date}.csv', content_type='text/csv',
+    )
+    response['Content-Encoding'] = coding
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return response
+
+
+def write_attendance_xlsx(rows, period, date, output):
+    """
+    Write EXPORT_FIELDS rows into `output` with openpyxl's write-only mode,
+    which flushes each row to disk, so memory does not grow with the row
+    count. A yearly export gets one sheet per month.
+    """
+    by_month = period == 'year'
+    workbook = Workbook(write_only=True)
+    sheets = {}
+    for month in (range(1, 13) if by_month else [None]):
+        title = date_type(date.year, month, 1).strftime('%Y-%m') if by_month else period.capitalize()
+        sheets[month] = workbook.create_sheet(title)
+        sheets[month].append(EXPORT_HEADER)
+
+    for row in rows:
+        sheets[row[0].month if by_month else None].append(format_xlsx_row(row))
+    workbook.save(output)
+
+
+def export_attendance_to_xlsx(rows, period, date):
+    """Export EXPORT_FIELDS rows as an Excel workbook, streamed from a temporary file."""
+    output = tempfile.SpooledTemporaryFile(max_size=XLSX_SPOOL_SIZE)
+    write_attendance_xlsx(rows, period, date, output)
+    output.seek(0)
+    return FileResponse(
+        output,
+        as_attachment=True,
+        filename=f'attendance_{period}_{date}.xlsx',
+        content_type=XLSX_CONTENT_TYPE,
+    )
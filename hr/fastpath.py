@@ -0,0 +1,49 @@
+from django.utils import timezone
+
+# Columns fetched for the serializer-free list responses. Ordering columns
+# (employee__first_name) are included so keyset pagination can read them.
+ATTENDANCE_VALUES = (
+    'id', 'employee', 'employee__username', 'employee__first_name', 'date', 'is_present',
+    'created_by', 'created_by__username', 'created_at', 'updated_at',
+)
+EMPLOYEE_VALUES = ('id', 'username', 'email', 'employee_type', 'first_name', 'last_name')
+
+
+def format_datetime(value):
+    """Same string as DRF's DateTimeField in ISO 8601 mode."""
+    value = timezone.localtime(value).isoformat()
+    if value.endswith('+00:00'):
+        value = value[:-6] + 'Z'
+    return value
+
+
+def attendance_values(attendances):
+    return attendances.values(*ATTENDANCE_VALUES)
+
+
+def format_attendance(row):
+    """Build the dict AttendanceSerializer would produce from a `.values()` row."""
+    data = {
+        'id': row['id'],
+        'employee': row['employee'],
+        'employee_name': row['employee__username'],
+        'date': row['date'].isoformat(),
+        'is_present': row['is_present'],
+        'created_by': row['created_by'],
+    }
+    # AttendanceSerializer skips created_by_name when there is no created_by.
+    if row['created_by'] is not None:
+        data['created_by_name'] = row['created_by__username']
+    data['created_at'] = format_datetime(row['created_at'])
+    data['updated_at'] = format_datetime(row['updated_at'])
+    return data
+
+
+def employee_values(employees, fields=None):
+    """
+    EmployeeSerializer's output is exactly these columns, in this order. With
+    `fields`, only those columns and the id are fetched.
+    """
+    if fields is None:
+        return employees.values(*EMPLOYEE_VALUES)
+    return employees.values(*dict.fromkeys((*fields, 'id')))
@@ -0,0 +1,118 @@
+"""
+Sparse fieldsets: the `fields` and `exclude` query parameters pick the
+fields of a response, and the columns and joins of its query follow from
+them.
+"""
+from .fastpath import EMPLOYEE_VALUES, format_attendance, format_datetime
+from .pagination import AttendanceCursorPagination
+
+EMPLOYEE_FIELDS = EMPLOYEE_VALUES
+EMPLOYEE_STATS_FIELDS = EMPLOYEE_FIELDS + ('present', 'absent', 'unmarked', 'rate')
+ATTENDANCE_FIELDS = (
+    'id', 'employee', 'employee_name', 'date', 'is_present',
+    'created_by', 'created_by_name', 'created_at', 'updated_at',
+)
+# The columns each attendance field reads, as `.values()` lookups. The
+# marker's id is read with its name, which is left out when there is none.
+ATTENDANCE_FIELD_COLUMNS = {
+    'id': ('id',),
+    'employee': ('employee',),
+    'employee_name': ('employee__username',),
+    'date': ('date',),
+    'is_present': ('is_present',),
+    'created_by': ('created_by',),
+    'created_by_name': ('created_by', 'created_by__username'),
+    'created_at': ('created_at',),
+    'updated_at': ('updated_at',),
+}
+ATTENDANCE_FIELD_FORMATTERS = {
+    'id': lambda row: row['id'],
+    'employee': lambda row: row['employee'],
+    'employee_name': lambda row: row['employee__username'],
+    'date': lambda row: row['date'].isoformat(),
+    'is_present': lambda row: row['is_present'],
+    'created_by': lambda row: row['created_by'],
+    'created_by_name': lambda row: row['created_by__username'],
+    'created_at': lambda row: format_datetime(row['created_at']),
+    'updated_at': lambda row: format_datetime(row['updated_at']),
+}
+
+
+def split_names(value):
+    if value is None:
+        return None
+    return [name.strip() for name in value.split(',') if name.strip()]
+
+
+def requested_fields(params, available):
+    """
+    The names of `available` picked by the `fields` and `exclude` query
+    parameters, in `available` order, or None when neither is given.
+    Raises ValueError with a client-facing message for unknown names.
+    """
+    fields = split_names(params.get('fields'))
+    exclude = split_names(params.get('exclude'))
+    if fields is None and exclude is None:
+        return None
+    unknown = [name for name in (fields or []) + (exclude or []) if name not in available]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    selected = tuple(
+        name for name in available
+        if (fields is None or name in fields) and name not in (exclude or ())
+    )
+    if not selected:
+        raise ValueError('No fields selected')
+    return selected
+
+
+def only_columns(queryset, columns):
+    """`.only()` the columns, joining the relations they reach into and no others."""
+    columns = list(dict.fromkeys(columns))
+    related = dict.fromkeys(column.split('__')[0] for column in columns if '__' in column)
+    queryset = queryset.select_related(None)
+    if related:
+        # Without arguments, select_related() would follow every foreign key.
+        queryset = queryset.select_related(*related)
+    return queryset.only(*columns)
+
+
+def attendance_columns(fields):
+    return [column for field in fields for column in ATTENDANCE_FIELD_COLUMNS[field]]
+
+
+def sparse_attendance_values(attendances, fields):
+    """
+    `.values()` of only the columns `fields` and the list ordering read, so
+    the marker is not joined unless its name is shown.
+    """
+    return attendances.values(*dict.fromkeys([*attendance_columns(fields), *AttendanceCursorPagination.ordering]))
+
+
+def shown_relations(fields):
+    """The relations of an attendance whose usernames the fields show."""
+    return [
+        relation for relation in ('employee', 'created_by')
+        if fields is None or f'{relation}_name' in fields
+    ]
+
+
+def attendance_formatter(fields):
+    """Like `format_attendance`, for rows holding only the columns of `fields`."""
+    if fields is None:
+        return format_attendance
+    formatters = [(field, ATTENDANCE_FIELD_FORMATTERS[field]) for field in fields]
+    skip_marker_name = 'created_by_name' in fields
+
+    def format_row(row):
+        data = {field: formatter(row) for field, formatter in formatters}
+        if skip_marker_name and row['created_by'] is None:
+            del data['created_by_name']
+        return data
+
+    return format_row
+
+
+def pick(row, fields):
+    """The `fields` of a `.values()` row, in order."""
+    return {field: row[field] for field in fields}
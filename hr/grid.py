@@ -0,0 +1,51 @@
+import base64
+
+from .archive import iter_archived_marks
+from .models import Employee, Attendance
+
+GRID_CHUNK_SIZE = 5000
+
+
+def encode_mask(bits, days):
+    """
+    Base64 of the day bitset: day i of the period is bit i % 8 of byte i // 8,
+    least significant bit first.
+    """
+    return base64.b64encode(bits.to_bytes((days + 7) // 8, 'little')).decode('ascii')
+
+
+def build_attendance_grid(start_date, end_date):
+    """
+    Present/absent/unmarked day masks per employee for the date range, from
+    a single scan of the range's (employee, date, is_present) rows, plus the
+    archived rows of closed years.
+    """
+    days = (end_date - start_date).days + 1
+    present = {}
+    absent = {}
+    rows = Attendance.objects.filter(date__range=[start_date, end_date]).values_list(
+        'employee_id', 'date', 'is_present'
+    )
+    for employee_id, day, is_present in rows.iterator(chunk_size=GRID_CHUNK_SIZE):
+        masks = present if is_present else absent
+        masks[employee_id] = masks.get(employee_id, 0) | (1 << (day - start_date).days)
+    for employee_id, offset, is_present in iter_archived_marks(start_date, end_date):
+        masks = present if is_present else absent
+        masks[employee_id] = masks.get(employee_id, 0) | (1 << offset)
+
+    all_days = (1 << days) - 1
+    employees = Employee.objects.order_by('id').values_list('id', 'username', 'first_name', 'last_name')
+    grid = []
+    for employee_id, username, first_name, last_name in employees.iterator(chunk_size=GRID_CHUNK_SIZE):
+        present_bits = present.get(employee_id, 0)
+        absent_bits = absent.get(employee_id, 0)
+        grid.append({
+            'id': employee_id,
+            'username': username,
+            'first_name': first_name,
+            'last_name': last_name,
+            'present': encode_mask(present_bits, days),
+            'absent': encode_mask(absent_bits, days),
+            'unmarked': encode_mask(all_days & ~(present_bits | absent_bits), days),
+        })
+    return grid
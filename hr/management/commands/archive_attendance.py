@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from hr.archive import archive_year, archived_years, closed_years
+from hr.cache import bump_data_version
+from hr.models import Attendance
+from hr.summary import ensure_summaries
+
+
+class Command(BaseCommand):
+    help = 'Move the attendance of closed years (before last year) out of the table into archive files.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--year', type=int, action='append', dest='years',
+            help='Year to archive; repeat for several. Defaults to every closed year.',
+        )
+
+    def handle(self, *args, **options):
+        today = timezone.now().date()
+        years = options['years'] or closed_years(today)
+        for year in years:
+            if year >= today.year - 1:
+                raise CommandError(f'{year} is not closed yet; only years before {today.year - 1} can be archived')
+            if year in archived_years():
+                raise CommandError(f'{year} is already archived')
+
+        for year in sorted(years):
+            # Summaries keep the archived counts for the dashboard and the list.
+            ensure_summaries(*Attendance.objects.filter(date__year=year).dates('date', 'day'))
+            rows = archive_year(year)
+            bump_data_version()
+            self.stdout.write(self.style.SUCCESS(f'Archived {rows} attendance records from {year}.'))
+        if not years:
+            self.stdout.write('No closed years to archive.')
@@ -0,0 +1,31 @@
+from pathlib import Path
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from hr.employee_import import IMPORT_BATCH_SIZE, ImportFormatError, import_employees
+
+
+class Command(BaseCommand):
+    help = 'Create employees from a CSV or XLSX file with username, email, password and optional employee_type, first_name, last_name columns.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV or XLSX file to import.')
+        parser.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE, help='Rows validated and inserted together.')
+        parser.add_argument('--workers', type=int, default=settings.IMPORT_HASH_WORKERS, help='Processes used to hash passwords.')
+
+    def handle(self, *args, **options):
+        path = Path(options['path'])
+        if not path.is_file():
+            raise CommandError(f"File '{path}' does not exist")
+        try:
+            with path.open('rb') as file:
+                report = import_employees(
+                    file, path.name, batch_size=options['batch_size'], workers=options['workers']
+                )
+        except ImportFormatError as exc:
+            raise CommandError(str(exc))
+
+        for error in report['errors']:
+            self.stderr.write(f"Row {error['row']}: {error['errors']}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {report['created']} employees, {report['failed']} rows failed."
+        ))
@@ -0,0 +1,13 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from hr.changes import prune_tombstones
+
+
+class Command(BaseCommand):
+    help = 'Delete changes-feed tombstones older than SYNC_TOMBSTONE_DAYS.'
+
+    def handle(self, *args, **options):
+        deleted = prune_tombstones()
+        self.stdout.write(self.style.SUCCESS(
+            f'Deleted {deleted} tombstones older than {settings.SYNC_TOMBSTONE_DAYS} days.'
+        ))
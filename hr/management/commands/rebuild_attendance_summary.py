@@ -0,0 +1,26 @@
+from datetime import datetime
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from hr.summary import rebuild_summaries
+from hr.cache import bump_data_version
+
+
+def parse_date(value):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise CommandError(f"Invalid date '{value}', expected YYYY-MM-DD")
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the daily attendance summary table from the attendance records.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', type=parse_date, help='First date to rebuild (YYYY-MM-DD).')
+        parser.add_argument('--end', type=parse_date, help='Last date to rebuild (YYYY-MM-DD).')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            summaries = rebuild_summaries(options['start'], options['end'])
+            bump_data_version()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {len(summaries)} daily attendance summaries.'))
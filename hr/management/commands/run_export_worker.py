@@ -0,0 +1,32 @@
+import time
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from hr.export_jobs import process_next_job, prune_export_jobs
+
+# Seconds between two sweeps of expired jobs and files.
+PRUNE_INTERVAL = 60 * 60
+
+
+class Command(BaseCommand):
+    help = 'Generate queued attendance exports, polling the queue until stopped.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Run at most one queued job, then exit.')
+        parser.add_argument('--poll-interval', type=float, default=2.0, help='Seconds to wait when the queue is empty.')
+
+    def handle(self, *args, **options):
+        next_prune = 0
+        while True:
+            close_old_connections()
+            if time.monotonic() >= next_prune:
+                pruned = prune_export_jobs()
+                if pruned:
+                    self.stdout.write(f'Deleted {pruned} expired export jobs')
+                next_prune = time.monotonic() + PRUNE_INTERVAL
+            job = process_next_job()
+            if job is not None:
+                self.stdout.write(f'Export job {job.pk}: {job.status} ({job.progress} rows)')
+            if options['once']:
+                return
+            if job is None:
+                time.sleep(options['poll_interval'])
@@ -0,0 +1,181 @@
+"""
+Per-request query counts, database time and latency histograms.
+
+`QueryTimingMiddleware` aggregates them per route in process memory and
+`metrics_view` exposes them in the Prometheus text format, so each worker
+process is scraped on its own.
+"""
+import bisect
+import threading
+import time
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse, HttpResponseForbidden
+from django.views.decorators.http import require_GET
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+METRICS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+UNMATCHED_ROUTE = 'unmatched'
+
+
+class QueryTimer:
+    """Execute wrapper counting the queries of one request and the time spent in them."""
+    __slots__ = ('count', 'duration')
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+
+
+class RouteMetrics:
+    __slots__ = ('buckets', 'count', 'seconds', 'queries', 'db_seconds')
+
+    def __init__(self):
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.seconds = 0.0
+        self.queries = 0
+        self.db_seconds = 0.0
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.routes = {}
+
+    def observe(self, route, method, seconds, queries, db_seconds):
+        with self.lock:
+            metrics = self.routes.get((route, method))
+            if metrics is None:
+                metrics = self.routes[(route, method)] = RouteMetrics()
+            metrics.buckets[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+            metrics.count += 1
+            metrics.seconds += seconds
+            metrics.queries += queries
+            metrics.db_seconds += db_seconds
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                key: (list(m.buckets), m.count, m.seconds, m.queries, m.db_seconds)
+                for key, m in self.routes.items()
+            }
+
+    def clear(self):
+        with self.lock:
+            self.routes.clear()
+
+
+registry = MetricsRegistry()
+
+
+def route_of(request):
+    match = getattr(request, 'resolver_match', None)
+    return '/' + match.route if match is not None and match.route else UNMATCHED_ROUTE
+
+
+def server_timing(timer, seconds):
+    if timer is None:
+        return f'total;dur={seconds * 1000:.1f}'
+    return (
+        f'db;desc="{timer.count} queries";dur={timer.duration * 1000:.1f}, '
+        f'total;dur={seconds * 1000:.1f}'
+    )
+
+
+class QueryTimingMiddleware:
+    """
+    Time each request and count its queries on every configured database,
+    then add a Server-Timing header and record the route's metrics.
+
+    Streamed bodies (CSV exports) are produced after the middleware returns,
+    so only the time to the first byte is measured for them. Async views run
+    their queries in other threads, which the execute wrappers cannot see;
+    only their latency is recorded.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        timer = QueryTimer()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(timer))
+            response = self.get_response(request)
+        return self.finish(request, response, time.perf_counter() - start, timer)
+
+    async def __acall__(self, request):
+        start = time.perf_counter()
+        response = await self.get_response(request)
+        return self.finish(request, response, time.perf_counter() - start, None)
+
+    def finish(self, request, response, seconds, timer):
+        response['Server-Timing'] = server_timing(timer, seconds)
+        registry.observe(
+            route_of(request),
+            request.method,
+            seconds,
+            timer.count if timer is not None else 0,
+            timer.duration if timer is not None else 0.0,
+        )
+        return response
+
+
+def escape_label(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def render_metrics(snapshot):
+    """Prometheus text exposition of a registry snapshot."""
+    lines = [
+        '# HELP hr_request_duration_seconds Request latency by route.',
+        '# TYPE hr_request_duration_seconds histogram',
+    ]
+    counters = [
+        ('hr_db_queries_total', 'SQL queries run by requests to the route.', 3, 'd'),
+        ('hr_db_duration_seconds_total', 'Time spent in SQL queries by requests to the route.', 4, '.6f'),
+    ]
+    ordered = sorted(snapshot.items())
+    for (route, method), (buckets, count, seconds, _, _) in ordered:
+        labels = f'route="{escape_label(route)}",method="{method}"'
+        cumulative = 0
+        for bound, observed in zip(LATENCY_BUCKETS + ('+Inf',), buckets):
+            cumulative += observed
+            lines.append(f'hr_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f'hr_request_duration_seconds_sum{{{labels}}} {seconds:.6f}')
+        lines.append(f'hr_request_duration_seconds_count{{{labels}}} {count}')
+    for name, help_text, index, spec in counters:
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} counter')
+        for (route, method), values in ordered:
+            labels = f'route="{escape_label(route)}",method="{method}"'
+            lines.append(f'{name}{{{labels}}} {values[index]:{spec}}')
+    return '\n'.join(lines) + '\n'
+
+
+@require_GET
+def metrics_view(request):
+    """Metrics of this process for a scraper on one of METRICS_ALLOWED_HOSTS."""
+    if request.META.get('REMOTE_ADDR') not in settings.METRICS_ALLOWED_HOSTS:
+        return HttpResponseForbidden()
+    return HttpResponse(render_metrics(registry.snapshot()), content_type=METRICS_CONTENT_TYPE)
@@ -0,0 +1,24 @@
+# Generated by Django 5.0.2 on 2026-10-18 20:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hr', '0005_remove_employee_is_password_reset_required'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyAttendanceSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True)),
+                ('present', models.IntegerField(default=0)),
+                ('absent', models.IntegerField(default=0)),
+                ('unmarked', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.0.2 on 2026-10-18 20:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hr', '0006_dailyattendancesummary'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(fields=['date', 'is_present'], include=('employee',), name='hr_att_date_present_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(condition=models.Q(('is_present', False)), fields=['date'], name='hr_att_absent_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(fields=['-created_at'], name='hr_att_created_at_idx'),
+        ),
+    ]
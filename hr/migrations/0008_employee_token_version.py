@@ -0,0 +1,18 @@
+# Generated by Django 5.0.2 on 2026-10-18 20:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hr', '0007_attendance_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='employee',
+            name='token_version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
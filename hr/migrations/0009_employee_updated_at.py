@@ -0,0 +1,20 @@
+# Generated by Django 5.0.2 on 2026-10-18 20:31
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hr', '0008_employee_token_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='employee',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.0.2 on 2026-10-18 20:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hr', '0009_employee_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendanceArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.PositiveIntegerField(unique=True)),
+                ('rows', models.PositiveIntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.0.2 on 2026-10-18 20:51
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hr', '0010_attendancearchive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(max_length=10)),
+                ('date', models.DateField()),
+                ('format', models.CharField(choices=[('csv', 'CSV'), ('xlsx', 'Excel')], max_length=10)),
+                ('fingerprint', models.CharField(max_length=64)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='pending', max_length=10)),
+                ('progress', models.PositiveIntegerField(default=0)),
+                ('total', models.PositiveIntegerField(null=True)),
+                ('file', models.CharField(blank=True, max_length=255)),
+                ('size', models.PositiveBigIntegerField(null=True)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(null=True)),
+                ('finished_at', models.DateTimeField(null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('created_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='export_jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'created_at'], name='hr_export_status_idx'), models.Index(fields=['period', 'date', 'format', 'fingerprint'], name='hr_export_reuse_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 5.0.2 on 2026-10-18 20:55
+
+from django.db import migrations, models
+from django.db.models.functions import Lower
+
+SEARCH_FIELDS = ('username', 'email', 'first_name', 'last_name')
+
+
+def search_indexes(vendor):
+    """Trigram GIN indexes on PostgreSQL, lower() B-trees elsewhere."""
+    if vendor == 'postgresql':
+        from django.contrib.postgres.indexes import GinIndex, OpClass
+        return [
+            GinIndex(OpClass(Lower(field), name='gin_trgm_ops'), name=f'hr_employee_{field}_trgm')
+            for field in SEARCH_FIELDS
+        ]
+    return [models.Index(Lower(field), name=f'hr_employee_{field}_lower') for field in SEARCH_FIELDS]
+
+
+def create_search_indexes(apps, schema_editor):
+    Employee = apps.get_model('hr', 'Employee')
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for index in search_indexes(vendor):
+        schema_editor.add_index(Employee, index)
+
+
+def drop_search_indexes(apps, schema_editor):
+    Employee = apps.get_model('hr', 'Employee')
+    for index in search_indexes(schema_editor.connection.vendor):
+        schema_editor.remove_index(Employee, index)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('hr', '0011_exportjob'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='employee',
+            index=models.Index(fields=['employee_type', 'id'], name='hr_employee_type_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='employee',
+            index=models.Index(condition=models.Q(('is_active', False)), fields=['id'], name='hr_employee_inactive_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='employee',
+            index=models.Index(fields=['updated_at'], name='hr_employee_updated_at_idx'),
+        ),
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.0.2 on 2026-10-18 21:19
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hr', '0012_employee_search_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('attendance', 'Attendance'), ('employee', 'Employee')], max_length=10)),
+                ('object_id', models.BigIntegerField()),
+                ('deleted_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(fields=['updated_at', 'id'], name='hr_att_updated_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tombstone',
+            index=models.Index(fields=['kind', 'deleted_at', 'id'], name='hr_tombstone_feed_idx'),
+        ),
+    ]
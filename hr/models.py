@@ -1,5 +1,6 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.utils import timezone
 
 class Employee(AbstractUser):
     EMPLOYEE_TYPES = (
@@ -9,6 +10,17 @@ class Employee(AbstractUser):
     
     employee_type = models.CharField(max_length=10, choices=EMPLOYEE_TYPES, default='NORMAL')
     email = models.EmailField(unique=True)
+    token_version = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta(AbstractUser.Meta):
+        # The case-insensitive search indexes depend on the database and are
+        # created in migration 0012_employee_search_indexes.
+        indexes = [
+            models.Index(fields=['employee_type', 'id'], name='hr_employee_type_idx'),
+            models.Index(fields=['id'], condition=models.Q(is_active=False), name='hr_employee_inactive_idx'),
+            models.Index(fields=['updated_at'], name='hr_employee_updated_at_idx'),
+        ]
 
     def __str__(self):
         return f"{self.username} ({self.get_employee_type_display()})"
@@ -24,6 +36,106 @@ class Attendance(models.Model):
 
     class Meta:
         unique_together = ['employee', 'date']
+        indexes = [
+            # Period lists, exports and per-date counts: a range on date that
+            # can be answered from the index alone on Postgres.
+            models.Index(fields=['date', 'is_present'], include=['employee'], name='hr_att_date_present_idx'),
+            # Absences are the minority of rows; keep a small index for them.
+            models.Index(fields=['date'], condition=models.Q(is_present=False), name='hr_att_absent_date_idx'),
+            # Recent activities on the dashboard.
+            models.Index(fields=['-created_at'], name='hr_att_created_at_idx'),
+            # The changes feed, which pages on (updated_at, id).
+            models.Index(fields=['updated_at', 'id'], name='hr_att_updated_at_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.employee.username} - {self.date}"
+
+class DailyAttendanceSummary(models.Model):
+    """Per-date attendance counts, kept in step with Attendance writes made through the API."""
+    date = models.DateField(unique=True)
+    present = models.IntegerField(default=0)
+    absent = models.IntegerField(default=0)
+    unmarked = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    @property
+    def total_employees(self):
+        return self.present + self.absent + self.unmarked
+
+    def __str__(self):
+        return f"{self.date}: {self.present} present, {self.absent} absent, {self.unmarked} unmarked"
+
+
+class AttendanceArchive(models.Model):
+    """A closed year whose attendance rows were moved out of the table into an archive file."""
+    year = models.PositiveIntegerField(unique=True)
+    rows = models.PositiveIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.year}: {self.rows} archived attendance records"
+
+
+class ExportJob(models.Model):
+    """An attendance export generated in the background by the export worker."""
+    FORMATS = (
+        ('csv', 'CSV'),
+        ('xlsx', 'Excel'),
+    )
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUSES = (
+        (PENDING, 'Pending'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    )
+
+    period = models.CharField(max_length=10)
+    date = models.DateField()
+    format = models.CharField(max_length=10, choices=FORMATS)
+    # Identifies the data the export was requested for; finished files are reused while it matches.
+    fingerprint = models.CharField(max_length=64)
+    status = models.CharField(max_length=10, choices=STATUSES, default=PENDING)
+    progress = models.PositiveIntegerField(default=0)
+    total = models.PositiveIntegerField(null=True)
+    file = models.CharField(max_length=255, blank=True)
+    size = models.PositiveBigIntegerField(null=True)
+    error = models.TextField(blank=True)
+    created_by = models.ForeignKey(Employee, on_delete=models.SET_NULL, null=True, related_name='export_jobs')
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True)
+    finished_at = models.DateTimeField(null=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='hr_export_status_idx'),
+            models.Index(fields=['period', 'date', 'format', 'fingerprint'], name='hr_export_reuse_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.format} export of {self.period} {self.date} ({self.status})"
+
+
+class Tombstone(models.Model):
+    """Marks a hard-deleted record so the changes feed can report the deletion."""
+    KINDS = (
+        ('attendance', 'Attendance'),
+        ('employee', 'Employee'),
+    )
+
+    kind = models.CharField(max_length=10, choices=KINDS)
+    object_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['kind', 'deleted_at', 'id'], name='hr_tombstone_feed_idx'),
+        ]
 
     def __str__(self):
-        return f"{self.employee.username} - {self.date}"
\ No newline at end of file
+        return f"{self.kind} {self.object_id} deleted at {self.deleted_at}"
@@ -0,0 +1,216 @@
+import base64
+import json
+from collections import OrderedDict
+from datetime import date, datetime
+from itertools import chain, islice
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from .models import Attendance, Employee
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination keyed on the values of the last row seen.
+
+    Unlike OFFSET pagination, every page is fetched with a range condition on
+    the ordering key, so the cost of a page does not grow with its depth.
+    The ordering must be unique; end it with the primary key.
+    """
+    ordering = ('id',)
+    # Model the ordering's fields belong to; cursor values are checked against them.
+    model = None
+    page_size = 100
+    max_page_size = 1000
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def get_params(self, request):
+        # Plain Django requests (the async views) have no query_params.
+        return getattr(request, 'query_params', request.GET)
+
+    def is_requested(self, request):
+        """Pagination is opt-in so existing clients keep getting a plain list."""
+        params = self.get_params(request)
+        return self.cursor_query_param in params or self.page_size_query_param in params
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.finish_page(list(self.get_page_queryset(queryset, request)))
+
+    async def apaginate_queryset(self, queryset, request):
+        return self.finish_page([row async for row in self.get_page_queryset(queryset, request)])
+
+    def paginate_sources(self, sources, request):
+        """
+        Paginate rows chained from several sources that together follow the
+        ordering, such as the table and archive files. Each source is called
+        with the paginator and yields its rows past `cursor_values`, in
+        reverse order when `cursor_reverse` is set.
+        """
+        self.start_page(request)
+        if self.cursor_reverse:
+            sources = reversed(sources)
+        rows = chain.from_iterable(source(self) for source in sources)
+        return self.finish_page(list(islice(rows, self.page_size + 1)))
+
+    def start_page(self, request):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.cursor_values, self.cursor_reverse = self.decode_cursor(request)
+
+    def get_page_queryset(self, queryset, request):
+        self.start_page(request)
+        return self.seek(queryset)[:self.page_size + 1]
+
+    def seek(self, queryset):
+        """Order the queryset in the page's direction and skip past the cursor."""
+        queryset = queryset.order_by(*[
+            f'-{field}' if self.cursor_reverse else field for field in self.ordering
+        ])
+        if self.cursor_values is not None:
+            queryset = queryset.filter(self.keyset_filter(self.cursor_values, self.cursor_reverse))
+        return queryset
+
+    def finish_page(self, rows):
+        values, reverse = self.cursor_values, self.cursor_reverse
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+
+        if reverse:
+            self.has_next = values is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = values is not None
+
+        self.first_key = self.get_key(rows[0]) if rows else None
+        self.last_key = self.get_key(rows[-1]) if rows else None
+        if not rows and values is not None:
+            # Keep the client anchored on the cursor it sent.
+            self.first_key = self.last_key = values
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response(self.get_paginated_data(data))
+
+    def get_paginated_data(self, data):
+        return OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ])
+
+    def get_page_size(self, request):
+        try:
+            size = int(self.get_params(request)[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if size <= 0:
+            return self.page_size
+        return min(size, self.max_page_size)
+
+    def get_next_link(self):
+        if not self.has_next or self.last_key is None:
+            return None
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, self.encode_cursor(self.last_key, reverse=False)
+        )
+
+    def get_previous_link(self):
+        if not self.has_previous or self.first_key is None:
+            return None
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, self.encode_cursor(self.first_key, reverse=True)
+        )
+
+    def keyset_filter(self, values, reverse):
+        """
+        Build `(a, b, c) > (x, y, z)` as nested ORs, led by a plain range on the
+        first column so the database can start from an index range scan.
+        """
+        lookup = 'lt' if reverse else 'gt'
+        keyset = Q()
+        for i, field in enumerate(self.ordering):
+            condition = Q(**{f'{field}__{lookup}': values[i]})
+            for prev_field, prev_value in zip(self.ordering[:i], values[:i]):
+                condition &= Q(**{prev_field: prev_value})
+            keyset |= condition
+        leading = Q(**{f'{self.ordering[0]}__{lookup}e': values[0]})
+        return leading & keyset
+
+    def get_key(self, instance):
+        key = []
+        for field in self.ordering:
+            if isinstance(instance, dict):
+                # Rows from .values() are keyed by the lookup itself.
+                value = instance[field]
+            else:
+                value = instance
+                for attr in field.split('__'):
+                    value = getattr(value, attr)
+            if isinstance(value, (date, datetime)):
+                value = value.isoformat()
+            key.append(value)
+        return key
+
+    def encode_cursor(self, values, reverse):
+        payload = json.dumps({'k': list(values), 'r': int(reverse)}, separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+
+    def decode_cursor(self, request):
+        encoded = self.get_params(request).get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')).decode('utf-8'))
+            values = payload['k']
+            reverse = bool(payload.get('r', 0))
+        except (TypeError, ValueError, KeyError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        try:
+            values = [self.clean_value(field, value) for field, value in zip(self.ordering, values)]
+        except (ValidationError, ValueError, TypeError):
+            raise NotFound(self.invalid_cursor_message)
+        return values, reverse
+
+    def clean_value(self, field, value):
+        """A cursor value checked against its field's type, in the form `get_key` writes it."""
+        if self.model is None:
+            return value
+        if value is None:
+            raise ValueError(f'{field} cannot be null')
+        model_field = resolve_field(self.model, field)
+        value = model_field.to_python(value)
+        model_field.run_validators(value)
+        if isinstance(value, (date, datetime)):
+            value = value.isoformat()
+        return value
+
+
+def resolve_field(model, path):
+    """The model field a `__`-separated lookup path ends at."""
+    *relations, name = path.split('__')
+    for relation in relations:
+        model = model._meta.get_field(relation).related_model
+    return model._meta.get_field(name)
+
+
+class EmployeeCursorPagination(KeysetPagination):
+    model = Employee
+    ordering = ('id',)
+
+
+class AttendanceCursorPagination(KeysetPagination):
+    model = Attendance
+    ordering = ('date', 'employee__first_name', 'id')
@@ -0,0 +1,29 @@
+from datetime import datetime, timedelta
+
+from django.utils import timezone
+
+PERIODS = ('day', 'week', 'month', 'year')
+
+
+def parse_period(params):
+    """Read the `date` and `period` query parameters; raises ValueError for a bad date."""
+    date_str = params.get('date', timezone.now().date())
+    period = params.get('period', 'day')
+    return datetime.strptime(str(date_str), '%Y-%m-%d').date(), period
+
+
+def calculate_date_range(date, period):
+    """Calculate the date range based on the specified period."""
+    if period == 'day':
+        return date, date
+    if period == 'week':
+        start_date = date - timedelta(days=date.weekday())
+        end_date = start_date + timedelta(days=6)
+    elif period == 'month':
+        start_date = date.replace(day=1)
+        next_month = date.replace(day=28) + timedelta(days=4)
+        end_date = next_month - timedelta(days=next_month.day)
+    else:  
+        start_date = date.replace(month=1, day=1)
+        end_date = date.replace(month=12, day=31)
+    return start_date, end_date
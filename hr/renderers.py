@@ -0,0 +1,24 @@
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    Byte-for-byte the same output as DRF's compact JSONRenderer, encoded with
+    orjson when it is installed. Anything orjson would format differently
+    (indentation, non-str keys, unsupported types) goes through DRF.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data)
+        except TypeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # DRF escapes these two separators for JavaScript compatibility.
+        return ret.replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
@@ -0,0 +1,129 @@
+"""
+Read replicas. The GET views of the API read from a replica, picked once
+per request; every other request, and every read that follows a write in
+the same request or runs inside a transaction, uses the primary.
+
+Replicas lag the primary, so for REPLICA_PIN_SECONDS after a request writes,
+GET requests in every process sharing the cache read from the primary too:
+a client that reloads right after saving sees its change, and responses
+cached under the new data version are not built from stale rows.
+"""
+import math
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+
+PRIMARY_PIN_KEY = 'hr:primary-pin'
+READ_ONLY_METHODS = ('GET', 'HEAD', 'OPTIONS')
+REPLICA_VIEW_MODULES = ('hr.api', 'hr.async_api')
+
+
+class Routing:
+    """Where the current request reads from, and whether it has written."""
+
+    def __init__(self, replica=None):
+        self.replica = replica
+        self.wrote = False
+
+
+# Holds a mutable Routing rather than the values themselves: sync_to_async
+# runs its function in a copy of the context, so a write made there must
+# still be seen by the reads that follow it on the event loop.
+_routing = ContextVar('hr_routing', default=None)
+
+
+@contextmanager
+def routing(replica=None):
+    """Reads in the block go to `replica` (None for the primary) until the first write."""
+    token = _routing.set(Routing(replica))
+    try:
+        yield _routing.get()
+    finally:
+        _routing.reset(token)
+
+
+def primary_pinned():
+    return cache.get(PRIMARY_PIN_KEY, 0) > time.time()
+
+
+def pin_primary():
+    cache.set(
+        PRIMARY_PIN_KEY, time.time() + settings.REPLICA_PIN_SECONDS, math.ceil(settings.REPLICA_PIN_SECONDS),
+    )
+
+
+def pick_replica(request, view_func):
+    """The replica a request to `view_func` reads from, or None for the primary."""
+    if not settings.DATABASE_REPLICAS or request.method not in READ_ONLY_METHODS:
+        return None
+    if view_func.__module__ not in REPLICA_VIEW_MODULES or primary_pinned():
+        return None
+    return random.choice(settings.DATABASE_REPLICAS)
+
+
+class ReplicaRouter:
+    """Sends the reads of a request routed to a replica there, and everything else to the primary."""
+
+    def db_for_read(self, model, **hints):
+        state = _routing.get()
+        if state is None or state.replica is None or state.wrote:
+            return DEFAULT_DB_ALIAS
+        # A transaction reads its own uncommitted rows, which only the primary has.
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return state.replica
+
+    def db_for_write(self, model, **hints):
+        state = _routing.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary.
+        return True
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Routes the reads of GET requests to the API views to a replica, and pins
+    reads to the primary for a while after a request writes.
+
+    Streamed bodies (CSV exports) are read after the middleware returns, so
+    they come from the primary.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        with routing() as state:
+            request.routing = state
+            response = self.get_response(request)
+        if state.wrote and settings.DATABASE_REPLICAS:
+            pin_primary()
+        return response
+
+    async def __acall__(self, request):
+        with routing() as state:
+            request.routing = state
+            response = await self.get_response(request)
+        if state.wrote and settings.DATABASE_REPLICAS:
+            await sync_to_async(pin_primary)()
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.routing.replica = pick_replica(request, view_func)
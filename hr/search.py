@@ -0,0 +1,65 @@
+from django.db import connection
+from django.db.models import Q
+from django.db.models.functions import Lower
+
+from .models import Employee
+
+SEARCH_FIELDS = ('username', 'email', 'first_name', 'last_name')
+SEARCH_MODES = ('contains', 'prefix')
+EMPLOYEE_TYPES = tuple(value for value, _ in Employee.EMPLOYEE_TYPES)
+BOOLEAN_VALUES = {'true': True, '1': True, 'false': False, '0': False}
+# Above every character, so `term + PREFIX_END` bounds the keys starting with term.
+PREFIX_END = '\U0010ffff'
+
+
+def search_condition(field, term, mode):
+    """
+    Match lower(field) against a lower-cased term. The search indexes are on
+    lower(field): on PostgreSQL they are trigram GIN indexes, which serve
+    both LIKE forms; elsewhere they are B-trees, which only a prefix written
+    as a range can use.
+    """
+    if mode == 'contains':
+        return Q(**{f'{field}_lower__contains': term})
+    if connection.vendor == 'postgresql':
+        return Q(**{f'{field}_lower__startswith': term})
+    return Q(**{f'{field}_lower__gte': term, f'{field}_lower__lt': term + PREFIX_END})
+
+
+def search_employees(employees, term, mode='contains'):
+    """Employees whose username, email, first or last name contains (or starts with) term, ignoring case."""
+    term = term.strip().lower()
+    if not term:
+        return employees
+    employees = employees.alias(**{f'{field}_lower': Lower(field) for field in SEARCH_FIELDS})
+    condition = Q()
+    for field in SEARCH_FIELDS:
+        condition |= search_condition(field, term, mode)
+    return employees.filter(condition)
+
+
+def filter_employees(employees, params):
+    """
+    Apply the `employee_type`, `is_active`, `search` and `match` query
+    parameters. Raises ValueError with a client-facing message for invalid
+    values.
+    """
+    employee_type = params.get('employee_type')
+    if employee_type is not None:
+        if employee_type not in EMPLOYEE_TYPES:
+            raise ValueError(f"Invalid employee_type, expected one of: {', '.join(EMPLOYEE_TYPES)}")
+        employees = employees.filter(employee_type=employee_type)
+
+    is_active = params.get('is_active')
+    if is_active is not None:
+        if is_active.lower() not in BOOLEAN_VALUES:
+            raise ValueError('Invalid is_active, expected true or false')
+        employees = employees.filter(is_active=BOOLEAN_VALUES[is_active.lower()])
+
+    mode = params.get('match', 'contains')
+    if mode not in SEARCH_MODES:
+        raise ValueError(f"Invalid match, expected one of: {', '.join(SEARCH_MODES)}")
+    search = params.get('search')
+    if search:
+        employees = search_employees(employees, search, mode)
+    return employees
@@ -1,7 +1,30 @@
+from django.contrib.auth.validators import UnicodeUsernameValidator
+from django.urls import reverse
+from django.utils import timezone
 from rest_framework import serializers
-from .models import Employee, Attendance
+from .archive import is_archived
+from .models import Employee, Attendance, ExportJob
+from .periods import PERIODS
 
-class EmployeeSerializer(serializers.ModelSerializer):
+
+def validate_not_archived(value, archived=None):
+    """`archived`, when given, is a set of archived years looked up once for many dates."""
+    if value.year in archived if archived is not None else is_archived(value):
+        raise serializers.ValidationError(f'Attendance for {value.year} is archived and read-only.')
+    return value
+
+
+class SparseFieldsMixin:
+    """Outputs only the field names passed as `fields`, when given (see `hr.fieldsets`)."""
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
+class EmployeeSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Employee
         fields = ['id', 'username', 'email', 'password', 'employee_type', 'first_name', 'last_name']
@@ -20,7 +43,18 @@ class EmployeeSerializer(serializers.ModelSerializer):
         return instance
     
 
-class AttendanceSerializer(serializers.ModelSerializer):
+class EmployeeStatsSerializer(EmployeeSerializer):
+    """Employee with the attendance stats annotated by `annotate_attendance_stats`."""
+    present = serializers.IntegerField(read_only=True)
+    absent = serializers.IntegerField(read_only=True)
+    unmarked = serializers.IntegerField(read_only=True)
+    rate = serializers.FloatField(read_only=True)
+
+    class Meta(EmployeeSerializer.Meta):
+        fields = EmployeeSerializer.Meta.fields + ['present', 'absent', 'unmarked', 'rate']
+
+
+class AttendanceSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     employee_name = serializers.CharField(source='employee.username', read_only=True)
     created_by_name = serializers.CharField(source='created_by.username', read_only=True)
 
@@ -28,4 +62,56 @@ class AttendanceSerializer(serializers.ModelSerializer):
         model = Attendance
         fields = ['id', 'employee', 'employee_name', 'date', 'is_present', 
                  'created_by', 'created_by_name', 'created_at', 'updated_at']
-        read_only_fields = ['created_by']
\ No newline at end of file
+        read_only_fields = ['created_by']
+
+    def validate_date(self, value):
+        return validate_not_archived(value)
+
+
+class AttendanceBulkItemSerializer(serializers.Serializer):
+    """
+    One entry of a bulk attendance upsert. Employee ids are checked by the
+    view in one query, and dates against the `archived_years` set the view
+    passes in the context.
+    """
+    employee = serializers.IntegerField()
+    date = serializers.DateField()
+    is_present = serializers.BooleanField(default=True)
+
+    def validate_date(self, value):
+        return validate_not_archived(value, self.context.get('archived_years'))
+
+
+class EmployeeImportRowSerializer(serializers.Serializer):
+    """
+    One row of an employee import. Only field-level checks run here; username
+    and email uniqueness is checked per batch by `hr.employee_import`.
+    """
+    username = serializers.CharField(max_length=150, validators=[UnicodeUsernameValidator()])
+    email = serializers.EmailField(max_length=254)
+    password = serializers.CharField(write_only=True)
+    employee_type = serializers.ChoiceField(choices=Employee.EMPLOYEE_TYPES, default='NORMAL')
+    first_name = serializers.CharField(max_length=150, required=False, allow_blank=True, default='')
+    last_name = serializers.CharField(max_length=150, required=False, allow_blank=True, default='')
+
+
+class ExportJobRequestSerializer(serializers.Serializer):
+    period = serializers.ChoiceField(choices=PERIODS, default='day')
+    date = serializers.DateField(default=lambda: timezone.now().date())
+    format = serializers.ChoiceField(choices=ExportJob.FORMATS, default='csv')
+
+
+class ExportJobSerializer(serializers.ModelSerializer):
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ExportJob
+        fields = ['id', 'period', 'date', 'format', 'status', 'progress', 'total', 'size', 'error',
+                  'created_at', 'started_at', 'finished_at', 'download_url']
+
+    def get_download_url(self, job):
+        if job.status != ExportJob.DONE:
+            return None
+        url = reverse('export-job-download', args=[job.pk])
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request is not None else url
@@ -0,0 +1,53 @@
+"""Model signal receivers, connected in HrConfig.ready()."""
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from .authentication import forget_token_version
+from .cache import bump_data_version
+from .models import Attendance, Employee
+
+# A change to any of these revokes the employee's tokens.
+ACCESS_FIELDS = ('employee_type', 'is_active')
+
+
+@receiver(pre_save, sender=Employee)
+def bump_token_version(sender, instance, update_fields=None, **kwargs):
+    """
+    Revoke the tokens of an employee whose type or active flag changes,
+    whether it is saved by the API, the admin or the shell.
+    """
+    if instance.pk is None:
+        return
+    if update_fields is not None and not set(update_fields) & set(ACCESS_FIELDS):
+        return
+    stored = Employee.objects.filter(pk=instance.pk).values(*ACCESS_FIELDS, 'token_version').first()
+    if stored is None or all(stored[field] == getattr(instance, field) for field in ACCESS_FIELDS):
+        return
+    instance.token_version = stored['token_version'] + 1
+    if update_fields is not None and 'token_version' not in update_fields:
+        Employee.objects.filter(pk=instance.pk).update(token_version=instance.token_version)
+
+
+@receiver(post_save, sender=Employee)
+@receiver(post_delete, sender=Employee)
+def forget_employee_token_version(sender, instance, **kwargs):
+    forget_token_version(instance.pk)
+
+
+@receiver(post_save, sender=Employee)
+@receiver(post_save, sender=Attendance)
+@receiver(pre_delete, sender=Employee)
+def invalidate_cached_responses(sender, **kwargs):
+    """
+    Bump the data version on every save and delete, so writes made outside
+    the API also reach the cached responses. Bulk writes send no signals and
+    bump it themselves.
+    """
+    bump_data_version()
+
+
+@receiver(post_delete, sender=Attendance)
+def invalidate_cached_responses_for_attendance(sender, origin=None, **kwargs):
+    # An employee's cascade was covered by the bump on its pre_delete.
+    if not isinstance(origin, Employee):
+        bump_data_version()
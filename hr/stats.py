@@ -0,0 +1,56 @@
+from django.db.models import Count, F, FilteredRelation, FloatField, Q, Value
+from django.db.models.functions import Cast, NullIf, Round
+
+STATS_SORT_FIELDS = ('present', 'absent', 'unmarked', 'rate')
+
+
+def annotate_attendance_stats(employees, start_date, end_date):
+    """
+    Annotate employees with present/absent/unmarked day counts and an
+    attendance rate for the date range, computed in one grouped query.
+    The rate is present / marked days, or null when nothing was marked.
+    """
+    days = (end_date - start_date).days + 1
+    # The date range goes into the join condition so only the period's rows are joined.
+    return employees.annotate(
+        period_attendances=FilteredRelation(
+            'attendances', condition=Q(attendances__date__range=[start_date, end_date])
+        ),
+    ).annotate(
+        present=Count('period_attendances', filter=Q(period_attendances__is_present=True)),
+        absent=Count('period_attendances', filter=Q(period_attendances__is_present=False)),
+    ).annotate(
+        unmarked=Value(days) - F('present') - F('absent'),
+        rate=Round(
+            Cast('present', FloatField()) / NullIf(F('present') + F('absent'), 0),
+            4,
+            output_field=FloatField(),
+        ),
+    )
+
+
+def order_by_stat(employees, field):
+    """Highest first; employees without a rate go last."""
+    return employees.order_by(F(field).desc(nulls_last=True), 'id')
+
+
+def add_attendance_counts(employees, counts, days):
+    """
+    Add `employee_id -> (present, absent)` counts kept outside the table
+    (archived years) to annotated employees, and recompute unmarked and rate.
+    """
+    for employee in employees:
+        present, absent = counts.get(employee.id, (0, 0))
+        employee.present += present
+        employee.absent += absent
+        employee.unmarked = days - employee.present - employee.absent
+        marked = employee.present + employee.absent
+        employee.rate = round(employee.present / marked, 4) if marked else None
+    return employees
+
+
+def sort_by_stat(employees, field):
+    """order_by_stat for a list of employees."""
+    return sorted(employees, key=lambda employee: (
+        getattr(employee, field) is None, -(getattr(employee, field) or 0), employee.id,
+    ))
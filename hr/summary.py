@@ -0,0 +1,121 @@
+from collections import Counter, defaultdict
+from django.db import transaction
+from django.db.models import Count, F, Q
+from .archive import archived_years, archived_day_counts, archived_employee_marks, is_archived
+from .models import Employee, Attendance, DailyAttendanceSummary
+
+
+def count_summary(date):
+    """Count present, absent and unmarked employees for a date from scratch."""
+    counts = Attendance.objects.filter(date=date).aggregate(
+        present=Count('id', filter=Q(is_present=True)),
+        absent=Count('id', filter=Q(is_present=False)),
+    )
+    if is_archived(date):
+        present, absent = archived_day_counts(date)
+        counts['present'] += present
+        counts['absent'] += absent
+    counts['unmarked'] = Employee.objects.count() - counts['present'] - counts['absent']
+    return counts
+
+
+def get_summary(date):
+    """Return the summary row for a date, counting it once if it does not exist yet."""
+    summary = DailyAttendanceSummary.objects.filter(date=date).first()
+    if summary is None:
+        # Counted inside a transaction so the baseline is read from the primary,
+        # not a replica that may lag it.
+        with transaction.atomic():
+            summary, _ = DailyAttendanceSummary.objects.get_or_create(date=date, defaults=count_summary(date))
+    return summary
+
+
+def ensure_summaries(*dates):
+    """
+    Make sure summary rows exist before an attendance write, so the counted
+    baseline never includes the write that is about to be applied as a delta.
+    """
+    dates = set(dates)
+    existing = set(DailyAttendanceSummary.objects.filter(date__in=dates).values_list('date', flat=True))
+    for date in dates - existing:
+        get_summary(date)
+
+
+def record_attendance_changes(changes):
+    """
+    Apply attendance writes to the summaries, one UPDATE per touched date.
+    Each change is a `(before, after)` pair of `(date, is_present)`, with
+    None standing for a create or a delete.
+    """
+    deltas = defaultdict(Counter)
+    for before, after in changes:
+        if before == after:
+            continue
+        for mark, delta in ((before, -1), (after, 1)):
+            if mark is None:
+                continue
+            date, is_present = mark
+            deltas[date]['present' if is_present else 'absent'] += delta
+            deltas[date]['unmarked'] -= delta
+    for date, delta in deltas.items():
+        columns = {column: F(column) + value for column, value in delta.items() if value}
+        if columns:
+            DailyAttendanceSummary.objects.filter(date=date).update(**columns)
+
+
+def record_attendance_change(before, after):
+    """Apply a single attendance write to the summaries."""
+    record_attendance_changes([(before, after)])
+
+
+def record_headcount(delta, since):
+    """Add or remove unmarked employees on every summary from `since` onwards."""
+    DailyAttendanceSummary.objects.filter(date__gte=since).update(unmarked=F('unmarked') + delta)
+
+
+def record_employee_removal(employee, since):
+    """
+    Take an employee out of the summaries, before the employee is deleted,
+    including the archived days, whose rows reads drop from now on.
+    """
+    DailyAttendanceSummary.objects.filter(date__gte=since).exclude(
+        date__in=employee.attendances.values('date')
+    ).update(unmarked=F('unmarked') - 1)
+    marks = archived_employee_marks(employee.pk)
+    for mark in employee.attendances.values('date', 'is_present').annotate(total=Count('id')):
+        marks[(mark['date'], mark['is_present'])] += mark['total']
+    for (date, is_present), total in marks.items():
+        column = 'present' if is_present else 'absent'
+        DailyAttendanceSummary.objects.filter(date=date).update(**{column: F(column) - total})
+
+
+def rebuild_summaries(start_date=None, end_date=None):
+    """
+    Recount every summary row in the range with one grouped aggregate.
+    Archived years are left alone; their rows are no longer in the table.
+    """
+    attendances = Attendance.objects.all()
+    summaries = DailyAttendanceSummary.objects.exclude(date__year__in=archived_years())
+    if start_date:
+        attendances = attendances.filter(date__gte=start_date)
+        summaries = summaries.filter(date__gte=start_date)
+    if end_date:
+        attendances = attendances.filter(date__lte=end_date)
+        summaries = summaries.filter(date__lte=end_date)
+
+    headcount = Employee.objects.count()
+    rows = attendances.values('date').annotate(
+        present=Count('id', filter=Q(is_present=True)),
+        absent=Count('id', filter=Q(is_present=False)),
+    ).order_by('date')
+
+    summaries.delete()
+    return DailyAttendanceSummary.objects.bulk_create([
+        DailyAttendanceSummary(
+            date=row['date'],
+            present=row['present'],
+            absent=row['absent'],
+            unmarked=headcount - row['present'] - row['absent'],
+        )
+        for row in rows
+    ], batch_size=1000)
@@ -1,8 +1,15 @@
 import pytest
+from django.core.cache import cache
 from rest_framework.test import APIClient
 from hr.factories import EmployeeFactory
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """starting every test with an empty response cache."""
+    cache.clear()
+
+
 @pytest.fixture
 def api_client():
     """providing an API client."""
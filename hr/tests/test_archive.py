@@ -0,0 +1,200 @@
+import json
+import pytest
+from asgiref.sync import async_to_sync
+from datetime import date, timedelta
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import AsyncClient
+from django.urls import reverse
+from rest_framework import status
+from hr.authentication import HRRefreshToken
+from hr.factories import AttendanceFactory, EmployeeFactory
+from hr.models import Attendance, AttendanceArchive, DailyAttendanceSummary
+from hr.summary import get_summary, rebuild_summaries
+
+WEEK = {'date': '2021-12-29', 'period': 'week'}
+
+
+@pytest.fixture(autouse=True)
+def archive_dir(settings, tmp_path):
+    settings.ATTENDANCE_ARCHIVE_DIR = tmp_path
+    return tmp_path
+
+
+@pytest.fixture
+def year_end_week(hr_user):
+    """a week of attendance from Monday 2021-12-27 to Sunday 2022-01-02."""
+    employees = [
+        EmployeeFactory(first_name=name) for name in ('Carol', 'Alice', 'Bob', 'Alice')
+    ]
+    for offset in range(7):
+        for index, employee in enumerate(employees):
+            AttendanceFactory(
+                employee=employee,
+                date=date(2021, 12, 27) + timedelta(days=offset),
+                is_present=(index + offset) % 3 != 0,
+                created_by=hr_user,
+            )
+    return employees
+
+
+def read_all_pages(client, params):
+    rows = []
+    response = client.get(reverse('attendance-list'), {**params, 'page_size': 3})
+    while True:
+        rows += response.data['results']
+        if not response.data['next']:
+            return rows, response
+        response = client.get(response.data['next'])
+
+
+@pytest.mark.django_db
+class TestArchiveAttendance:
+    def test_archive_moves_rows_out_of_the_table(self, year_end_week, archive_dir):
+        """the closed year's rows go to a file and leave the table."""
+        call_command('archive_attendance', '--year', '2021')
+
+        assert (archive_dir / 'attendance-2021.npz').exists()
+        assert AttendanceArchive.objects.get(year=2021).rows == 20
+        assert not Attendance.objects.filter(date__year=2021).exists()
+        assert Attendance.objects.filter(date__year=2022).count() == 8
+
+    def test_list_reads_archive_transparently(self, authenticated_hr_client, year_end_week):
+        """the period list is the same before and after archiving."""
+        before = authenticated_hr_client.get(reverse('attendance-list'), WEEK).content
+
+        call_command('archive_attendance', '--year', '2021')
+        after = authenticated_hr_client.get(reverse('attendance-list'), WEEK).content
+
+        assert after == before
+
+    def test_pages_cross_the_archive_boundary(self, authenticated_hr_client, year_end_week):
+        """keyset pages walk from archived rows into table rows and back."""
+        expected = authenticated_hr_client.get(reverse('attendance-list'), WEEK).data
+        call_command('archive_attendance', '--year', '2021')
+
+        rows, last_page = read_all_pages(authenticated_hr_client, WEEK)
+        assert [row['id'] for row in rows] == [row['id'] for row in expected]
+
+        previous = authenticated_hr_client.get(last_page.data['previous'])
+        ids = [row['id'] for row in expected]
+        last_ids = [row['id'] for row in last_page.data['results']]
+        start = ids.index(last_ids[0])
+        assert [row['id'] for row in previous.data['results']] == ids[start - 3:start]
+
+    def test_csv_export_reads_archive(self, authenticated_hr_client, year_end_week):
+        """the CSV export is the same before and after archiving."""
+        params = {**WEEK, 'export': 'csv'}
+        before = b''.join(authenticated_hr_client.get(reverse('attendance-list'), params).streaming_content)
+
+        call_command('archive_attendance', '--year', '2021')
+        after = b''.join(authenticated_hr_client.get(reverse('attendance-list'), params).streaming_content)
+
+        assert after == before
+
+    def test_stats_and_grid_read_archive(self, authenticated_hr_client, year_end_week):
+        """stats and the grid count archived attendance."""
+        stats_params = {**WEEK, 'sort': 'rate'}
+        grid_params = {'date': '2021-12-01', 'period': 'month'}
+        stats = authenticated_hr_client.get(reverse('attendance-stats'), stats_params).data
+        grid = authenticated_hr_client.get(reverse('attendance-grid'), grid_params).data
+
+        call_command('archive_attendance', '--year', '2021')
+
+        assert authenticated_hr_client.get(reverse('attendance-stats'), stats_params).data == stats
+        assert authenticated_hr_client.get(reverse('attendance-grid'), grid_params).data == grid
+
+    def test_async_list_reads_archive(self, authenticated_hr_client, hr_user, year_end_week):
+        """the async list serves archived ranges too."""
+        expected = json.loads(authenticated_hr_client.get(reverse('attendance-list'), WEEK).content)
+        call_command('archive_attendance', '--year', '2021')
+
+        headers = {'Authorization': f'Bearer {HRRefreshToken.for_user(hr_user).access_token}'}
+        response = async_to_sync(AsyncClient().get)(reverse('attendance-list-async'), WEEK, headers=headers)
+
+        assert response.json() == expected
+
+    def test_archived_year_is_read_only(self, authenticated_hr_client, year_end_week):
+        """attendance cannot be written into an archived year."""
+        call_command('archive_attendance', '--year', '2021')
+
+        response = authenticated_hr_client.post(reverse('attendance-list'), {
+            'employee': year_end_week[0].id, 'date': '2021-06-01', 'is_present': True,
+        })
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'date' in response.data
+
+        response = authenticated_hr_client.post(reverse('attendance-bulk'), [
+            {'employee': year_end_week[0].id, 'date': '2021-06-01'},
+            {'employee': year_end_week[0].id, 'date': '2022-06-01'},
+        ], format='json')
+
+        assert [result['status'] for result in response.data['results']] == ['error', 'created']
+        assert 'date' in response.data['results'][0]['errors']
+
+    def test_archiving_elsewhere_is_seen_at_once(self, authenticated_hr_client, year_end_week):
+        """a year archived by another process is read-only here straight away, not after a cache expiry."""
+        assert len(authenticated_hr_client.get(reverse('attendance-list'), WEEK).data) == 28
+
+        # What the archive command's commit in its own process leaves behind.
+        AttendanceArchive.objects.create(year=2020, rows=0)
+
+        response = authenticated_hr_client.post(reverse('attendance-list'), {
+            'employee': year_end_week[0].id, 'date': '2020-06-01', 'is_present': True,
+        })
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_summaries_survive_archiving_and_rebuilds(self, year_end_week):
+        """archived days keep their summary counts, even through a rebuild."""
+        call_command('archive_attendance', '--year', '2021')
+        rebuild_summaries()
+
+        summary = DailyAttendanceSummary.objects.get(date=date(2021, 12, 27))
+        assert summary.present + summary.absent == 4
+
+    def test_deleted_employees_drop_out(self, authenticated_hr_client, year_end_week):
+        """archived rows of deleted employees are no longer listed."""
+        call_command('archive_attendance', '--year', '2021')
+        year_end_week[0].delete()
+
+        response = authenticated_hr_client.get(reverse('attendance-list'), WEEK)
+
+        assert len(response.data) == 21
+        assert year_end_week[0].id not in {row['employee'] for row in response.data}
+
+    def test_counts_match_rows_after_employee_deletion(self, authenticated_hr_client, year_end_week):
+        """summaries, recounts, stats and the grid drop a deleted employee's archived rows, like the list."""
+        call_command('archive_attendance', '--year', '2021')
+        authenticated_hr_client.delete(reverse('employee-detail', args=[year_end_week[0].id]))
+        day = date(2021, 12, 27)
+
+        listed = authenticated_hr_client.get(reverse('attendance-list'), WEEK).data
+        rows = [row for row in listed if row['date'] == str(day)]
+        summary = DailyAttendanceSummary.objects.get(date=day)
+        assert summary.present + summary.absent == len(rows) == 3
+        assert (summary.present, summary.absent) == (
+            sum(row['is_present'] for row in rows), sum(not row['is_present'] for row in rows),
+        )
+
+        summary.delete()
+        rebuild_summaries()
+        recounted = get_summary(day)
+        assert (recounted.present, recounted.absent) == (summary.present, summary.absent)
+
+        stats = authenticated_hr_client.get(reverse('attendance-stats'), {'date': str(day), 'period': 'day'}).data
+        assert sum(employee['present'] + employee['absent'] for employee in stats['results']) == 3
+        grid = authenticated_hr_client.get(reverse('attendance-grid'), {'date': str(day), 'period': 'month'}).data
+        assert year_end_week[0].id not in {employee['id'] for employee in grid['employees']}
+
+    def test_only_closed_years(self, year_end_week):
+        """last year and this year stay in the table."""
+        with pytest.raises(CommandError):
+            call_command('archive_attendance', '--year', str(date.today().year - 1))
+
+    def test_default_archives_every_closed_year(self, year_end_week):
+        """without --year, every closed year with attendance is archived."""
+        call_command('archive_attendance')
+
+        assert set(AttendanceArchive.objects.values_list('year', flat=True)) == {2021, 2022}
+        assert not Attendance.objects.exists()
@@ -0,0 +1,91 @@
+import json
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+from django.utils import timezone
+from rest_framework import status
+from django.urls import reverse
+from hr.authentication import HRRefreshToken
+from hr.factories import AttendanceFactory, EmployeeFactory
+
+
+def async_get(user, url, **params):
+    """issuing a GET through the ASGI handler with a JWT for the user."""
+    headers = {'Authorization': f'Bearer {HRRefreshToken.for_user(user).access_token}'}
+    return async_to_sync(AsyncClient().get)(url, params, headers=headers)
+
+
+@pytest.mark.django_db
+class TestAsyncReads:
+    def test_dashboard_matches_sync(self, authenticated_hr_client, hr_user):
+        """the async dashboard returns the same body as the sync one."""
+        AttendanceFactory.create_batch(3, date=timezone.now().date())
+
+        response = async_get(hr_user, reverse('dashboard-async'))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == json.loads(authenticated_hr_client.get(reverse('dashboard')).content)
+
+    def test_attendance_list_matches_sync(self, authenticated_hr_client, hr_user):
+        """the async attendance list returns the same rows as the sync one."""
+        AttendanceFactory.create_batch(3, date=timezone.now().date())
+
+        response = async_get(hr_user, reverse('attendance-list-async'), period='week')
+
+        expected = authenticated_hr_client.get(reverse('attendance-list'), {'period': 'week'})
+        assert response.json() == json.loads(expected.content)
+        assert len(response.json()) == 3
+
+    def test_attendance_list_paginated(self, hr_user):
+        """the async attendance list honours cursor pagination."""
+        AttendanceFactory.create_batch(3, date=timezone.now().date())
+
+        response = async_get(hr_user, reverse('attendance-list-async'), page_size=2)
+
+        assert len(response.json()['results']) == 2
+        assert response.json()['next']
+
+    def test_attendance_csv_export(self, hr_user):
+        """the async CSV export streams a header and one line per record."""
+        AttendanceFactory.create_batch(2, date=timezone.now().date())
+
+        response = async_get(hr_user, reverse('attendance-list-async'), export='csv')
+
+        async def read():
+            return b''.join([chunk async for chunk in response.streaming_content])
+
+        lines = async_to_sync(read)().decode().splitlines()
+        assert lines[0] == 'Date,Employee Name,Email,Status,Marked By,Marked At'
+        assert len(lines) == 3
+
+    def test_employee_list_and_detail(self, hr_user):
+        """employees can be listed and fetched one by one."""
+        employee = EmployeeFactory()
+
+        listing = async_get(hr_user, reverse('employee-list-async'))
+        detail = async_get(hr_user, reverse('employee-detail-async', args=[employee.id]))
+        missing = async_get(hr_user, reverse('employee-detail-async', args=[999999]))
+
+        assert {row['id'] for row in listing.json()} == {hr_user.id, employee.id}
+        assert detail.json()['username'] == employee.username
+        assert missing.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_attendance_detail(self, hr_user):
+        """an attendance record can be fetched."""
+        attendance = AttendanceFactory()
+
+        response = async_get(hr_user, reverse('attendance-detail-async', args=[attendance.id]))
+
+        assert response.json()['employee_name'] == attendance.employee.username
+
+    def test_normal_user_forbidden(self, normal_user):
+        """normal users cannot use the async reads."""
+        response = async_get(normal_user, reverse('dashboard-async'))
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_requires_token(self, db):
+        """requests without a token are rejected."""
+        response = async_to_sync(AsyncClient().get)(reverse('dashboard-async'))
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
@@ -1,4 +1,9 @@
+import io
 import pytest
+from datetime import date, timedelta
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from openpyxl import load_workbook
 from django.utils import timezone  
 from rest_framework import status
 from django.urls import reverse
@@ -71,3 +76,123 @@ class TestAttendanceDelete:
         attendance = AttendanceFactory()
         response = authenticated_normal_user_client.delete(reverse('attendance-detail', args=[attendance.id]))
         assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+@pytest.mark.django_db
+class TestAttendanceExport:
+    def test_csv_export_streams_rows(self, authenticated_hr_client):
+        """CSV export is streamed with a header and one line per record."""
+        today = timezone.now().date()
+        attendance = AttendanceFactory(date=today, is_present=False, employee__first_name='Ann', employee__last_name='Lee')
+        AttendanceFactory.create_batch(2, date=today)
+
+        response = authenticated_hr_client.get(reverse('attendance-list'), {'export': 'csv'})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.streaming
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        assert lines[0] == 'Date,Employee Name,Email,Status,Marked By,Marked At'
+        assert len(lines) == 4
+        assert f"{today},Ann Lee,{attendance.employee.email},Absent,{attendance.created_by.username}," in '\n'.join(lines)
+
+
+@pytest.mark.django_db
+class TestAttendanceBulk:
+    def test_bulk_creates_and_updates(self, authenticated_hr_client):
+        """a roll call creates new records and updates existing ones in one request."""
+        today = timezone.now().date()
+        existing = AttendanceFactory(date=today, is_present=True)
+        employees = EmployeeFactory.create_batch(2)
+        payload = [
+            {'employee': employees[0].id, 'date': str(today), 'is_present': True},
+            {'employee': employees[1].id, 'date': str(today), 'is_present': False},
+            {'employee': existing.employee.id, 'date': str(today), 'is_present': False},
+        ]
+
+        response = authenticated_hr_client.post(reverse('attendance-bulk'), payload, format='json')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert (response.data['created'], response.data['updated'], response.data['failed']) == (2, 1, 0)
+        assert [result['status'] for result in response.data['results']] == ['created', 'created', 'updated']
+        assert response.data['results'][2]['id'] == existing.id
+        existing.refresh_from_db()
+        assert existing.is_present is False
+
+    def test_bulk_reports_invalid_items(self, authenticated_hr_client):
+        """invalid entries are reported per item without failing the others."""
+        employee = EmployeeFactory()
+        today = str(timezone.now().date())
+        payload = [
+            {'employee': 9999, 'date': today},
+            {'employee': employee.id, 'date': 'not-a-date'},
+            {'employee': employee.id, 'date': today, 'is_present': False},
+            {'employee': employee.id, 'date': today, 'is_present': True},
+        ]
+
+        response = authenticated_hr_client.post(reverse('attendance-bulk'), payload, format='json')
+
+        statuses = [result['status'] for result in response.data['results']]
+        assert statuses == ['error', 'error', 'superseded', 'created']
+        assert 'employee' in response.data['results'][0]['errors']
+        assert 'date' in response.data['results'][1]['errors']
+        assert response.data['results'][2]['id'] == response.data['results'][3]['id']
+
+    def test_bulk_query_count_is_constant(self, authenticated_hr_client, django_assert_max_num_queries):
+        """a 50-entry roll call takes no more queries than a single entry."""
+        today = timezone.now().date()
+        employees = EmployeeFactory.create_batch(50)
+
+        def roll_call(day, employees):
+            payload = [{'employee': employee.id, 'date': str(day), 'is_present': True} for employee in employees]
+            return authenticated_hr_client.post(reverse('attendance-bulk'), payload, format='json')
+
+        with CaptureQueriesContext(connection) as single:
+            roll_call(today - timedelta(days=1), employees[:1])
+        with django_assert_max_num_queries(len(single)):
+            response = roll_call(today, employees)
+
+        assert response.data['created'] == 50
+
+    def test_bulk_requires_list(self, authenticated_hr_client):
+        """a payload that is not a list is rejected."""
+        response = authenticated_hr_client.post(reverse('attendance-bulk'), {'employee': 1}, format='json')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_normal_user_cannot_bulk_mark(self, authenticated_normal_user_client):
+        """Normal user cannot use the bulk endpoint."""
+        response = authenticated_normal_user_client.post(reverse('attendance-bulk'), [], format='json')
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+@pytest.mark.django_db
+class TestAttendanceXlsxExport:
+    def read_workbook(self, response):
+        return load_workbook(io.BytesIO(b''.join(response.streaming_content)))
+
+    def test_xlsx_export(self, authenticated_hr_client):
+        """XLSX export has a header and one row per record."""
+        today = timezone.now().date()
+        AttendanceFactory.create_batch(2, date=today, is_present=False)
+
+        response = authenticated_hr_client.get(reverse('attendance-list'), {'export': 'xlsx'})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response['Content-Disposition'] == f'attachment; filename="attendance_day_{today}.xlsx"'
+        rows = list(self.read_workbook(response).active.values)
+        assert rows[0] == ('Date', 'Employee Name', 'Email', 'Status', 'Marked By', 'Marked At')
+        assert [row[3] for row in rows[1:]] == ['Absent', 'Absent']
+
+    def test_yearly_xlsx_has_a_sheet_per_month(self, authenticated_hr_client):
+        """a yearly export puts each month on its own sheet."""
+        AttendanceFactory(date=date(2024, 1, 15))
+        AttendanceFactory.create_batch(2, date=date(2024, 3, 1))
+
+        response = authenticated_hr_client.get(
+            reverse('attendance-list'), {'export': 'xlsx', 'period': 'year', 'date': '2024-06-01'}
+        )
+
+        workbook = self.read_workbook(response)
+        assert workbook.sheetnames == [f'2024-{month:02d}' for month in range(1, 13)]
+        assert workbook['2024-01'].max_row == 2
+        assert workbook['2024-03'].max_row == 3
+        assert workbook['2024-02'].max_row == 1
@@ -0,0 +1,81 @@
+import pytest
+from django.utils import timezone
+from rest_framework import status
+from django.urls import reverse
+from hr.factories import AttendanceFactory, EmployeeFactory
+
+
+@pytest.mark.django_db
+class TestResponseCache:
+    def test_repeat_read_is_a_hit(self, authenticated_hr_client):
+        """the second identical read is served from the cache."""
+        AttendanceFactory(date=timezone.now().date())
+
+        first = authenticated_hr_client.get(reverse('attendance-list'))
+        second = authenticated_hr_client.get(reverse('attendance-list'))
+
+        assert first['X-Cache'] == 'MISS'
+        assert second['X-Cache'] == 'HIT'
+        assert second.data == first.data
+
+    def test_write_invalidates(self, authenticated_hr_client):
+        """a write through the API bumps the version and the next read misses."""
+        employee = EmployeeFactory()
+        authenticated_hr_client.get(reverse('attendance-list'))
+
+        authenticated_hr_client.post(reverse('attendance-list'), {
+            'employee': employee.id, 'date': timezone.now().date(), 'is_present': True,
+        })
+        response = authenticated_hr_client.get(reverse('attendance-list'))
+
+        assert response['X-Cache'] == 'MISS'
+        assert len(response.data) == 1
+
+    def test_orm_writes_invalidate(self, authenticated_hr_client):
+        """saves and deletes outside the API, as the admin or a shell makes them, also bump the version."""
+        today = timezone.now().date()
+        employee = EmployeeFactory()
+        attendance = AttendanceFactory(employee=employee, date=today)
+
+        def cached_list():
+            authenticated_hr_client.get(reverse('attendance-list'))
+            assert authenticated_hr_client.get(reverse('attendance-list'))['X-Cache'] == 'HIT'
+
+        def next_read():
+            response = authenticated_hr_client.get(reverse('attendance-list'))
+            assert response['X-Cache'] == 'MISS'
+            return response.data
+
+        cached_list()
+        attendance.is_present = not attendance.is_present
+        attendance.save()
+        assert next_read()[0]['is_present'] == attendance.is_present
+
+        cached_list()
+        attendance.delete()
+        assert next_read() == []
+
+        AttendanceFactory(employee=employee, date=today)
+        cached_list()
+        employee.delete()
+        assert next_read() == []
+
+    def test_cache_never_bypasses_authorization(self, authenticated_hr_client, normal_user):
+        """a cached dashboard is not served to a normal user."""
+        authenticated_hr_client.get(reverse('dashboard'))
+        authenticated_hr_client.force_authenticate(user=normal_user)
+
+        response = authenticated_hr_client.get(reverse('dashboard'))
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_stats_count_hits_and_misses(self, authenticated_hr_client):
+        """the stats endpoint reports hit and miss counters."""
+        before = authenticated_hr_client.get(reverse('cache-stats')).data
+        authenticated_hr_client.get(reverse('dashboard'))
+        authenticated_hr_client.get(reverse('dashboard'))
+
+        after = authenticated_hr_client.get(reverse('cache-stats')).data
+
+        assert after['hits'] == before['hits'] + 1
+        assert after['misses'] == before['misses'] + 1
@@ -0,0 +1,134 @@
+import pytest
+from datetime import date, timedelta
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from hr.changes import encode_cursor
+from hr.factories import AttendanceFactory, EmployeeFactory
+from hr.models import Tombstone
+
+
+@pytest.fixture(autouse=True)
+def no_settle_window(settings):
+    settings.SYNC_SETTLE_SECONDS = 0
+
+
+@pytest.fixture
+def marked(hr_user):
+    return [
+        AttendanceFactory(date=date(2024, 5, day), created_by=hr_user, is_present=day % 2 == 0)
+        for day in range(1, 5)
+    ]
+
+
+def sync(client, name, cursor=None, **params):
+    if cursor:
+        params['cursor'] = cursor
+    return client.get(reverse(name), params)
+
+
+@pytest.mark.django_db
+class TestChangeFeed:
+    def test_initial_sync_then_nothing_new(self, authenticated_hr_client, marked):
+        """the first poll returns every row; the next one returns nothing."""
+        first = sync(authenticated_hr_client, 'attendance-changes')
+        assert first.status_code == status.HTTP_200_OK
+        assert [row['id'] for row in first.data['changed']] == [attendance.id for attendance in marked]
+        assert set(first.data['changed'][0]) == {
+            'id', 'employee', 'date', 'is_present', 'created_by', 'created_at', 'updated_at',
+        }
+        assert first.data['deleted'] == []
+        assert first.data['has_more'] is False
+
+        second = sync(authenticated_hr_client, 'attendance-changes', first.data['cursor'])
+        assert second.data['changed'] == []
+        assert second.data['deleted'] == []
+
+    def test_updates_and_deletes(self, authenticated_hr_client, marked):
+        """a poll reports just the rows changed and deleted since the cursor."""
+        cursor = sync(authenticated_hr_client, 'attendance-changes').data['cursor']
+        authenticated_hr_client.put(
+            reverse('attendance-detail', args=[marked[0].id]), {'is_present': True}, format='json'
+        )
+        authenticated_hr_client.delete(reverse('attendance-detail', args=[marked[1].id]))
+
+        response = sync(authenticated_hr_client, 'attendance-changes', cursor)
+        assert [(row['id'], row['is_present']) for row in response.data['changed']] == [(marked[0].id, True)]
+        assert response.data['deleted'] == [marked[1].id]
+
+    def test_employee_deletion(self, authenticated_hr_client, hr_user):
+        """deleting an employee leaves tombstones for them and their attendance, and unsets them as marker."""
+        marker = EmployeeFactory()
+        employee = EmployeeFactory()
+        own = AttendanceFactory(employee=marker, date=date(2024, 5, 1), created_by=hr_user)
+        marked_by_them = AttendanceFactory(employee=employee, date=date(2024, 5, 1), created_by=marker)
+        attendance_cursor = sync(authenticated_hr_client, 'attendance-changes').data['cursor']
+        employee_cursor = sync(authenticated_hr_client, 'employee-changes').data['cursor']
+
+        authenticated_hr_client.delete(reverse('employee-detail', args=[marker.id]))
+
+        employees = sync(authenticated_hr_client, 'employee-changes', employee_cursor)
+        attendance = sync(authenticated_hr_client, 'attendance-changes', attendance_cursor)
+        assert employees.data['deleted'] == [marker.id]
+        assert attendance.data['deleted'] == [own.id]
+        assert [(row['id'], row['created_by']) for row in attendance.data['changed']] == [(marked_by_them.id, None)]
+
+    def test_paging(self, authenticated_hr_client, marked):
+        """small pages walk the whole feed and then report no more."""
+        seen = []
+        response = sync(authenticated_hr_client, 'attendance-changes', page_size=3)
+        while True:
+            seen += [row['id'] for row in response.data['changed']]
+            if not response.data['has_more']:
+                break
+            response = sync(authenticated_hr_client, 'attendance-changes', response.data['cursor'], page_size=3)
+        assert seen == [attendance.id for attendance in marked]
+
+    def test_employee_feed(self, authenticated_hr_client, hr_user):
+        """employee rows match the employee list's fields."""
+        response = sync(authenticated_hr_client, 'employee-changes')
+        listing = authenticated_hr_client.get(reverse('employee-list'))
+        assert response.data['changed'] == listing.data
+
+    def test_settle_window(self, authenticated_hr_client, marked, settings):
+        """rows younger than the settle window wait for the next poll."""
+        settings.SYNC_SETTLE_SECONDS = 60
+        response = sync(authenticated_hr_client, 'attendance-changes')
+        assert response.data['changed'] == []
+
+    def test_invalid_and_expired_cursors(self, authenticated_hr_client, settings):
+        """a garbled cursor is a 400, one older than the kept tombstones a 410."""
+        invalid = sync(authenticated_hr_client, 'attendance-changes', 'not-a-cursor')
+        expired = sync(
+            authenticated_hr_client, 'attendance-changes',
+            encode_cursor(None, None, timezone.now() - timedelta(days=settings.SYNC_TOMBSTONE_DAYS + 1)),
+        )
+        assert invalid.status_code == status.HTTP_400_BAD_REQUEST
+        assert expired.status_code == status.HTTP_410_GONE
+
+    @pytest.mark.parametrize('changed, deleted', [
+        (['garbage', 1], None),
+        (None, ['2024-05-01T00:00:00+00:00', 'x']),
+        (['2024-05-01T00:00:00', 1], None),
+        ([['2024-05-01T00:00:00+00:00'], 1], None),
+        (['2024-05-01T00:00:00+00:00', 2 ** 70], None),
+    ])
+    def test_cursor_with_invalid_positions(self, authenticated_hr_client, changed, deleted):
+        """a cursor whose positions are not (timestamp, id) pairs is a 400."""
+        response = sync(authenticated_hr_client, 'attendance-changes', encode_cursor(changed, deleted, timezone.now()))
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_prune_tombstones(self, settings):
+        """only tombstones past the retention are pruned."""
+        old = timezone.now() - timedelta(days=settings.SYNC_TOMBSTONE_DAYS + 1)
+        Tombstone.objects.create(kind='attendance', object_id=1, deleted_at=old)
+        Tombstone.objects.create(kind='attendance', object_id=2)
+
+        call_command('prune_tombstones')
+        assert list(Tombstone.objects.values_list('object_id', flat=True)) == [2]
+
+    def test_unauthorized(self, authenticated_normal_user_client):
+        response = sync(authenticated_normal_user_client, 'attendance-changes')
+        assert response.status_code == status.HTTP_403_FORBIDDEN
@@ -0,0 +1,178 @@
+import gzip
+import threading
+import pytest
+from asgiref.sync import async_to_sync
+from datetime import date
+from django.db import connection
+from django.test import AsyncClient, RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from hr.authentication import HRRefreshToken
+from hr.compression import ENCODERS, negotiate_encoding
+from hr.export_jobs import process_next_job
+from hr.exports import cached_compressed_csv
+from hr.factories import AttendanceFactory, EmployeeFactory
+
+MAY = {'date': '2024-05-10', 'period': 'month'}
+
+
+@pytest.fixture(autouse=True)
+def cache_dirs(settings, tmp_path):
+    settings.EXPORT_CACHE_DIR = tmp_path / 'cache'
+    settings.EXPORT_JOB_DIR = tmp_path / 'jobs'
+    return settings.EXPORT_CACHE_DIR
+
+
+@pytest.fixture
+def may_attendance(hr_user):
+    employees = EmployeeFactory.create_batch(5)
+    return [
+        AttendanceFactory(employee=employee, date=date(2024, 5, day), created_by=hr_user)
+        for employee in employees
+        for day in range(1, 11)
+    ]
+
+
+def body(response):
+    if response.streaming:
+        return b''.join(response.streaming_content)
+    return response.content
+
+
+@pytest.mark.django_db
+class TestCompression:
+    def test_json_is_gzipped(self, authenticated_hr_client, may_attendance):
+        """JSON lists are compressed for clients that accept gzip, and still revalidate."""
+        plain = authenticated_hr_client.get(reverse('attendance-list'), MAY)
+        compressed = authenticated_hr_client.get(reverse('attendance-list'), MAY, HTTP_ACCEPT_ENCODING='gzip')
+
+        assert 'Content-Encoding' not in plain
+        assert 'Accept-Encoding' in plain['Vary']
+        assert compressed['Content-Encoding'] == 'gzip'
+        assert gzip.decompress(compressed.content) == plain.content
+        assert len(compressed.content) * 10 < len(plain.content)
+        assert compressed['ETag'] == f"W/{plain['ETag']}"
+
+        revalidated = authenticated_hr_client.get(
+            reverse('attendance-list'), MAY, HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=compressed['ETag']
+        )
+        assert revalidated.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_streamed_csv_is_gzipped(self, authenticated_hr_client, may_attendance, cache_dirs):
+        """the current period's CSV is compressed while it streams, and not stored."""
+        today = timezone.now().date()
+        for attendance in may_attendance[::10]:
+            AttendanceFactory(employee=attendance.employee, date=today, created_by=attendance.created_by)
+        params = {'date': today, 'period': 'day', 'export': 'csv'}
+        plain = authenticated_hr_client.get(reverse('attendance-list'), params)
+        compressed = authenticated_hr_client.get(reverse('attendance-list'), params, HTTP_ACCEPT_ENCODING='gzip')
+
+        assert compressed.streaming
+        assert compressed['Content-Encoding'] == 'gzip'
+        assert gzip.decompress(body(compressed)) == body(plain)
+        assert not cache_dirs.exists()
+
+    def test_past_csv_is_cached(self, authenticated_hr_client, may_attendance, cache_dirs, hr_user):
+        """a past period's compressed CSV is stored and served again without reading the rows."""
+        url = reverse('attendance-list')
+        params = {**MAY, 'export': 'csv'}
+        plain = body(authenticated_hr_client.get(url, params))
+        first = authenticated_hr_client.get(url, params, HTTP_ACCEPT_ENCODING='gzip')
+        with CaptureQueriesContext(connection) as queries:
+            second = authenticated_hr_client.get(url, params, HTTP_ACCEPT_ENCODING='gzip')
+
+        assert first['Content-Encoding'] == second['Content-Encoding'] == 'gzip'
+        assert gzip.decompress(body(first)) == gzip.decompress(body(second)) == plain
+        assert not any('"employee_id"' in query['sql'] and 'ORDER BY' in query['sql'] for query in queries)
+        assert len(list(cache_dirs.iterdir())) == 1
+
+        AttendanceFactory(employee=hr_user, date=date(2024, 5, 20), created_by=hr_user)
+        changed = authenticated_hr_client.get(url, params, HTTP_ACCEPT_ENCODING='gzip')
+        assert gzip.decompress(body(changed)).count(b'\n') == plain.count(b'\n') + 1
+        assert len(list(cache_dirs.iterdir())) == 1
+
+    def test_concurrent_misses_write_separate_files(self, cache_dirs):
+        """two threads filling the same cache entry at once each write a file of their own."""
+        both_writing = threading.Barrier(2, timeout=5)
+        row = (date(2024, 5, 1), 'Ada', 'Lovelace', 'ada@example.com', True, 'hr', timezone.now())
+        bodies, errors = [], []
+
+        def get_rows():
+            yield row
+            both_writing.wait()
+            yield row
+
+        def miss():
+            try:
+                response = cached_compressed_csv(get_rows, 'month', '2024-05-10', 'month_2024-05-01_1', 'gzip')
+                bodies.append(gzip.decompress(body(response)))
+                response.close()
+            except Exception as exc:
+                errors.append(exc)
+
+        threads = [threading.Thread(target=miss) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert errors == []
+        assert len(bodies) == 2 and bodies[0] == bodies[1] and bodies[0].count(b'\n') == 3
+        assert [path.name for path in cache_dirs.iterdir()] == ['month_2024-05-01_1.csv.gz']
+
+    def test_declined_encodings(self, authenticated_hr_client, may_attendance):
+        """gzip;q=0 and unknown codings get the plain response."""
+        for header in ('gzip;q=0', 'compress'):
+            response = authenticated_hr_client.get(reverse('attendance-list'), MAY, HTTP_ACCEPT_ENCODING=header)
+            assert 'Content-Encoding' not in response
+
+    def test_ranged_downloads_are_not_compressed(self, authenticated_hr_client, may_attendance):
+        """byte ranges of export downloads refer to the stored file, so it is sent as is."""
+        created = authenticated_hr_client.post(reverse('export-job-list'), {**MAY, 'format': 'csv'})
+        process_next_job()
+        response = authenticated_hr_client.get(
+            reverse('export-job-download', args=[created.data['id']]), HTTP_ACCEPT_ENCODING='gzip'
+        )
+        assert 'Content-Encoding' not in response
+
+    def test_async_stream_is_gzipped(self, hr_user, may_attendance):
+        """async streaming responses are compressed too."""
+        today = timezone.now().date()
+        for attendance in may_attendance[::10]:
+            AttendanceFactory(employee=attendance.employee, date=today, created_by=hr_user)
+        headers = {
+            'Authorization': f'Bearer {HRRefreshToken.for_user(hr_user).access_token}',
+            'Accept-Encoding': 'gzip',
+        }
+        response = async_to_sync(AsyncClient().get)(
+            reverse('attendance-list-async'), {'export': 'csv'}, headers=headers,
+        )
+
+        async def read():
+            return b''.join([chunk async for chunk in response.streaming_content])
+
+        assert response['Content-Encoding'] == 'gzip'
+        assert gzip.decompress(async_to_sync(read)()).count(b'\n') == 6
+
+
+def test_negotiation():
+    """the client's q-values decide, and brotli wins ties when it is available."""
+    def negotiate(header):
+        return negotiate_encoding(RequestFactory().get('/', HTTP_ACCEPT_ENCODING=header))
+
+    preferred = 'br' if 'br' in ENCODERS else 'gzip'
+    assert negotiate('gzip, deflate, br') == preferred
+    assert negotiate('br;q=0.5, gzip') == 'gzip'
+    assert negotiate('*') == preferred
+    assert negotiate('identity') is None
+    assert negotiate('') is None
+
+
+def test_brotli_round_trip():
+    brotli = pytest.importorskip('brotli')
+    from hr.compression import compress_bytes, compress_stream
+    data = b'2024-05-10,Jane Doe,jane@example.com,Present\n' * 1000
+    assert brotli.decompress(compress_bytes(data, 'br')) == data
+    assert brotli.decompress(b''.join(compress_stream(iter([data[:500], data[500:]]), 'br'))) == data
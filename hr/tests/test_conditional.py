@@ -0,0 +1,79 @@
+import pytest
+from django.utils import timezone
+from rest_framework import status
+from django.urls import reverse
+from hr.factories import AttendanceFactory
+
+
+@pytest.mark.django_db
+class TestConditionalGet:
+    def test_attendance_list_not_modified(self, authenticated_hr_client):
+        """a matching If-None-Match gets a 304 with an empty body."""
+        AttendanceFactory.create_batch(2, date=timezone.now().date())
+        first = authenticated_hr_client.get(reverse('attendance-list'))
+
+        second = authenticated_hr_client.get(reverse('attendance-list'), HTTP_IF_NONE_MATCH=first['ETag'])
+
+        assert second.status_code == status.HTTP_304_NOT_MODIFIED
+        assert second.content == b''
+        assert second['ETag'] == first['ETag']
+
+    def test_attendance_list_changes_after_write(self, authenticated_hr_client):
+        """updating and deleting a row in the period change the ETag."""
+        attendance = AttendanceFactory(date=timezone.now().date(), is_present=True)
+        AttendanceFactory(date=timezone.now().date())
+        etag = authenticated_hr_client.get(reverse('attendance-list'))['ETag']
+
+        authenticated_hr_client.put(reverse('attendance-detail', args=[attendance.id]), {'is_present': False})
+        response = authenticated_hr_client.get(reverse('attendance-list'), HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+
+        authenticated_hr_client.delete(reverse('attendance-detail', args=[attendance.id]))
+        deleted = authenticated_hr_client.get(reverse('attendance-list'), HTTP_IF_NONE_MATCH=response['ETag'])
+        assert deleted.status_code == status.HTTP_200_OK
+        assert len(deleted.data) == 1
+
+    def test_attendance_list_changes_after_employee_rename(self, authenticated_hr_client):
+        """renaming an employee shown in the list changes the ETag."""
+        attendance = AttendanceFactory(date=timezone.now().date())
+        etag = authenticated_hr_client.get(reverse('attendance-list'))['ETag']
+
+        authenticated_hr_client.put(reverse('employee-detail', args=[attendance.employee.id]), {'username': 'renamed'})
+        response = authenticated_hr_client.get(reverse('attendance-list'), HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data[0]['employee_name'] == 'renamed'
+
+    def test_lists_ignore_if_modified_since(self, authenticated_hr_client):
+        """lists send no Last-Modified, so deleting an older row is never answered with a 304."""
+        older = AttendanceFactory(date=timezone.now().date())
+        AttendanceFactory(date=timezone.now().date())
+        since = authenticated_hr_client.get(reverse('employee-detail', args=[older.employee.id]))['Last-Modified']
+        for url in (reverse('attendance-list'), reverse('employee-list')):
+            assert 'Last-Modified' not in authenticated_hr_client.get(url)
+
+        authenticated_hr_client.delete(reverse('employee-detail', args=[older.employee.id]))
+
+        for url in (reverse('attendance-list'), reverse('employee-list')):
+            response = authenticated_hr_client.get(url, HTTP_IF_MODIFIED_SINCE=since)
+            assert response.status_code == status.HTTP_200_OK
+
+    def test_detail_views(self, authenticated_hr_client):
+        """detail views validate against the object's updated_at."""
+        attendance = AttendanceFactory()
+        for url in (
+            reverse('attendance-detail', args=[attendance.id]),
+            reverse('employee-detail', args=[attendance.employee.id]),
+        ):
+            etag = authenticated_hr_client.get(url)['ETag']
+            response = authenticated_hr_client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_no_304_for_normal_user(self, authenticated_hr_client, normal_user):
+        """the conditional check never answers for an unauthorized user."""
+        etag = authenticated_hr_client.get(reverse('attendance-list'))['ETag']
+        authenticated_hr_client.force_authenticate(user=normal_user)
+
+        response = authenticated_hr_client.get(reverse('attendance-list'), HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
@@ -0,0 +1,120 @@
+import importlib
+import threading
+import pytest
+from django.apps import apps
+from django.conf import settings
+from django.db import OperationalError, connection, connections, transaction
+
+STOCK_SQLITE = 'django.db.backends.sqlite3'
+WRITERS = 4
+INCREMENTS = 25
+
+
+@pytest.fixture
+def sqlite_alias(tmp_path):
+    """adding aliases for one SQLite file in a temporary directory."""
+    added = []
+
+    def add(alias, engine='hr.backends.sqlite3'):
+        options = {'timeout': 10}
+        if engine != STOCK_SQLITE:
+            options['pragmas'] = settings.SQLITE_PRAGMAS
+        connections.settings[alias] = connections.configure_settings({
+            **connections.settings,
+            alias: {'ENGINE': engine, 'NAME': tmp_path / 'embedded.sqlite3', 'OPTIONS': options},
+        })[alias]
+        added.append(alias)
+        return connections[alias]
+
+    yield add
+    for alias in added:
+        connections[alias].close()
+        del connections[alias]
+        del connections.settings[alias]
+
+
+def create_counter(conn):
+    with conn.cursor() as cursor:
+        cursor.execute('PRAGMA journal_mode = wal')
+        cursor.execute('CREATE TABLE counter (n integer)')
+        cursor.execute('INSERT INTO counter VALUES (0)')
+
+
+def increment(alias):
+    """read, then write, in one transaction."""
+    with transaction.atomic(using=alias), connections[alias].cursor() as cursor:
+        cursor.execute('SELECT n FROM counter')
+        (n,) = cursor.fetchone()
+        cursor.execute('UPDATE counter SET n = %s', [n + 1])
+
+
+@pytest.mark.django_db
+class TestEmbeddedSQLite:
+    def test_pragmas(self, sqlite_alias):
+        """every connection is switched to WAL with the tuned pragmas."""
+        with sqlite_alias('embedded').cursor() as cursor:
+            for name, expected in (
+                ('journal_mode', 'wal'),
+                ('synchronous', 1),
+                ('cache_size', settings.SQLITE_PRAGMAS['cache_size']),
+                ('mmap_size', settings.SQLITE_PRAGMAS['mmap_size']),
+                ('busy_timeout', 10000),
+            ):
+                cursor.execute(f'PRAGMA {name}')
+                assert cursor.fetchone()[0] == expected, name
+
+    def test_stock_backend_fails_read_then_write(self, sqlite_alias):
+        """with deferred transactions, a write after another commit fails at once."""
+        first, second = sqlite_alias('first', STOCK_SQLITE), sqlite_alias('second', STOCK_SQLITE)
+        create_counter(first)
+
+        with pytest.raises(OperationalError, match='database is locked'):
+            with transaction.atomic(using='first'), first.cursor() as cursor:
+                cursor.execute('SELECT n FROM counter')
+                with second.cursor() as other:
+                    other.execute('UPDATE counter SET n = 1')
+                cursor.execute('UPDATE counter SET n = 2')
+
+    def test_writers_queue(self, sqlite_alias):
+        """concurrent read-then-write transactions wait for each other and all commit."""
+        create_counter(sqlite_alias('embedded'))
+        errors = []
+
+        def write():
+            try:
+                for _ in range(INCREMENTS):
+                    increment('embedded')
+            except OperationalError as exc:
+                errors.append(exc)
+            finally:
+                connections['embedded'].close()
+
+        threads = [threading.Thread(target=write) for _ in range(WRITERS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert errors == []
+        with connections['embedded'].cursor() as cursor:
+            cursor.execute('SELECT n FROM counter')
+            assert cursor.fetchone()[0] == WRITERS * INCREMENTS
+
+
+@pytest.mark.django_db
+class TestMigratedIndexes:
+    def test_model_indexes(self):
+        """the migrations create every index the models declare."""
+        with connection.cursor() as cursor:
+            for model in apps.get_app_config('hr').get_models():
+                constraints = connection.introspection.get_constraints(cursor, model._meta.db_table)
+                for index in model._meta.indexes:
+                    assert index.name in constraints, f'{model.__name__}: {index.name}'
+
+    def test_search_indexes(self):
+        """the lower(field) search indexes exist for the current database."""
+        migration = importlib.import_module('hr.migrations.0012_employee_search_indexes')
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(cursor, 'hr_employee')
+        for index in migration.search_indexes(connection.vendor):
+            assert index.name in constraints, index.name
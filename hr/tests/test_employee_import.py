@@ -0,0 +1,148 @@
+import io
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from openpyxl import Workbook
+from rest_framework import status
+from hr.employee_import import EmployeeImporter, get_hash_executor, iter_import_rows
+from hr.factories import EmployeeFactory
+from hr.models import Employee, DailyAttendanceSummary
+
+
+def csv_upload(*lines, name='employees.csv'):
+    content = '\n'.join(('username,email,password,employee_type,first_name,last_name',) + lines)
+    return SimpleUploadedFile(name, content.encode('utf-8'), content_type='text/csv')
+
+
+def xlsx_upload(*rows):
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(['username', 'email', 'password', 'employee_type'])
+    for row in rows:
+        sheet.append(row)
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return SimpleUploadedFile('employees.xlsx', buffer.getvalue())
+
+
+@pytest.fixture(autouse=True)
+def hash_in_process(settings):
+    settings.IMPORT_HASH_WORKERS = 1
+
+
+@pytest.mark.django_db
+class TestEmployeeImport:
+    def test_import_csv(self, authenticated_hr_client):
+        """HR can import employees from a CSV file; passwords are hashed once."""
+        response = authenticated_hr_client.post(reverse('employee-import'), {'file': csv_upload(
+            'alice,alice@example.com,secret123,HR,Alice,Smith',
+            'bob,bob@example.com,secret456,,,',
+        )}, format='multipart')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data == {'created': 2, 'failed': 0, 'errors': []}
+        alice = Employee.objects.get(username='alice')
+        assert alice.check_password('secret123')
+        assert alice.employee_type == 'HR'
+        assert alice.last_name == 'Smith'
+        assert Employee.objects.get(username='bob').employee_type == 'NORMAL'
+
+    def test_import_xlsx(self, authenticated_hr_client):
+        """HR can import employees from an XLSX file."""
+        response = authenticated_hr_client.post(reverse('employee-import'), {'file': xlsx_upload(
+            ['carol', 'carol@example.com', 'secret123', 'NORMAL'],
+        )}, format='multipart')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['created'] == 1
+        assert Employee.objects.get(username='carol').check_password('secret123')
+
+    def test_import_reports_row_errors(self, authenticated_hr_client):
+        """invalid and duplicate rows are reported by line, the rest are imported."""
+        EmployeeFactory(username='taken', email='taken@example.com')
+
+        response = authenticated_hr_client.post(reverse('employee-import'), {'file': csv_upload(
+            'dave,dave@example.com,secret123,NORMAL,,',
+            'taken,new@example.com,secret123,NORMAL,,',
+            'erin,taken@example.com,secret123,NORMAL,,',
+            'dave,other@example.com,secret123,NORMAL,,',
+            'frank,not-an-email,secret123,BOSS,,',
+        )}, format='multipart')
+
+        assert response.data['created'] == 1
+        assert response.data['failed'] == 4
+        errors = {error['row']: error['errors'] for error in response.data['errors']}
+        assert set(errors[3]) == {'username'}
+        assert set(errors[4]) == {'email'}
+        assert set(errors[5]) == {'username'}
+        assert set(errors[6]) == {'email', 'employee_type'}
+        assert Employee.objects.filter(username='dave').count() == 1
+
+    def test_duplicates_across_batches(self):
+        """in-file duplicates are caught even when they fall in different batches."""
+        rows = iter_import_rows(csv_upload(
+            'gina,gina@example.com,secret123,NORMAL,,',
+            'hank,hank@example.com,secret123,NORMAL,,',
+            'gina,gina2@example.com,secret123,NORMAL,,',
+        ), 'employees.csv')
+
+        report = EmployeeImporter(batch_size=1).run(rows)
+
+        assert report['created'] == 2
+        assert report['errors'] == [{'row': 4, 'errors': {'username': ['An employee with this username already exists.']}}]
+
+    def test_import_updates_headcount(self, authenticated_hr_client):
+        """imported employees are counted in today's summary."""
+        authenticated_hr_client.get(reverse('dashboard'))
+        before = DailyAttendanceSummary.objects.get(date=timezone.now().date()).total_employees
+
+        authenticated_hr_client.post(reverse('employee-import'), {'file': csv_upload(
+            'ivan,ivan@example.com,secret123,NORMAL,,',
+        )}, format='multipart')
+
+        summary = DailyAttendanceSummary.objects.get(date=timezone.now().date())
+        assert summary.total_employees == before + 1
+
+    def test_import_rejects_other_formats(self, authenticated_hr_client):
+        """only CSV and XLSX files are accepted."""
+        response = authenticated_hr_client.post(reverse('employee-import'), {
+            'file': SimpleUploadedFile('employees.txt', b'username'),
+        }, format='multipart')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    @pytest.mark.parametrize('upload', [
+        SimpleUploadedFile('employees.xlsx', b'username,email,password\n'),
+        SimpleUploadedFile('employees.csv', 'username,email,password\nrené,rene@example.com,x\n'.encode('latin-1')),
+    ], ids=['xlsx-not-a-zip', 'csv-latin-1'])
+    def test_import_rejects_unreadable_files(self, authenticated_hr_client, upload):
+        """a file that cannot be read as its extension says is rejected, not a server error."""
+        response = authenticated_hr_client.post(reverse('employee-import'), {'file': upload}, format='multipart')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'error' in response.data
+
+    def test_import_unauthorized(self, authenticated_normal_user_client):
+        """normal employees cannot import employees."""
+        response = authenticated_normal_user_client.post(reverse('employee-import'), {
+            'file': csv_upload('jane,jane@example.com,secret123,NORMAL,,'),
+        }, format='multipart')
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+        assert not Employee.objects.filter(username='jane').exists()
+
+    def test_import_command(self, tmp_path):
+        """the management command imports a file, hashing in worker processes."""
+        path = tmp_path / 'employees.csv'
+        path.write_text('username,email,password\nkate,kate@example.com,secret123\nleo,leo@example.com,secret456\n')
+
+        call_command('import_employees', str(path), '--workers', '2')
+
+        assert Employee.objects.get(username='kate').check_password('secret123')
+        assert Employee.objects.get(username='leo').check_password('secret456')
+
+
+def test_hash_pool_is_reused():
+    """imports share one hashing pool per size instead of starting processes each time."""
+    assert get_hash_executor(1) is None
+    assert get_hash_executor(2) is get_hash_executor(2)
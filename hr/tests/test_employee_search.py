@@ -0,0 +1,70 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+from hr.factories import EmployeeFactory
+
+
+@pytest.fixture
+def staff(hr_user):
+    return {
+        'ana': EmployeeFactory(
+            employee_type='NORMAL', username='ana.lopez', email='ana@example.com', first_name='Ana', last_name='Lopez',
+        ),
+        'bob': EmployeeFactory(
+            employee_type='NORMAL', username='bob', email='robert.banana@example.com', first_name='Robert', last_name='Stone',
+        ),
+        'cara': EmployeeFactory(
+            employee_type='NORMAL', username='cara', email='cara@corp.test', first_name='Cara', last_name='Anders',
+            is_active=False,
+        ),
+        'hr': hr_user,
+    }
+
+
+def usernames(response):
+    rows = response.data['results'] if 'results' in response.data else response.data
+    return {row['username'] for row in rows}
+
+
+@pytest.mark.django_db
+class TestEmployeeSearch:
+    def test_filter_by_type(self, authenticated_hr_client, staff):
+        """employee_type narrows the list."""
+        response = authenticated_hr_client.get(reverse('employee-list'), {'employee_type': 'HR'})
+        assert usernames(response) == {staff['hr'].username}
+
+    def test_filter_by_active(self, authenticated_hr_client, staff):
+        """is_active accepts true/false."""
+        response = authenticated_hr_client.get(reverse('employee-list'), {'is_active': 'false'})
+        assert usernames(response) == {'cara'}
+
+    def test_search_contains(self, authenticated_hr_client, staff):
+        """search matches any part of username, email or names, ignoring case."""
+        response = authenticated_hr_client.get(reverse('employee-list'), {'search': 'ANA'})
+        assert usernames(response) == {'ana.lopez', 'bob'}
+
+    def test_search_prefix(self, authenticated_hr_client, staff):
+        """match=prefix only matches the start of a field."""
+        response = authenticated_hr_client.get(reverse('employee-list'), {'search': 'an', 'match': 'prefix'})
+        assert usernames(response) == {'ana.lopez', 'cara'}
+
+    def test_search_escapes_wildcards(self, authenticated_hr_client, staff):
+        """LIKE wildcards in the term are matched literally."""
+        response = authenticated_hr_client.get(reverse('employee-list'), {'search': '%'})
+        assert usernames(response) == set()
+
+    def test_combined_filters_paginated(self, authenticated_hr_client, staff):
+        """filters combine with each other and with cursor pagination."""
+        response = authenticated_hr_client.get(
+            reverse('employee-list'), {'search': 'a', 'is_active': 'true', 'employee_type': 'NORMAL', 'page_size': 1}
+        )
+        assert len(response.data['results']) == 1
+        following = authenticated_hr_client.get(response.data['next'])
+        assert usernames(response) | usernames(following) == {'ana.lopez', 'bob'}
+
+    def test_invalid_filters(self, authenticated_hr_client, staff):
+        """unknown filter values are rejected."""
+        for params in ({'employee_type': 'BOSS'}, {'is_active': 'maybe'}, {'match': 'fuzzy'}):
+            response = authenticated_hr_client.get(reverse('employee-list'), params)
+            assert response.status_code == status.HTTP_400_BAD_REQUEST
+            assert 'error' in response.data
@@ -0,0 +1,204 @@
+import os
+import pytest
+from datetime import date, timedelta
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from hr.export_jobs import EXPORT_JOB_STALE_AFTER, claim_next_job, parse_range, process_next_job, prune_export_jobs
+from hr.factories import AttendanceFactory
+from hr.models import AttendanceArchive, ExportJob
+
+MONTH = {'period': 'month', 'date': '2024-05-10', 'format': 'csv'}
+
+
+@pytest.fixture(autouse=True)
+def export_dir(settings, tmp_path):
+    settings.EXPORT_JOB_DIR = tmp_path
+    return tmp_path
+
+
+@pytest.fixture
+def may_attendance(hr_user):
+    return [
+        AttendanceFactory(date=date(2024, 5, day), created_by=hr_user, is_present=day % 2 == 0)
+        for day in range(1, 6)
+    ]
+
+
+def content(response):
+    return b''.join(response.streaming_content)
+
+
+@pytest.mark.django_db
+class TestExportJobs:
+    # The worker closes its connection between jobs, which would end a test transaction.
+    @pytest.mark.django_db(transaction=True)
+    def test_job_lifecycle(self, authenticated_hr_client, may_attendance):
+        """a queued job is generated by the worker, then polled and downloaded."""
+        created = authenticated_hr_client.post(reverse('export-job-list'), MONTH)
+        assert created.status_code == status.HTTP_201_CREATED
+        assert created.data['status'] == ExportJob.PENDING
+        assert created.data['download_url'] is None
+
+        call_command('run_export_worker', '--once')
+
+        polled = authenticated_hr_client.get(reverse('export-job-detail', args=[created.data['id']]))
+        assert polled.data['status'] == ExportJob.DONE
+        assert polled.data['progress'] == polled.data['total'] == 5
+
+        download = authenticated_hr_client.get(polled.data['download_url'])
+        inline = authenticated_hr_client.get(reverse('attendance-list'), {'period': 'month', 'date': '2024-05-10', 'export': 'csv'})
+        assert download.status_code == status.HTTP_200_OK
+        assert download['Accept-Ranges'] == 'bytes'
+        assert content(download) == content(inline)
+
+    @pytest.mark.django_db(transaction=True)
+    def test_worker_once_runs_one_job(self, authenticated_hr_client, may_attendance):
+        """--once processes a single job and leaves the rest queued."""
+        authenticated_hr_client.post(reverse('export-job-list'), MONTH)
+        authenticated_hr_client.post(reverse('export-job-list'), {**MONTH, 'format': 'xlsx'})
+
+        call_command('run_export_worker', '--once')
+
+        assert sorted(ExportJob.objects.values_list('status', flat=True)) == [ExportJob.DONE, ExportJob.PENDING]
+
+    def test_xlsx_job(self, authenticated_hr_client, may_attendance):
+        """Excel exports are generated the same way."""
+        created = authenticated_hr_client.post(reverse('export-job-list'), {**MONTH, 'format': 'xlsx'})
+        job = process_next_job()
+
+        assert job.pk == created.data['id']
+        assert job.status == ExportJob.DONE
+        download = authenticated_hr_client.get(reverse('export-job-download', args=[job.pk]))
+        assert content(download).startswith(b'PK')
+
+    def test_range_download(self, authenticated_hr_client, may_attendance):
+        """partial downloads get 206 with the requested bytes."""
+        created = authenticated_hr_client.post(reverse('export-job-list'), MONTH)
+        process_next_job()
+        url = reverse('export-job-download', args=[created.data['id']])
+        whole = content(authenticated_hr_client.get(url))
+
+        partial = authenticated_hr_client.get(url, HTTP_RANGE='bytes=10-19')
+        assert partial.status_code == status.HTTP_206_PARTIAL_CONTENT
+        assert partial['Content-Range'] == f'bytes 10-19/{len(whole)}'
+        assert content(partial) == whole[10:20]
+
+        tail = authenticated_hr_client.get(url, HTTP_RANGE='bytes=-7')
+        assert content(tail) == whole[-7:]
+
+        beyond = authenticated_hr_client.get(url, HTTP_RANGE=f'bytes={len(whole)}-')
+        assert beyond.status_code == status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE
+
+    def test_finished_export_is_reused_until_data_changes(self, authenticated_hr_client, may_attendance, hr_user):
+        """repeat requests get the same job until the period's data changes."""
+        first = authenticated_hr_client.post(reverse('export-job-list'), MONTH)
+        process_next_job()
+
+        repeat = authenticated_hr_client.post(reverse('export-job-list'), MONTH)
+        assert repeat.status_code == status.HTTP_200_OK
+        assert repeat.data['id'] == first.data['id']
+        assert repeat.data['status'] == ExportJob.DONE
+
+        AttendanceFactory(date=date(2024, 5, 20), created_by=hr_user)
+        changed = authenticated_hr_client.post(reverse('export-job-list'), MONTH)
+        assert changed.status_code == status.HTTP_201_CREATED
+        assert changed.data['id'] != first.data['id']
+
+    def test_pending_job_is_shared(self, authenticated_hr_client, may_attendance):
+        """a second request while the job is queued does not queue another."""
+        first = authenticated_hr_client.post(reverse('export-job-list'), MONTH)
+        second = authenticated_hr_client.post(reverse('export-job-list'), MONTH)
+
+        assert second.data['id'] == first.data['id']
+        assert ExportJob.objects.count() == 1
+
+    def test_failure_before_writing_fails_the_job(self, settings, tmp_path):
+        """an error while sizing the export marks the job failed instead of stopping the worker."""
+        settings.ATTENDANCE_ARCHIVE_DIR = tmp_path / 'missing'
+        AttendanceArchive.objects.create(year=2020, rows=1)
+        job = ExportJob.objects.create(period='month', date=date(2020, 5, 10), format='csv', fingerprint='x')
+
+        assert process_next_job().pk == job.pk
+
+        job.refresh_from_db()
+        assert job.status == ExportJob.FAILED
+        assert 'attendance-2020' in job.error
+        assert job.file == ''
+
+    def test_reclaimed_job_writes_its_own_file(self, authenticated_hr_client, may_attendance, export_dir):
+        """a new attempt at a stale job does not write into the file of the attempt it replaced."""
+        created = authenticated_hr_client.post(reverse('export-job-list'), MONTH)
+        stale = claim_next_job()
+        ExportJob.objects.filter(pk=stale.pk).update(updated_at=timezone.now() - EXPORT_JOB_STALE_AFTER * 2)
+        earlier = export_dir / f'export-{stale.pk}.csv.partial'
+        earlier.write_text('still being written')
+
+        job = process_next_job()
+
+        assert job.pk == created.data['id']
+        assert job.status == ExportJob.DONE
+        assert earlier.read_text() == 'still being written'
+        assert sorted(path.name for path in export_dir.iterdir()) == sorted([earlier.name, job.file])
+
+    def test_expired_jobs_are_pruned(self, settings, export_dir):
+        """finished jobs older than EXPORT_JOB_DAYS go with their files, and so do abandoned partial files."""
+        settings.EXPORT_JOB_DAYS = 7
+        long_ago = timezone.now() - timedelta(days=8)
+
+        def job(status, finished_at, file=''):
+            if file:
+                (export_dir / file).write_text('Date')
+            return ExportJob.objects.create(
+                period='day', date=date(2024, 5, 1), format='csv', fingerprint='x',
+                status=status, finished_at=finished_at, file=file,
+            )
+
+        job(ExportJob.DONE, long_ago, 'export-old.csv')
+        job(ExportJob.FAILED, long_ago)
+        recent = job(ExportJob.DONE, timezone.now(), 'export-new.csv')
+        queued = job(ExportJob.PENDING, None)
+        abandoned = export_dir / 'export-old.csv.1.partial'
+        abandoned.write_text('Date')
+        os.utime(abandoned, (long_ago.timestamp(), long_ago.timestamp()))
+        (export_dir / 'export-new.csv.2.partial').write_text('Date')
+
+        assert prune_export_jobs() == 2
+
+        assert set(ExportJob.objects.values_list('pk', flat=True)) == {recent.pk, queued.pk}
+        assert sorted(path.name for path in export_dir.iterdir()) == ['export-new.csv', 'export-new.csv.2.partial']
+
+    def test_download_before_done(self, authenticated_hr_client, may_attendance):
+        """downloading an unfinished job is a conflict."""
+        created = authenticated_hr_client.post(reverse('export-job-list'), MONTH)
+        response = authenticated_hr_client.get(reverse('export-job-download', args=[created.data['id']]))
+        assert response.status_code == status.HTTP_409_CONFLICT
+
+    def test_claim_is_exclusive(self, hr_user):
+        """a claimed job is not handed to a second worker."""
+        ExportJob.objects.create(period='day', date=date(2024, 5, 1), format='csv', fingerprint='x')
+
+        assert claim_next_job() is not None
+        assert claim_next_job() is None
+
+    def test_invalid_request(self, authenticated_hr_client):
+        """unknown periods and formats are rejected."""
+        response = authenticated_hr_client.post(reverse('export-job-list'), {'period': 'decade', 'format': 'pdf'})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert set(response.data) == {'period', 'format'}
+
+    def test_unauthorized(self, authenticated_normal_user_client):
+        """normal employees cannot request exports."""
+        response = authenticated_normal_user_client.post(reverse('export-job-list'), MONTH)
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+def test_parse_range():
+    """single byte ranges are parsed; other forms fall back to the whole file."""
+    assert parse_range('bytes=0-99', 50) == (0, 49)
+    assert parse_range('bytes=-10', 50) == (40, 49)
+    assert parse_range('bytes=0-1,5-6', 50) is None
+    assert parse_range(None, 50) is None
+    with pytest.raises(ValueError):
+        parse_range('bytes=60-', 50)
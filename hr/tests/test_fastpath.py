@@ -0,0 +1,44 @@
+import pytest
+from django.utils import timezone
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+from hr.models import Employee, Attendance
+from hr.serializers import EmployeeSerializer, AttendanceSerializer
+from hr.factories import AttendanceFactory, EmployeeFactory
+
+
+def serializer_json(serializer_class, queryset):
+    """the body the serializer-based path would have returned."""
+    return JSONRenderer().render(serializer_class(queryset, many=True).data)
+
+
+@pytest.mark.django_db
+class TestFastPathParity:
+    def test_attendance_list_is_byte_identical(self, authenticated_hr_client):
+        """the fast attendance list matches AttendanceSerializer's JSON byte for byte."""
+        today = timezone.now().date()
+        AttendanceFactory.create_batch(3, date=today)
+        AttendanceFactory(date=today, created_by=None, employee__username='zoë\u2028')
+
+        response = authenticated_hr_client.get(reverse('attendance-list'))
+
+        expected = Attendance.objects.filter(date=today).order_by('date', 'employee__first_name', 'id')
+        assert response.content == serializer_json(AttendanceSerializer, expected)
+
+    def test_attendance_page_is_byte_identical(self, authenticated_hr_client):
+        """a fast page holds the same rows as the serializer would produce."""
+        today = timezone.now().date()
+        AttendanceFactory.create_batch(5, date=today)
+
+        response = authenticated_hr_client.get(reverse('attendance-list'), {'page_size': 2})
+
+        expected = Attendance.objects.filter(date=today).order_by('date', 'employee__first_name', 'id')[:2]
+        assert JSONRenderer().render(response.data['results']) == serializer_json(AttendanceSerializer, expected)
+
+    def test_employee_list_is_byte_identical(self, authenticated_hr_client):
+        """the fast employee list matches EmployeeSerializer's JSON byte for byte."""
+        EmployeeFactory.create_batch(3, first_name='Łukasz', last_name='O\'Brien')
+
+        response = authenticated_hr_client.get(reverse('employee-list'))
+
+        assert response.content == serializer_json(EmployeeSerializer, Employee.objects.all())
@@ -0,0 +1,127 @@
+import json
+import pytest
+from datetime import date
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from hr.factories import AttendanceFactory, EmployeeFactory
+from hr.tests.test_async_api import async_get
+
+DAY = {'date': '2024-05-10', 'period': 'day'}
+MOBILE_FIELDS = 'id,employee,date,is_present'
+
+
+@pytest.fixture
+def day_attendance(hr_user):
+    return [
+        AttendanceFactory(date=date(2024, 5, 10), created_by=hr_user),
+        AttendanceFactory(date=date(2024, 5, 10), created_by=hr_user, is_present=False),
+        AttendanceFactory(date=date(2024, 5, 10), created_by=None),
+    ]
+
+
+def list_query(queries):
+    """the query that reads the period's attendance rows."""
+    return next(query['sql'] for query in queries if 'FROM "hr_attendance"' in query['sql'] and 'ORDER BY' in query['sql'])
+
+
+@pytest.mark.django_db
+class TestSparseFieldsets:
+    def test_attendance_list_fields(self, authenticated_hr_client, day_attendance):
+        """the rows only hold the requested fields, and the marker is not joined."""
+        full = authenticated_hr_client.get(reverse('attendance-list'), DAY)
+        with CaptureQueriesContext(connection) as queries:
+            sparse = authenticated_hr_client.get(reverse('attendance-list'), {**DAY, 'fields': MOBILE_FIELDS})
+
+        assert sparse.data == [
+            {field: row[field] for field in MOBILE_FIELDS.split(',')} for row in full.data
+        ]
+        sql = list_query(queries.captured_queries)
+        assert 'LEFT OUTER JOIN' not in sql
+        assert '"created_at"' not in sql
+
+    def test_attendance_list_exclude(self, authenticated_hr_client, day_attendance):
+        """exclude drops fields; a marker-less row still has no marker name."""
+        response = authenticated_hr_client.get(
+            reverse('attendance-list'), {**DAY, 'exclude': 'created_at,updated_at,employee_name'}
+        )
+
+        assert [set(row) for row in response.data] == [
+            {'id', 'employee', 'date', 'is_present', 'created_by', 'created_by_name'}
+            if row['created_by'] else {'id', 'employee', 'date', 'is_present', 'created_by'}
+            for row in response.data
+        ]
+
+    def test_attendance_list_paginated(self, authenticated_hr_client, day_attendance):
+        """cursor pages work when the ordering columns are not requested."""
+        first = authenticated_hr_client.get(
+            reverse('attendance-list'), {**DAY, 'fields': 'is_present', 'page_size': 2}
+        )
+        second = authenticated_hr_client.get(first.data['next'])
+
+        assert first.data['results'] + second.data['results'] == [
+            {'is_present': attendance.is_present}
+            for attendance in sorted(day_attendance, key=lambda a: (a.employee.first_name, a.id))
+        ]
+
+    def test_attendance_detail(self, authenticated_hr_client, day_attendance):
+        """the detail view narrows its fields and tells the variants apart by ETag."""
+        url = reverse('attendance-detail', args=[day_attendance[0].id])
+        full = authenticated_hr_client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            sparse = authenticated_hr_client.get(url, {'fields': MOBILE_FIELDS})
+
+        assert sparse.data == {field: full.data[field] for field in MOBILE_FIELDS.split(',')}
+        assert sparse['ETag'] != full['ETag']
+        assert ' JOIN ' not in queries.captured_queries[-1]['sql']
+
+    def test_employee_list_fields(self, authenticated_hr_client, hr_user):
+        """employee rows keep the requested fields in the usual order."""
+        EmployeeFactory(username='zed', email='zed@example.com')
+        response = authenticated_hr_client.get(reverse('employee-list'), {'fields': 'email,username'})
+
+        assert [list(row) for row in response.data] == [['username', 'email']] * 2
+        assert {row['username'] for row in response.data} == {hr_user.username, 'zed'}
+
+    def test_employee_list_paginated_without_id(self, authenticated_hr_client):
+        """the cursor still works when the id is left out."""
+        EmployeeFactory.create_batch(3)
+        first = authenticated_hr_client.get(reverse('employee-list'), {'exclude': 'id', 'page_size': 2})
+        second = authenticated_hr_client.get(first.data['next'])
+
+        assert len(first.data['results']) + len(second.data['results']) == 4
+        assert all('id' not in row for row in first.data['results'] + second.data['results'])
+
+    def test_employee_stats_fields(self, authenticated_hr_client, day_attendance):
+        """stats fields can be picked alongside employee fields."""
+        response = authenticated_hr_client.get(
+            reverse('employee-list'), {**DAY, 'stats': '1', 'fields': 'username,present,absent'}
+        )
+        assert all(set(row) == {'username', 'present', 'absent'} for row in response.data)
+        assert sum(row['present'] + row['absent'] for row in response.data) == 3
+
+    def test_employee_detail(self, authenticated_hr_client, hr_user):
+        response = authenticated_hr_client.get(
+            reverse('employee-detail', args=[hr_user.id]), {'fields': 'username'}
+        )
+        assert response.data == {'username': hr_user.username}
+
+    def test_async_views(self, hr_user, day_attendance):
+        """the async list and detail views take the same parameters."""
+        listing = async_get(hr_user, reverse('attendance-list-async'), fields='id,is_present', **DAY)
+        detail = async_get(hr_user, reverse('employee-detail-async', args=[hr_user.id]), exclude='email')
+
+        assert [set(row) for row in json.loads(listing.content)] == [{'id', 'is_present'}] * 3
+        assert 'email' not in json.loads(detail.content)
+
+    def test_invalid_fields(self, authenticated_hr_client, hr_user):
+        """unknown or empty selections are rejected."""
+        for url, params in (
+            (reverse('attendance-list'), {'fields': 'id,salary'}),
+            (reverse('employee-list'), {'exclude': 'password'}),
+            (reverse('employee-detail', args=[hr_user.id]), {'fields': ','}),
+        ):
+            response = authenticated_hr_client.get(url, params)
+            assert response.status_code == status.HTTP_400_BAD_REQUEST
+            assert 'error' in response.data
@@ -0,0 +1,81 @@
+import base64
+import json
+import pytest
+from datetime import date
+from django.urls import reverse
+from rest_framework import status
+from hr.factories import AttendanceFactory, EmployeeFactory
+from hr.grid import encode_mask
+from hr.models import Employee
+
+
+def decode_mask(mask, days):
+    bits = int.from_bytes(base64.b64decode(mask), 'little')
+    return [bool(bits >> day & 1) for day in range(days)]
+
+
+@pytest.mark.django_db
+class TestAttendanceGrid:
+    def test_month_grid(self, authenticated_hr_client, hr_user):
+        """each employee gets present/absent/unmarked masks over the month's days."""
+        employee = EmployeeFactory()
+        AttendanceFactory(employee=employee, date=date(2024, 2, 1), is_present=True)
+        AttendanceFactory(employee=employee, date=date(2024, 2, 10), is_present=False)
+        AttendanceFactory(employee=employee, date=date(2024, 2, 29), is_present=True)
+        AttendanceFactory(employee=employee, date=date(2024, 3, 1), is_present=True)
+
+        response = authenticated_hr_client.get(reverse('attendance-grid'), {'date': '2024-02-15'})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['days'] == 29
+        row = next(row for row in response.data['employees'] if row['id'] == employee.id)
+        present = decode_mask(row['present'], 29)
+        absent = decode_mask(row['absent'], 29)
+        unmarked = decode_mask(row['unmarked'], 29)
+        assert [day for day in range(29) if present[day]] == [0, 28]
+        assert [day for day in range(29) if absent[day]] == [9]
+        assert sum(unmarked) == 26
+        assert not any(p and u for p, u in zip(present, unmarked))
+
+    def test_employees_without_attendance(self, authenticated_hr_client):
+        """employees with no records in the period are fully unmarked."""
+        employee = EmployeeFactory()
+
+        response = authenticated_hr_client.get(reverse('attendance-grid'), {'date': '2024-01-05', 'period': 'year'})
+
+        row = next(row for row in response.data['employees'] if row['id'] == employee.id)
+        assert response.data['days'] == 366
+        assert all(decode_mask(row['unmarked'], 366))
+        assert not any(decode_mask(row['present'], 366))
+
+    def test_grid_is_much_smaller_than_list(self, authenticated_hr_client):
+        """the grid payload is over 20x smaller than the attendance list for the same month."""
+        Employee.objects.all().delete()
+        employees = EmployeeFactory.create_batch(10)
+        hr = EmployeeFactory(employee_type='HR')
+        authenticated_hr_client.force_authenticate(user=hr)
+        for employee in employees:
+            for day in range(1, 31):
+                AttendanceFactory(employee=employee, date=date(2024, 4, day), is_present=day % 7 != 0, created_by=hr)
+
+        params = {'date': '2024-04-01', 'period': 'month'}
+        grid = authenticated_hr_client.get(reverse('attendance-grid'), params)
+        listed = authenticated_hr_client.get(reverse('attendance-list'), params)
+
+        assert len(json.loads(listed.content)) == 300
+        assert len(listed.content) > 20 * len(grid.content)
+
+    def test_invalid_period(self, authenticated_hr_client):
+        """only month and year grids are available."""
+        response = authenticated_hr_client.get(reverse('attendance-grid'), {'period': 'day'})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_unauthorized(self, authenticated_normal_user_client):
+        """normal employees cannot read the grid."""
+        response = authenticated_normal_user_client.get(reverse('attendance-grid'))
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+def test_encode_mask_bit_order():
+    """day i is bit i % 8 of byte i // 8."""
+    assert base64.b64decode(encode_mask(0b1_0000_0001, 10)) == bytes([0b1, 0b1])
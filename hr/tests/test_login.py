@@ -1,6 +1,10 @@
 import pytest
 from rest_framework import status
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+from hr.factories import EmployeeFactory
 
 
 @pytest.mark.django_db
@@ -37,3 +41,97 @@ class TestLogin:
         })
 
         assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+@pytest.mark.django_db
+class TestTokenClaims:
+    def login(self, api_client, user):
+        user.set_password('password123')
+        user.save()
+        response = api_client.post(reverse('login'), {'username': user.username, 'password': 'password123'})
+        return response.data['access']
+
+    def test_token_carries_role_claims(self, api_client, hr_user):
+        """issued tokens carry the employee type and token version."""
+        access = AccessToken(self.login(api_client, hr_user))
+
+        assert access['employee_type'] == 'HR'
+        assert access['token_version'] == hr_user.token_version
+
+    def test_reads_do_not_query_employee(self, api_client, hr_user):
+        """a read with a claims token does not load the employee once the version is cached."""
+        api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.login(api_client, hr_user)}')
+        api_client.get(reverse('employee-detail', args=[hr_user.id]))
+
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.get(reverse('cache-stats'))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert not [query for query in queries if 'hr_employee' in query['sql']]
+
+    def test_role_change_revokes_tokens(self, api_client, hr_user):
+        """changing an employee's type revokes the tokens issued before."""
+        other_hr = EmployeeFactory(employee_type='HR')
+        stale = self.login(api_client, other_hr)
+        api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.login(api_client, hr_user)}')
+
+        response = api_client.put(reverse('employee-detail', args=[other_hr.id]), {'employee_type': 'NORMAL'})
+        assert response.status_code == status.HTTP_200_OK
+
+        api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {stale}')
+        response = api_client.get(reverse('dashboard'))
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+    def test_orm_role_change_revokes_tokens(self, api_client, hr_user):
+        """a demotion saved outside the API, as the admin or the shell do, revokes tokens too."""
+        access = self.login(api_client, hr_user)
+        api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+        assert api_client.get(reverse('dashboard')).status_code == status.HTTP_200_OK
+
+        hr_user.employee_type = 'NORMAL'
+        hr_user.save()
+
+        assert api_client.get(reverse('dashboard')).status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_deactivation_with_update_fields_revokes_tokens(self, api_client, hr_user):
+        """saving only is_active still moves the token version."""
+        api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.login(api_client, hr_user)}')
+        version = hr_user.token_version
+
+        hr_user.is_active = False
+        hr_user.save(update_fields=['is_active'])
+
+        hr_user.refresh_from_db()
+        assert hr_user.token_version == version + 1
+        assert api_client.get(reverse('dashboard')).status_code == status.HTTP_401_UNAUTHORIZED
+
+@pytest.mark.django_db(transaction=True)
+class TestAsyncLogin:
+    def test_successful_login(self, client, hr_user):
+        """async login with valid credentials returns tokens."""
+        hr_user.set_password('password123')
+        hr_user.save()
+
+        response = client.post(
+            reverse('login-async'), {'username': hr_user.username, 'password': 'password123'},
+            content_type='application/json',
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert AccessToken(response.json()['access'])['employee_type'] == 'HR'
+
+    def test_invalid_credentials(self, client, hr_user):
+        """async login with a wrong password fails with 401."""
+        response = client.post(reverse('login-async'), {'username': hr_user.username, 'password': 'wrong'})
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_normal_user_login(self, client, normal_user):
+        """async login for a normal user fails with 403."""
+        normal_user.set_password('password123')
+        normal_user.save()
+
+        response = client.post(reverse('login-async'), {'username': normal_user.username, 'password': 'password123'})
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
@@ -0,0 +1,64 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+from hr.factories import EmployeeFactory
+from hr.metrics import registry, render_metrics
+
+
+@pytest.fixture(autouse=True)
+def clear_metrics():
+    registry.clear()
+
+
+@pytest.mark.django_db
+class TestQueryTimingMiddleware:
+    def test_server_timing_header(self, authenticated_hr_client):
+        """responses report their query count and database time."""
+        employee = EmployeeFactory()
+
+        response = authenticated_hr_client.get(reverse('employee-detail', args=[employee.id]))
+
+        assert response.status_code == status.HTTP_200_OK
+        db, total = response['Server-Timing'].split(', ')
+        assert db.startswith('db;desc="1 queries";dur=')
+        assert total.startswith('total;dur=')
+
+    def test_metrics_per_route(self, authenticated_hr_client, client):
+        """latency and queries are aggregated by route pattern, not by URL."""
+        first, second = EmployeeFactory.create_batch(2)
+        authenticated_hr_client.get(reverse('employee-detail', args=[first.id]))
+        authenticated_hr_client.get(reverse('employee-detail', args=[second.id]))
+
+        response = client.get(reverse('metrics'))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response['Content-Type'].startswith('text/plain')
+        body = response.content.decode()
+        labels = 'route="/api/employees/<int:pk>/",method="GET"'
+        assert f'hr_request_duration_seconds_count{{{labels}}} 2' in body
+        assert f'hr_request_duration_seconds_bucket{{{labels},le="+Inf"}} 2' in body
+        assert f'hr_db_queries_total{{{labels}}} 2' in body
+
+    def test_unmatched_route(self, client):
+        """requests that match no route share one label."""
+        client.get('/api/no-such-endpoint/')
+        assert ('unmatched', 'GET') in registry.snapshot()
+
+    def test_metrics_restricted_to_allowed_hosts(self, client, settings):
+        """only scrapers on the allowed hosts can read the metrics."""
+        settings.METRICS_ALLOWED_HOSTS = ['10.0.0.1']
+        response = client.get(reverse('metrics'))
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+class TestRenderMetrics:
+    def test_histogram_buckets_are_cumulative(self):
+        """bucket counts include every faster observation."""
+        buckets = [1, 0, 2] + [0] * 8 + [1]
+        body = render_metrics({('/api/x/', 'GET'): (buckets, 4, 12.5, 7, 0.25)})
+
+        assert 'hr_request_duration_seconds_bucket{route="/api/x/",method="GET",le="0.005"} 1' in body
+        assert 'hr_request_duration_seconds_bucket{route="/api/x/",method="GET",le="0.025"} 3' in body
+        assert 'hr_request_duration_seconds_bucket{route="/api/x/",method="GET",le="+Inf"} 4' in body
+        assert 'hr_db_queries_total{route="/api/x/",method="GET"} 7' in body
+        assert 'hr_db_duration_seconds_total{route="/api/x/",method="GET"} 0.250000' in body
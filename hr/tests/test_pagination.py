@@ -0,0 +1,112 @@
+import base64
+import json
+import pytest
+from datetime import timedelta
+from django.utils import timezone
+from rest_framework import status
+from django.urls import reverse
+from hr.models import Employee, Attendance
+from hr.factories import AttendanceFactory, EmployeeFactory
+
+
+def cursor(values):
+    return base64.urlsafe_b64encode(json.dumps({'k': values}).encode('utf-8')).decode('ascii')
+
+
+def walk(client, url, direction='next'):
+    """follow the cursor links and collect every page."""
+    pages = []
+    while url:
+        response = client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        pages.append(response.data)
+        url = response.data[direction]
+    return pages
+
+
+@pytest.mark.django_db
+class TestEmployeePagination:
+    def test_pages_cover_every_employee_once(self, authenticated_hr_client):
+        """following next links returns every employee exactly once, in id order."""
+        EmployeeFactory.create_batch(7)
+
+        pages = walk(authenticated_hr_client, reverse('employee-list') + '?page_size=3')
+
+        ids = [row['id'] for page in pages for row in page['results']]
+        assert ids == list(Employee.objects.order_by('id').values_list('id', flat=True))
+        assert [len(page['results']) for page in pages] == [3, 3, 2]
+        assert pages[0]['previous'] is None
+
+    def test_previous_link_returns_prior_page(self, authenticated_hr_client):
+        """the previous link of the second page leads back to the first page."""
+        EmployeeFactory.create_batch(5)
+
+        first = authenticated_hr_client.get(reverse('employee-list') + '?page_size=2').data
+        second = authenticated_hr_client.get(first['next']).data
+        back = authenticated_hr_client.get(second['previous']).data
+
+        assert [row['id'] for row in back['results']] == [row['id'] for row in first['results']]
+
+    def test_page_size_is_capped(self, authenticated_hr_client):
+        """page_size above the cap is clamped."""
+        response = authenticated_hr_client.get(reverse('employee-list') + '?page_size=100000')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['next'] is None
+
+    def test_invalid_cursor(self, authenticated_hr_client):
+        """a malformed cursor returns 404."""
+        response = authenticated_hr_client.get(reverse('employee-list') + '?cursor=not-a-cursor')
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    @pytest.mark.parametrize('url, values', [
+        ('employee-list', ['abc']),
+        ('employee-list', [None]),
+        ('employee-list', [2 ** 70]),
+        ('attendance-list', ['garbage', 'x', 1]),
+        ('attendance-list', ['2024-01-01', 'x', 'y']),
+        ('attendance-list', [[1], 'x', 1]),
+    ])
+    def test_cursor_with_invalid_values(self, authenticated_hr_client, url, values):
+        """a well-formed cursor holding values of the wrong type returns 404, not a server error."""
+        response = authenticated_hr_client.get(reverse(url), {'cursor': cursor(values)})
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_plain_list_without_pagination_params(self, authenticated_hr_client):
+        """without cursor or page_size the list is returned unpaginated."""
+        response = authenticated_hr_client.get(reverse('employee-list'))
+
+        assert isinstance(response.data, list)
+
+
+@pytest.mark.django_db
+class TestAttendancePagination:
+    def test_keyset_order_across_ties(self, authenticated_hr_client):
+        """rows sharing date and first name are split across pages without loss."""
+        today = timezone.now().date()
+        for offset in range(3):
+            for name in ['Ann', 'Ann', 'Bob']:
+                AttendanceFactory(date=today - timedelta(days=offset), employee__first_name=name)
+
+        url = reverse('attendance-list') + f'?period=year&date={today}&page_size=2'
+        pages = walk(authenticated_hr_client, url)
+
+        ids = [row['id'] for page in pages for row in page['results']]
+        expected = Attendance.objects.filter(date__year=today.year).order_by(
+            'date', 'employee__first_name', 'id'
+        ).values_list('id', flat=True)
+        assert ids == list(expected)
+
+    def test_walk_backwards(self, authenticated_hr_client):
+        """previous links walk back to the start in the same order."""
+        today = timezone.now().date()
+        AttendanceFactory.create_batch(5, date=today)
+
+        pages = walk(authenticated_hr_client, reverse('attendance-list') + '?page_size=2')
+        back = walk(authenticated_hr_client, pages[-1]['previous'], direction='previous')
+
+        forward_ids = [row['id'] for page in pages[:-1] for row in page['results']]
+        backward_ids = [row['id'] for page in reversed(back) for row in page['results']]
+        assert backward_ids == forward_ids
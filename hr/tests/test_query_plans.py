@@ -0,0 +1,103 @@
+import re
+import pytest
+from datetime import timedelta
+from django.db import connection
+from django.utils import timezone
+from hr.models import Employee, Attendance
+from hr.search import search_employees
+
+EMPLOYEES = 200
+DAYS = 45
+
+SEQUENTIAL_SCANS = {
+    'postgresql': r'Seq Scan on "?{table}"?',
+    'sqlite': r'\bSCAN {table}\b(?! USING)',
+}
+
+
+def assert_index_scan(queryset, table='hr_attendance'):
+    """the plan must not read the whole table sequentially."""
+    pattern = SEQUENTIAL_SCANS.get(connection.vendor)
+    if pattern is None:
+        pytest.skip(f'no plan checks for {connection.vendor}')
+    plan = queryset.explain()
+    assert not re.search(pattern.format(table=table), plan), plan
+
+
+@pytest.fixture
+def seeded_attendance(db):
+    """a few months of attendance for a few hundred employees, with fresh planner statistics."""
+    today = timezone.now().date()
+    employees = Employee.objects.bulk_create([
+        Employee(username=f'seed{n}', email=f'seed{n}@example.com', first_name=f'Seed{n % 50}', password='!')
+        for n in range(EMPLOYEES)
+    ])
+    Attendance.objects.bulk_create([
+        Attendance(employee=employee, date=today - timedelta(days=day), is_present=(employee.id + day) % 10 != 0)
+        for employee in employees
+        for day in range(DAYS)
+    ], batch_size=2000)
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE hr_attendance')
+    return today
+
+
+@pytest.mark.django_db
+class TestAttendanceQueryPlans:
+    def test_attendance_list_day(self, seeded_attendance):
+        """a day list is a range scan on date."""
+        today = seeded_attendance
+        assert_index_scan(
+            Attendance.objects.filter(date__range=[today, today])
+            .select_related('employee', 'created_by').order_by('date', 'employee__first_name')
+        )
+
+    def test_present_today(self, seeded_attendance):
+        """counting today's present employees reads the date index."""
+        assert_index_scan(Attendance.objects.filter(date=seeded_attendance, is_present=True).values('employee'))
+
+    def test_absent_today(self, seeded_attendance):
+        """counting today's absences reads the partial index."""
+        assert_index_scan(Attendance.objects.filter(date=seeded_attendance, is_present=False).values('id'))
+
+    def test_recent_activities(self, seeded_attendance):
+        """the latest activities come from the created_at index."""
+        assert_index_scan(Attendance.objects.order_by('-created_at')[:10])
+
+    def test_changes_feed(self, seeded_attendance):
+        """a changes poll is a range scan on (updated_at, id)."""
+        since = timezone.now() - timedelta(minutes=5)
+        assert_index_scan(Attendance.objects.filter(updated_at__gt=since).order_by('updated_at', 'id')[:500])
+
+
+@pytest.fixture
+def seeded_employees(db):
+    """a few thousand employees, a few of them inactive, with fresh planner statistics."""
+    Employee.objects.bulk_create([
+        Employee(
+            username=f'seed{n}', email=f'seed{n}@example.com', first_name=f'Seed{n % 50}', last_name=f'Stone{n}',
+            is_active=n % 500 != 0, password='!',
+        )
+        for n in range(EMPLOYEES * 10)
+    ])
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE hr_employee')
+
+
+@pytest.mark.django_db
+class TestEmployeeSearchQueryPlans:
+    def test_prefix_search(self, seeded_employees):
+        """a prefix search reads the lower() search indexes."""
+        employees = search_employees(Employee.objects.all(), 'stone42', mode='prefix')
+        assert_index_scan(employees.order_by('id')[:50], table='hr_employee')
+
+    def test_substring_search(self, seeded_employees):
+        """a substring search reads the trigram indexes."""
+        if connection.vendor != 'postgresql':
+            pytest.skip('substring search is only indexed on PostgreSQL')
+        employees = search_employees(Employee.objects.all(), 'one42')
+        assert_index_scan(employees.order_by('id')[:50], table='hr_employee')
+
+    def test_inactive(self, seeded_employees):
+        """inactive employees come from the partial index."""
+        assert_index_scan(Employee.objects.filter(is_active=False).order_by('id')[:50], table='hr_employee')
@@ -0,0 +1,113 @@
+import pytest
+from django.conf import settings
+from django.db import connections, transaction
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from hr.factories import EmployeeFactory
+from hr.models import Employee
+from hr.replicas import ReplicaRouter, primary_pinned, routing
+from hr.tests.test_async_api import async_get
+
+requires_replica = pytest.mark.skipif(
+    not settings.DATABASE_REPLICAS, reason='set DATABASE_REPLICA_URLS to route to a replica',
+)
+
+
+def new_employee(client, username):
+    return client.post(reverse('employee-list'), {
+        'username': username,
+        'password': 'password123',
+        'email': f'{username}@gmail.com',
+    })
+
+
+class TestReplicaRouter:
+    def test_reads_use_primary_outside_requests(self):
+        """commands and workers read from the primary."""
+        assert ReplicaRouter().db_for_read(Employee) == 'default'
+
+    def test_reads_follow_the_first_write(self):
+        """once a request writes, its reads stay on the primary."""
+        router = ReplicaRouter()
+        with routing('replica1'):
+            assert router.db_for_read(Employee) == 'replica1'
+            assert router.db_for_write(Employee) == 'default'
+            assert router.db_for_read(Employee) == 'default'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_reads_in_transaction_use_primary(self):
+        """a transaction's reads see its own writes."""
+        router = ReplicaRouter()
+        with routing('replica1'):
+            with transaction.atomic():
+                assert router.db_for_read(Employee) == 'default'
+            assert router.db_for_read(Employee) == 'replica1'
+
+
+@pytest.mark.django_db
+class TestPrimaryPin:
+    def test_write_pins_reads_to_primary(self, settings, authenticated_hr_client):
+        """after a write, GET requests read from the primary for a while."""
+        settings.DATABASE_REPLICAS = ['replica1']
+
+        assert not primary_pinned()
+        assert new_employee(authenticated_hr_client, 'pinned').status_code == status.HTTP_201_CREATED
+        assert primary_pinned()
+
+    def test_failed_write_does_not_pin(self, settings, authenticated_hr_client):
+        """a request that writes nothing leaves the replicas in use."""
+        settings.DATABASE_REPLICAS = ['replica1']
+
+        response = authenticated_hr_client.post(reverse('employee-list'), {'username': 'incomplete'})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert not primary_pinned()
+
+
+@requires_replica
+@pytest.mark.django_db(transaction=True, databases='__all__')
+class TestReplicaRouting:
+    def capture(self):
+        return (
+            CaptureQueriesContext(connections['default']),
+            CaptureQueriesContext(connections[settings.DATABASE_REPLICAS[0]]),
+        )
+
+    def test_get_reads_from_replica(self, settings, authenticated_hr_client):
+        """the list and its validators are read from the replica."""
+        settings.DATABASE_REPLICAS = settings.DATABASE_REPLICAS[:1]
+        EmployeeFactory.create_batch(3)
+
+        primary, replica = self.capture()
+        with primary, replica:
+            response = authenticated_hr_client.get(reverse('employee-list'))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data) == 4
+        assert len(primary) == 0
+        assert len(replica) > 0
+
+    def test_write_and_next_reads_use_primary(self, settings, authenticated_hr_client):
+        """a POST, and the GET that follows it, only use the primary."""
+        settings.DATABASE_REPLICAS = settings.DATABASE_REPLICAS[:1]
+
+        primary, replica = self.capture()
+        with primary, replica:
+            assert new_employee(authenticated_hr_client, 'fresh').status_code == status.HTTP_201_CREATED
+            response = authenticated_hr_client.get(reverse('employee-list'))
+
+        assert 'fresh' in [employee['username'] for employee in response.data]
+        assert len(primary) > 0
+        assert len(replica) == 0
+
+    def test_async_get_reads_from_replica(self, settings, hr_user):
+        """the async views are routed the same way."""
+        settings.DATABASE_REPLICAS = settings.DATABASE_REPLICAS[:1]
+
+        primary, replica = self.capture()
+        with primary, replica:
+            response = async_get(hr_user, reverse('employee-detail-async', args=[hr_user.pk]))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(primary) == 0
+        assert len(replica) > 0
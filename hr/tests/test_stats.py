@@ -0,0 +1,72 @@
+import pytest
+from datetime import date
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from django.urls import reverse
+from hr.models import Employee
+from hr.factories import AttendanceFactory, EmployeeFactory
+
+
+@pytest.fixture
+def week_of_attendance(db):
+    """two employees with marks in the week of 2024-03-04."""
+    alice, bob = EmployeeFactory.create_batch(2)
+    for day in (4, 5, 6):
+        AttendanceFactory(employee=alice, date=date(2024, 3, day), is_present=True)
+    AttendanceFactory(employee=bob, date=date(2024, 3, 4), is_present=True)
+    AttendanceFactory(employee=bob, date=date(2024, 3, 5), is_present=False)
+    AttendanceFactory(employee=bob, date=date(2024, 3, 6), is_present=False)
+    AttendanceFactory(employee=bob, date=date(2024, 4, 1), is_present=False)
+    return alice, bob
+
+
+@pytest.mark.django_db
+class TestAttendanceStats:
+    def test_counts_per_employee(self, authenticated_hr_client, week_of_attendance):
+        """present, absent, unmarked and rate are computed for the period."""
+        alice, bob = week_of_attendance
+
+        response = authenticated_hr_client.get(reverse('attendance-stats'), {'date': '2024-03-06', 'period': 'week'})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['days'] == 7
+        stats = {row['id']: row for row in response.data['results']}
+        assert (stats[alice.id]['present'], stats[alice.id]['absent'], stats[alice.id]['unmarked']) == (3, 0, 4)
+        assert (stats[bob.id]['present'], stats[bob.id]['absent'], stats[bob.id]['unmarked']) == (1, 2, 4)
+        assert stats[bob.id]['rate'] == pytest.approx(0.3333)
+        assert len(stats) == Employee.objects.count()
+
+    def test_top_absent(self, authenticated_hr_client, week_of_attendance):
+        """sort=absent&limit=1 returns the most absent employee."""
+        _, bob = week_of_attendance
+
+        response = authenticated_hr_client.get(
+            reverse('attendance-stats'), {'date': '2024-03-06', 'period': 'week', 'sort': 'absent', 'limit': 1}
+        )
+
+        assert [row['id'] for row in response.data['results']] == [bob.id]
+
+    def test_single_query(self, authenticated_hr_client, week_of_attendance):
+        """the stats come from one grouped query."""
+        with CaptureQueriesContext(connection) as queries:
+            authenticated_hr_client.get(reverse('attendance-stats'), {'date': '2024-03-06', 'period': 'month'})
+
+        assert len([query for query in queries if '"hr_attendance"' in query['sql']]) == 1
+
+    def test_invalid_sort(self, authenticated_hr_client):
+        """an unknown sort field is rejected."""
+        response = authenticated_hr_client.get(reverse('attendance-stats'), {'sort': 'salary'})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_employee_list_embeds_stats(self, authenticated_hr_client, week_of_attendance):
+        """employee_list can include the stats for a period."""
+        alice, _ = week_of_attendance
+
+        response = authenticated_hr_client.get(
+            reverse('employee-list'), {'stats': 1, 'date': '2024-03-06', 'period': 'month'}
+        )
+
+        row = next(row for row in response.data if row['id'] == alice.id)
+        assert (row['present'], row['absent'], row['unmarked']) == (3, 0, 28)
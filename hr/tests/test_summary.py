@@ -0,0 +1,87 @@
+import pytest
+from datetime import timedelta
+from django.core.management import call_command
+from django.utils import timezone
+from django.urls import reverse
+from hr.models import Employee, DailyAttendanceSummary
+from hr.factories import AttendanceFactory, EmployeeFactory
+
+
+def dashboard_counts(client):
+    data = client.get(reverse('dashboard')).data
+    return data['total_employees'], data['present_today'], data['absent_today']
+
+
+@pytest.mark.django_db
+class TestDailyAttendanceSummary:
+    def test_dashboard_reads_summary_row(self, authenticated_hr_client):
+        """the dashboard counts once, then serves the stored row."""
+        today = timezone.now().date()
+        AttendanceFactory.create_batch(2, date=today, is_present=True)
+
+        assert dashboard_counts(authenticated_hr_client) == (Employee.objects.count(), 2, 0)
+        summary = DailyAttendanceSummary.objects.get(date=today)
+        assert summary.unmarked == Employee.objects.count() - 2
+
+    def test_attendance_writes_keep_summary_in_step(self, authenticated_hr_client):
+        """create, update and delete through the API adjust the summary."""
+        today = timezone.now().date()
+        employee = EmployeeFactory()
+        authenticated_hr_client.get(reverse('dashboard'))
+        total = Employee.objects.count()
+
+        response = authenticated_hr_client.post(reverse('attendance-list'), {
+            'employee': employee.id, 'date': today, 'is_present': True,
+        })
+        assert dashboard_counts(authenticated_hr_client) == (total, 1, 0)
+
+        attendance_url = reverse('attendance-detail', args=[response.data['id']])
+        authenticated_hr_client.put(attendance_url, {'is_present': False})
+        assert dashboard_counts(authenticated_hr_client) == (total, 0, 1)
+
+        authenticated_hr_client.put(attendance_url, {'date': today - timedelta(days=1)})
+        assert dashboard_counts(authenticated_hr_client) == (total, 0, 0)
+        yesterday = DailyAttendanceSummary.objects.get(date=today - timedelta(days=1))
+        assert (yesterday.present, yesterday.absent) == (0, 1)
+
+        authenticated_hr_client.delete(attendance_url)
+        yesterday.refresh_from_db()
+        assert (yesterday.present, yesterday.absent, yesterday.total_employees) == (0, 0, total)
+
+    def test_employee_delete_updates_summary(self, authenticated_hr_client):
+        """deleting an employee removes them and their marks from the summary."""
+        today = timezone.now().date()
+        attendance = AttendanceFactory(date=today, is_present=True)
+        authenticated_hr_client.get(reverse('dashboard'))
+
+        authenticated_hr_client.delete(reverse('employee-detail', args=[attendance.employee.id]))
+
+        assert dashboard_counts(authenticated_hr_client) == (Employee.objects.count(), 0, 0)
+
+    def test_rebuild_command(self, db):
+        """the rebuild command recounts every date from the attendance table."""
+        today = timezone.now().date()
+        AttendanceFactory.create_batch(3, date=today, is_present=False)
+        AttendanceFactory(date=today - timedelta(days=1), is_present=True)
+        DailyAttendanceSummary.objects.create(date=today, present=99)
+
+        call_command('rebuild_attendance_summary')
+
+        summary = DailyAttendanceSummary.objects.get(date=today)
+        assert (summary.present, summary.absent) == (0, 3)
+        assert summary.total_employees == Employee.objects.count()
+        assert DailyAttendanceSummary.objects.count() == 2
+
+    def test_bulk_upsert_updates_summary(self, authenticated_hr_client):
+        """bulk upserts move counts between present, absent and unmarked."""
+        today = timezone.now().date()
+        existing = AttendanceFactory(date=today, is_present=True)
+        employee = EmployeeFactory()
+        authenticated_hr_client.get(reverse('dashboard'))
+
+        authenticated_hr_client.post(reverse('attendance-bulk'), [
+            {'employee': existing.employee.id, 'date': str(today), 'is_present': False},
+            {'employee': employee.id, 'date': str(today), 'is_present': False},
+        ], format='json')
+
+        assert dashboard_counts(authenticated_hr_client) == (Employee.objects.count(), 0, 2)
@@ -1,12 +1,29 @@
 from django.urls import path
-from . import api
+from . import api, async_api, metrics
 
 urlpatterns = [
     path('login/', api.login_view, name='login'),
+    path('login/async/', async_api.login_view_async, name='login-async'),
     path('dashboard/', api.dashboard, name='dashboard'),
     path('employees/', api.employee_list, name='employee-list'),
+    path('employees/import/', api.employee_import, name='employee-import'),
     path('employees/<int:pk>/', api.employee_detail, name='employee-detail'),
     path('attendance/', api.attendance_list, name='attendance-list'),
+    path('attendance/bulk/', api.attendance_bulk, name='attendance-bulk'),
+    path('attendance/grid/', api.attendance_grid, name='attendance-grid'),
+    path('attendance/stats/', api.attendance_stats, name='attendance-stats'),
     path('attendance/<int:pk>/', api.attendance_detail, name='attendance-detail'),
+    path('exports/', api.export_job_list, name='export-job-list'),
+    path('exports/<int:pk>/', api.export_job_detail, name='export-job-detail'),
+    path('exports/<int:pk>/download/', api.export_job_download, name='export-job-download'),
+    path('changes/attendance/', api.change_feed, {'kind': 'attendance'}, name='attendance-changes'),
+    path('changes/employees/', api.change_feed, {'kind': 'employee'}, name='employee-changes'),
+    path('cache/stats/', api.cache_stats, name='cache-stats'),
+    path('metrics/', metrics.metrics_view, name='metrics'),
+    path('dashboard/async/', async_api.dashboard_async, name='dashboard-async'),
+    path('employees/async/', async_api.employee_list_async, name='employee-list-async'),
+    path('employees/<int:pk>/async/', async_api.employee_detail_async, name='employee-detail-async'),
+    path('attendance/async/', async_api.attendance_list_async, name='attendance-list-async'),
+    path('attendance/<int:pk>/async/', async_api.attendance_detail_async, name='attendance-detail-async'),
 
 ]
\ No newline at end of file
@@ -48,6 +48,12 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Outermost, so the latency it records covers the other middleware too.
+    'hr.metrics.QueryTimingMiddleware',
+    # Picks the database each request reads from before any query runs.
+    'hr.replicas.ReplicaRoutingMiddleware',
+    # Compresses what every middleware below has produced.
+    'hr.compression.CompressionMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -82,16 +88,79 @@ WSGI_APPLICATION = 'project.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
-tmpPostgres = urlparse(os.getenv("DATABASE_URL"))
+# Connections are kept open for DB_CONN_MAX_AGE seconds and reused by the
+# following requests of the same worker thread; each is checked before reuse,
+# so one the server has closed is replaced instead of failing the request.
+DB_CONN_MAX_AGE = int(os.getenv('DB_CONN_MAX_AGE', 60))
 
-DATABASES = {
-    'default': {
+
+def postgres_database(url):
+    parsed = urlparse(url)
+    return {
         'ENGINE': 'django.db.backends.postgresql',
-        'NAME': tmpPostgres.path.replace('/', ''),
-        'USER': tmpPostgres.username,
-        'PASSWORD': tmpPostgres.password,
-        'HOST': tmpPostgres.hostname,
-        'PORT': 5432,
+        'NAME': parsed.path.replace('/', ''),
+        'USER': parsed.username,
+        'PASSWORD': parsed.password,
+        'HOST': parsed.hostname,
+        'PORT': parsed.port or 5432,
+        'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+        'CONN_HEALTH_CHECKS': True,
+    }
+
+
+# Embedded mode for single-node sites: DATABASE_URL=sqlite:///db.sqlite3
+# (relative to BASE_DIR) or sqlite:////var/lib/hr/db.sqlite3. Writers wait up
+# to SQLITE_BUSY_TIMEOUT seconds for the write lock; SQLITE_CACHE_SIZE is in KiB.
+SQLITE_BUSY_TIMEOUT = float(os.getenv('SQLITE_BUSY_TIMEOUT', 20))
+SQLITE_PRAGMAS = {
+    'journal_mode': 'wal',
+    # With WAL, a power loss can drop the last commits but not corrupt the file.
+    'synchronous': 'normal',
+    'cache_size': -int(os.getenv('SQLITE_CACHE_SIZE', 64 * 1024)),
+    'mmap_size': int(os.getenv('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)),
+    'temp_store': 'memory',
+}
+
+
+def sqlite_database(url):
+    path = BASE_DIR / urlparse(url).path[1:]
+    return {
+        'ENGINE': 'hr.backends.sqlite3',
+        'NAME': path,
+        'OPTIONS': {'timeout': SQLITE_BUSY_TIMEOUT, 'pragmas': SQLITE_PRAGMAS},
+        'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+        # On disk rather than in memory, so tests and benchmarks run with WAL and the pragmas.
+        'TEST': {'NAME': path.with_name(f'{path.stem}_test{path.suffix}')},
+    }
+
+
+DATABASE_URL = os.getenv("DATABASE_URL")
+if DATABASE_URL and DATABASE_URL.startswith('sqlite:'):
+    DATABASES = {'default': sqlite_database(DATABASE_URL)}
+else:
+    DATABASES = {'default': postgres_database(DATABASE_URL)}
+
+# Read replicas, as comma-separated URLs; GET requests to the API read from
+# them (see hr.replicas). Tests run them as mirrors of the test database.
+DATABASE_REPLICAS = []
+for number, url in enumerate(filter(None, os.getenv('DATABASE_REPLICA_URLS', '').split(',')), start=1):
+    DATABASES[f'replica{number}'] = {**postgres_database(url), 'TEST': {'MIRROR': 'default'}}
+    DATABASE_REPLICAS.append(f'replica{number}')
+
+DATABASE_ROUTERS = ['hr.replicas.ReplicaRouter']
+
+# Seconds reads stay on the primary after a write, covering the replicas' lag.
+REPLICA_PIN_SECONDS = float(os.getenv('REPLICA_PIN_SECONDS', 2))
+
+# Cache
+# Responses are cached per data version. The local-memory default is per
+# process; point CACHE_BACKEND at a file or shared backend when running
+# several workers so every worker sees the same version counter.
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'hr-system'),
     }
 }
 
@@ -139,10 +208,37 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # Reads are authorized from the employee_type/token_version claims
+        # without loading the employee; writes still load it.
+        'hr.authentication.ClaimsJWTAuthentication',
     )
 }
 
+# Threads used by the async login view to verify password hashes.
+LOGIN_HASH_WORKERS = int(os.getenv('LOGIN_HASH_WORKERS', os.cpu_count() or 2))
+
+# Processes used to hash passwords during employee imports; 1 hashes in-process.
+IMPORT_HASH_WORKERS = int(os.getenv('IMPORT_HASH_WORKERS', os.cpu_count() or 2))
+
+# Archive files of closed attendance years (see the archive_attendance command).
+ATTENDANCE_ARCHIVE_DIR = os.getenv('ATTENDANCE_ARCHIVE_DIR', BASE_DIR / 'archive')
+
+# Files written by the export worker (see the run_export_worker command).
+EXPORT_JOB_DIR = os.getenv('EXPORT_JOB_DIR', BASE_DIR / 'exports')
+# Finished export jobs and their files are deleted by the worker after this many days.
+EXPORT_JOB_DAYS = int(os.getenv('EXPORT_JOB_DAYS', 7))
+
+# Changes feed: rows are reported once this old, so late commits are not skipped,
+# and tombstones of deleted rows are kept this many days (see prune_tombstones).
+SYNC_SETTLE_SECONDS = float(os.getenv('SYNC_SETTLE_SECONDS', 2))
+SYNC_TOMBSTONE_DAYS = int(os.getenv('SYNC_TOMBSTONE_DAYS', 90))
+
+# Compressed CSV exports of past periods, reused until the period's data changes.
+EXPORT_CACHE_DIR = os.getenv('EXPORT_CACHE_DIR', BASE_DIR / 'export_cache')
+
+# Addresses allowed to read /api/metrics/ (a scraper on the same host by default).
+METRICS_ALLOWED_HOSTS = os.getenv('METRICS_ALLOWED_HOSTS', '127.0.0.1,::1').split(',')
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=1),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),